@@ -0,0 +1,6 @@
+import os
+
+# Benchmarks import app modules that read these at import time; Motor does not
+# connect until the first operation, so the defaults are harmless when unused.
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "edupro_bench")
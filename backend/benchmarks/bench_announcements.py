@@ -0,0 +1,88 @@
+"""Cost of one school-wide announcement in a large tenant.
+
+Compares the old fan-out-on-write broadcast (one create_notification per
+user: one insert and one counter update each) with the fan-out-on-read
+announcement (one document, one counter update_many, one tenant broadcast).
+Every user holds a live (fake) WebSocket. Also counts the Mongo round
+trips of GET /api/notifications for a user afterwards. Uses the in-memory
+Motor stand-in with a simulated round trip. Run from backend/:
+
+    python -m benchmarks.bench_announcements --users 10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import FakeWebSocket, configure_store, seed
+
+
+async def run(args):
+    database = configure_store(None, args.latency_ms / 1000)
+    import httpx
+    import server
+    from utils.notifications import broadcast_notification, create_notification
+    from utils.security import create_access_token
+    from utils.websocket import manager
+
+    fixture = (await seed(database, 1, args.users, 1, 0, random.Random(0)))[0]
+    tenant_id = fixture["tenant_id"]
+    users = [fixture["admin"]] + fixture["teachers"] + fixture["student_users"]
+    operations = database.client.operations
+    reader = fixture["student_users"][0]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': reader['id']}, timedelta(hours=1))}"}
+
+    async def per_user_broadcast(title, message, notification_type, tenant_id, exclude_user_id=None):
+        # The pre-announcement implementation, without its 1000-user cap
+        tenant_users = await database.db.users.find({"tenant_id": tenant_id}, {"_id": 0}).to_list(None)
+        for user in tenant_users:
+            if exclude_user_id and user["id"] == exclude_user_id:
+                continue
+            await create_notification(title, message, notification_type, user["id"], tenant_id)
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://announce") as http:
+        await http.get("/api/notifications", headers=headers)
+        for name, broadcast in (("per_user_documents", per_user_broadcast), ("tenant_announcement", broadcast_notification)):
+            await database.db.notifications.delete_many({"tenant_id": tenant_id})
+            sockets = []
+            manager.active_connections.clear()
+            for user in users:
+                sockets.append(FakeWebSocket())
+                manager.active_connections[f"{tenant_id}:{user['id']}"] = [sockets[-1]]
+
+            before = sum(operations.values())
+            start = time.perf_counter()
+            await broadcast("Snow day", "School is closed tomorrow", "system", tenant_id, fixture["admin"]["id"])
+            elapsed = time.perf_counter() - start
+            round_trips = sum(operations.values()) - before
+
+            before = sum(operations.values())
+            response = await http.get("/api/notifications", headers=headers)
+            response.raise_for_status()
+            read_round_trips = sum(operations.values()) - before
+            results[name] = {
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "round_trips": round_trips,
+                "documents_stored": await database.db.notifications.count_documents({"tenant_id": tenant_id}),
+                "frames_sent": sum(ws.frames for ws in sockets),
+                "bytes_sent": sum(ws.bytes for ws in sockets),
+                "get_notifications_round_trips": read_round_trips,
+                "reader_sees_announcement": any(n["title"] == "Snow day" for n in response.json()),
+            }
+
+    return {"users": len(users), "latency_ms": args.latency_ms, "cases": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000, help="Student users in the tenant")
+    parser.add_argument("--latency-ms", type=float, default=0.2, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Page-load latency: separate parallel API calls vs one POST /api/batch.
+
+Replays an admin dashboard load of --paths GET calls against server.app on
+the in-memory Motor stand-in (simulated Mongo round trip --latency-ms).
+The browser side is modelled, not measured: each HTTP request costs one
+--network-ms round trip, at most --connections run at once (HTTP/1.1 per
+origin), and with --preflight each cross-origin call first pays a CORS
+preflight round trip. Reports p50/p95 page-load time and Mongo commands
+per page load. Run from backend/:
+
+    python -m benchmarks.bench_batch --network-ms 40 --preflight
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+DEFAULT_PATHS = [
+    "/api/dashboard/stats", "/api/students", "/api/teachers", "/api/assignments",
+    "/api/notifications", "/api/notifications/unread-count", "/api/fees?status=pending", "/api/timetable",
+]
+
+
+async def run(args):
+    database = configure_store(None, args.latency_ms / 1000)
+    import httpx
+    import server
+
+    from utils.security import create_access_token
+
+    fixture = (await seed(database, 1, args.students, 10, 1, random.Random(0)))[0]
+    operations = database.client.operations
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': fixture['admin']['id']}, timedelta(hours=1))}"}
+    network = args.network_ms / 1000
+    connections = asyncio.Semaphore(args.connections)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://batch") as http:
+        async def browser_request(method, path, **kwargs):
+            async with connections:
+                if args.preflight:
+                    await asyncio.sleep(network)
+                await asyncio.sleep(network)
+                response = await http.request(method, path, headers=headers, **kwargs)
+            response.raise_for_status()
+            return response
+
+        async def separate():
+            await asyncio.gather(*[browser_request("GET", path) for path in args.paths])
+
+        async def batched():
+            response = await browser_request("POST", "/api/batch", json={"requests": [{"path": p} for p in args.paths]})
+            assert all(r["status"] == 200 for r in response.json()["responses"])
+
+        results = {}
+        for name, page_load in (("separate_calls", separate), ("batch", batched)):
+            await page_load()
+            latencies, commands = [], []
+            for _ in range(args.iterations):
+                before = sum(operations.values())
+                start = time.perf_counter()
+                await page_load()
+                latencies.append(time.perf_counter() - start)
+                commands.append(sum(operations.values()) - before)
+            results[name] = {
+                "p50_ms": round(statistics.median(latencies) * 1000, 1),
+                "p95_ms": round(statistics.quantiles(latencies, n=20)[-1] * 1000, 1),
+                "mongo_commands": round(statistics.mean(commands), 1),
+            }
+
+    return {
+        "paths": len(args.paths), "network_ms": args.network_ms, "preflight": args.preflight,
+        "connections": args.connections, "mongo_latency_ms": args.latency_ms, "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=lambda value: value.split(","), default=DEFAULT_PATHS, help="Comma-separated GET paths")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--network-ms", type=float, default=40, help="Browser-to-API round trip")
+    parser.add_argument("--connections", type=int, default=6, help="Concurrent browser connections per origin")
+    parser.add_argument("--preflight", action="store_true", help="Each cross-origin call pays a CORS preflight")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
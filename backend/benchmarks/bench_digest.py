@@ -0,0 +1,89 @@
+"""WebSocket frames and bytes per student during bulk assignment creation.
+
+A teacher posts --assignments assignments back to back for one grade while
+every student of that grade holds a live (fake) WebSocket. Runs once per
+digest window (0 = coalescing off), with digests stored or not, against the
+in-memory Motor stand-in. Run from backend/:
+
+    python -m benchmarks.bench_digest
+    python -m benchmarks.bench_digest --assignments 20 --windows 0,100,1000 --store
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import FakeWebSocket, configure_store, seed
+
+
+async def run(args):
+    database = configure_store(None, 0)
+    import httpx
+    import server
+    from utils import notifications
+    from utils.security import create_access_token
+    from utils.websocket import manager
+
+    fixture = (await seed(database, 1, args.students, 1, 0, random.Random(0)))[0]
+    tenant_id = fixture["tenant_id"]
+    grade = fixture["students"][0]["grade"]
+    grade_emails = {s["email"] for s in fixture["students"] if s["grade"] == grade}
+    recipients = [u for u in fixture["student_users"] if u["email"] in grade_emails]
+    token = create_access_token({"sub": fixture["teachers"][0]["id"]}, timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    coalescer = notifications.notification_coalescer
+    coalescer.persist = notifications._store_notification if args.store else None
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://digest") as http:
+        for window in args.windows:
+            coalescer.window = window / 1000
+            sockets = {}
+            manager.active_connections.clear()
+            for user in recipients:
+                sockets[user["id"]] = FakeWebSocket()
+                manager.active_connections[f"{tenant_id}:{user['id']}"] = [sockets[user["id"]]]
+            stored_before = await database.db.notifications.count_documents({"tenant_id": tenant_id})
+
+            start = time.perf_counter()
+            for i in range(args.assignments):
+                response = await http.post("/api/assignments", headers=headers, json={
+                    "title": f"Worksheet {i}", "description": "Bench", "due_date": "2026-03-01",
+                    "subject": "Math", "teacher_id": fixture["teachers"][0]["id"], "grade": grade, "max_score": 100.0,
+                })
+                response.raise_for_status()
+            await coalescer.flush()
+            elapsed = time.perf_counter() - start
+
+            frames = [ws.frames for ws in sockets.values()]
+            sent_bytes = [ws.bytes for ws in sockets.values()]
+            results[f"window_{window:g}ms"] = {
+                "frames_per_user": round(sum(frames) / len(frames), 2),
+                "bytes_per_user": round(sum(sent_bytes) / len(sent_bytes)),
+                "documents_stored": await database.db.notifications.count_documents({"tenant_id": tenant_id}) - stored_before,
+                "elapsed_ms": round(elapsed * 1000, 1),
+            }
+
+    return {
+        "assignments": args.assignments,
+        "recipients": len(recipients),
+        "digest_storage": args.store,
+        "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assignments", type=int, default=5)
+    parser.add_argument("--students", type=int, default=240, help="Students in the tenant; 1/12 share the bench grade")
+    parser.add_argument("--windows", type=lambda value: [float(w) for w in value.split(",")], default=[0, 50, 250, 1000],
+                        help="Comma-separated digest windows in milliseconds")
+    parser.add_argument("--store", action="store_true", help="Store digests instead of individual notifications")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Email outbox throughput and queue lag against a local SMTP sink.
+
+Starts benchmarks.smtp_sink (--smtp-latency-ms per message, --fail-rate
+temporary 451 replies) and points utils.email_outbox at it, on the
+in-memory Motor stand-in. A producer enqueues --messages messages for
+--recipients recipients at --rate messages/s; the outbox workers deliver
+them. Reports messages/s, emails actually sent (after per-recipient
+grouping), SMTP connections opened, retries, and enqueue-to-sent lag
+p50/p95. The baseline sends the same messages one by one over a fresh
+connection each, the way an inline request-path send would. Run from
+backend/:
+
+    python -m benchmarks.bench_email --messages 5000 --recipients 500 --fail-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import smtplib
+import statistics
+import time
+from email.message import EmailMessage
+
+from benchmarks.smtp_sink import SMTPSink
+
+
+def make_messages(args):
+    rng = random.Random(0)
+    return [{
+        "to": f"parent{rng.randrange(args.recipients)}@example.com",
+        "subject": f"Notification {i}",
+        "body": "Your child has a new assignment due on Friday.",
+        "tenant_id": "bench",
+    } for i in range(args.messages)]
+
+
+async def baseline(args, sink, messages):
+    def send(message):
+        email = EmailMessage()
+        email["From"], email["To"], email["Subject"] = "no-reply@edupro.local", message["to"], message["subject"]
+        email.set_content(message["body"])
+        with smtplib.SMTP("127.0.0.1", sink.port) as connection:
+            connection.send_message(email)
+
+    sample = messages[:args.baseline_messages]
+    failures = 0
+    start = time.perf_counter()
+    for message in sample:
+        try:
+            await asyncio.to_thread(send, message)
+        except smtplib.SMTPException:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    return {"messages": len(sample), "messages_per_s": round(len(sample) / elapsed, 1), "failed_not_retried": failures}
+
+
+async def run(args):
+    sink = await SMTPSink(args.smtp_latency_ms / 1000, args.fail_rate).start()
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(sink.port),
+        "SMTP_STARTTLS": "false",
+        "EMAIL_WORKERS": str(args.workers),
+        "EMAIL_SMTP_POOL_SIZE": str(args.pool_size),
+        "EMAIL_BATCH_SIZE": str(args.batch_size),
+        "EMAIL_GROUP_WINDOW_SECONDS": str(args.group_window),
+        "EMAIL_POLL_INTERVAL_SECONDS": "0.05",
+        "EMAIL_RETRY_BASE_SECONDS": str(args.retry_base),
+    })
+    from benchmarks.loadtest import configure_store
+    database = configure_store(None, args.latency_ms / 1000)
+    from utils.email_outbox import email_outbox
+
+    messages = make_messages(args)
+    baseline_result = await baseline(args, sink, messages)
+    sink.connections = sink.accepted = sink.rejected = 0
+
+    email_outbox.start()
+    start = time.perf_counter()
+    burst = max(1, int(args.rate / 20))
+    for offset in range(0, len(messages), burst):
+        await email_outbox.enqueue(messages[offset:offset + burst])
+        await asyncio.sleep(burst / args.rate)
+    enqueued_s = time.perf_counter() - start
+
+    outbox = database.db.email_outbox
+    while await outbox.count_documents({"status": {"$in": ["pending", "sending"]}}):
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await email_outbox.close()
+    await sink.close()
+
+    done = await outbox.find({}, {"_id": 0, "status": 1, "created_at": 1, "sent_at": 1, "attempts": 1}).to_list(None)
+    lags = sorted((d["sent_at"] - d["created_at"]).total_seconds() for d in done if d["status"] == "sent")
+    return {
+        "messages": len(messages),
+        "recipients": args.recipients,
+        "workers": args.workers,
+        "smtp_pool_size": args.pool_size,
+        "smtp_latency_ms": args.smtp_latency_ms,
+        "fail_rate": args.fail_rate,
+        "baseline_connection_per_message": baseline_result,
+        "outbox": {
+            "enqueue_s": round(enqueued_s, 2),
+            "drain_s": round(elapsed, 2),
+            "messages_per_s": round(len(messages) / elapsed, 1),
+            "sent": sum(1 for d in done if d["status"] == "sent"),
+            "failed": sum(1 for d in done if d["status"] == "failed"),
+            "emails_sent": sink.accepted,
+            "smtp_connections": sink.connections,
+            "failed_attempts": sum(d.get("attempts", 0) for d in done),
+            "lag_p50_s": round(statistics.median(lags), 3) if lags else None,
+            "lag_p95_s": round(lags[int(len(lags) * 0.95) - 1], 3) if lags else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--recipients", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=1000, help="Enqueued messages per second")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--group-window", type=float, default=0, help="Seconds to hold messages for grouping")
+    parser.add_argument("--retry-base", type=float, default=0.1, help="First retry delay in seconds")
+    parser.add_argument("--smtp-latency-ms", type=float, default=5, help="Sink delay per message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of messages answered 451")
+    parser.add_argument("--baseline-messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Throughput, size and memory of the attendance report per export format.
+
+Seeds --students x --days attendance rows into the in-memory Motor stand-in
+and downloads GET /api/reports/attendance once per format, driving the ASGI
+app directly so the response body is counted and dropped chunk by chunk
+(as a browser would write it to disk) instead of being buffered by a client.
+"csv_buffered" is the previous implementation: the whole result list and the
+whole CSV string built in memory. Peak memory is the tracemalloc high-water
+mark above the seeded store, measured in a separate pass. Run from backend/:
+
+    python -m benchmarks.bench_exports --students 1000 --days 100
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+FORMATS = ["csv_buffered", "csv", "csv.gz", "xlsx"]
+
+
+async def download(app, path, token):
+    """Run one GET through the ASGI app; returns its status, body bytes and chunks, and time to first byte"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.partition("?")[2].encode(), "root_path": "",
+        "headers": [(b"host", b"exports"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1), "server": ("exports", 80),
+    }
+    result = {"status": None, "bytes": 0, "chunks": 0, "first_byte": None}
+    requested = False
+    finished = asyncio.Event()
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse listens for a disconnect while it sends
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body"):
+                if result["first_byte"] is None:
+                    result["first_byte"] = time.perf_counter() - start
+                result["bytes"] += len(message["body"])
+                result["chunks"] += 1
+            if not message.get("more_body"):
+                finished.set()
+
+    await app(scope, receive, send)
+    return result
+
+
+async def buffered_csv(database, tenant_id):
+    """The previous export: every row fetched, then the whole CSV rendered as one string"""
+    rows = await database.reporting_db.attendance.find({"tenant_id": tenant_id}, {"_id": 0}).to_list(None)
+    output = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(output.getvalue().encode())
+
+
+async def run(args):
+    database = configure_store(None, 0)
+    import server
+    from utils.security import create_access_token
+
+    fixture = (await seed(database, 1, args.students, 1, args.days, random.Random(0)))[0]
+    tenant_id = fixture["tenant_id"]
+    rows = await database.db.attendance.count_documents({"tenant_id": tenant_id})
+    token = create_access_token({"sub": fixture["admin"]["id"]}, timedelta(hours=1))
+
+    async def case(export_format):
+        if export_format == "csv_buffered":
+            start = time.perf_counter()
+            size = await buffered_csv(database, tenant_id)
+            return {"status": 200, "bytes": size, "chunks": 1, "first_byte": time.perf_counter() - start}
+        return await download(server.app, f"/api/reports/attendance?format={export_format}", token)
+
+    # Warm up imports (openpyxl) and dependency caches outside the measurements
+    await case("xlsx")
+
+    results = {}
+    for export_format in FORMATS:
+        start = time.perf_counter()
+        result = await case(export_format)
+        elapsed = time.perf_counter() - start
+        assert result["status"] == 200, result
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await case(export_format)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+        results[export_format] = {
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed),
+            "bytes": result["bytes"],
+            "mb_per_second": round(result["bytes"] / elapsed / 1e6, 2),
+            "chunks": result["chunks"],
+            "first_byte_ms": round(result["first_byte"] * 1000, 1),
+            "peak_memory_mb": round(peak / 1e6, 2),
+        }
+
+    return {"rows": rows, "cases": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=100, help="Attendance days per student")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
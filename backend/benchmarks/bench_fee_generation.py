@@ -0,0 +1,81 @@
+"""Term-fee generation throughput: one POST /api/fees per student vs POST /api/fees/generate.
+
+Seeds one tenant with --students active students into the in-memory Motor
+stand-in (simulated Mongo round trip --latency-ms), then raises a term fee
+for the whole school with POST /api/fees/generate, repeats it to show the
+rerun only skips, and times --baseline-students single POST /api/fees calls
+the way a script did before. Reports fees/s, Mongo commands and the
+summaries. Compare the baseline by Mongo commands per fee: its token
+lookup is a full scan of the users collection in the stand-in, which
+inflates its wall time. Run from backend/:
+
+    python -m benchmarks.bench_fee_generation --students 50000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+
+async def run(args):
+    database = configure_store(None, args.latency_ms / 1000)
+    import httpx
+    import server
+    from config.indexes import ensure_indexes
+    from utils.security import create_access_token
+
+    await ensure_indexes(database.db)
+    fixture = (await seed(database, 1, args.students, 1, 0, random.Random(0)))[0]
+    operations = database.client.operations
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': fixture['admin']['id']}, timedelta(hours=1))}"}
+    template = {"term_key": "2030-T1", "amount": 250.0, "due_date": "2030-02-01", "description": "Term 1 tuition"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://fees", timeout=None) as http:
+        async def timed(method, path, body):
+            before = sum(operations.values())
+            start = time.perf_counter()
+            response = await http.request(method, path, headers=headers, json=body)
+            response.raise_for_status()
+            return time.perf_counter() - start, sum(operations.values()) - before, response.json()
+
+        results = {"students": args.students, "mongo_latency_ms": args.latency_ms}
+        for name in ("generate", "rerun"):
+            elapsed, commands, summary = await timed("POST", "/api/fees/generate", template)
+            results[name] = {
+                "seconds": round(elapsed, 2),
+                "fees_per_s": round(summary["students"] / elapsed),
+                "mongo_commands": commands,
+                "summary": summary,
+            }
+
+        elapsed = commands = 0
+        for student in fixture["students"][:args.baseline_students]:
+            seconds, count, _ = await timed("POST", "/api/fees", {
+                "student_id": student["id"], "amount": 250.0, "due_date": "2030-02-01",
+                "description": "Term 1 tuition", "status": "pending"})
+            elapsed += seconds
+            commands += count
+        results["baseline_single_posts"] = {
+            "fees": args.baseline_students,
+            "fees_per_s": round(args.baseline_students / elapsed),
+            "mongo_commands_per_fee": round(commands / args.baseline_students, 1),
+            "projected_seconds_for_all": round(elapsed / args.baseline_students * args.students, 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--baseline-students", type=int, default=200, help="Single POST /api/fees calls to time")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Per-request overhead of MetricsMiddleware and cost of rendering /metrics.
+
+Drives a minimal FastAPI app directly through ASGI (no network, no Mongo)
+with and without the middleware. Run from backend/:
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+
+from core.middleware import MetricsMiddleware
+from utils.metrics import registry
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": f"/api/items/{i % 50}",
+            "raw_path": f"/api/items/{i % 50}".encode(), "root_path": "",
+            "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def run(requests: int, rounds: int) -> dict:
+    plain, instrumented = build_app(False), build_app(True)
+    await drive(plain, 200)
+    await drive(instrumented, 200)
+    baseline = min([await drive(plain, requests) for _ in range(rounds)])
+    measured = min([await drive(instrumented, requests) for _ in range(rounds)])
+
+    start = time.perf_counter()
+    body = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "requests": requests,
+        "baseline_us_per_request": round(baseline / requests * 1e6, 2),
+        "metrics_us_per_request": round(measured / requests * 1e6, 2),
+        "overhead_us_per_request": round((measured - baseline) / requests * 1e6, 2),
+        "render_ms": round(render_ms, 3),
+        "render_bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Overdue-fee scheduler cost at scale.
+
+Seeds --fees fee documents over --tenants tenants (--overdue-fraction of
+them pending past their due date), then runs utils.overdue_fees with
+--workers schedulers at once, and once more to show a rerun is a no-op.
+Reports wall time, Mongo commands, fees flipped per worker and the
+notifications created. The baseline is the old flow: pull every fee of
+every tenant and filter by status and due date on the client.
+
+The in-memory Motor stand-in has no indexes, so every query there is a
+full scan; pass --mongo-url to run against a real mongod, which also
+reports the explain() plan and documents examined for the candidate
+query. Run from backend/:
+
+    python -m benchmarks.bench_overdue_fees --fees 1000000 --tenants 50
+    python -m benchmarks.bench_overdue_fees --fees 1000000 --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from benchmarks.loadtest import configure_store
+
+SEED_CHUNK = 10000
+
+
+async def seed_fees(database, args, today):
+    rng = random.Random(0)
+    tenants = [str(uuid.uuid4()) for _ in range(args.tenants)]
+    await database.db.users.insert_many([{
+        "id": str(uuid.uuid4()), "tenant_id": tenant_id, "role": "school_admin", "email": f"admin@{tenant_id}.example",
+    } for tenant_id in tenants])
+    overdue = 0
+    for offset in range(0, args.fees, SEED_CHUNK):
+        chunk = []
+        for _ in range(min(SEED_CHUNK, args.fees - offset)):
+            if rng.random() < args.overdue_fraction:
+                status, due = "pending", today - timedelta(days=rng.randint(1, 365))
+                overdue += 1
+            else:
+                # Paid fees from the past year, or pending fees not yet due
+                status = rng.choice(["paid", "pending"])
+                due = today + timedelta(days=rng.randint(0, 365)) if status == "pending" else today - timedelta(days=rng.randint(0, 365))
+            chunk.append({
+                "id": str(uuid.uuid4()), "tenant_id": rng.choice(tenants), "student_id": str(uuid.uuid4()),
+                "amount": float(rng.randint(50, 500)), "due_date": due.isoformat(), "description": "Tuition",
+                "status": status, "created_at": "2024-01-01T00:00:00+00:00", "paid_date": None,
+            })
+        await database.db.fees.insert_many(chunk)
+    return tenants, overdue
+
+
+async def explain_candidates(database, today, batch_size):
+    try:
+        explained = await database.db.command(
+            "explain", {"find": "fees", "filter": {"status": "pending", "due_date": {"$lt": today}}, "limit": batch_size},
+            verbosity="executionStats")
+    except Exception as e:
+        return {"unavailable": repr(e)}
+    stats = explained["executionStats"]
+    stage = explained["queryPlanner"]["winningPlan"]
+    while "inputStage" in stage and stage.get("stage") != "IXSCAN":
+        stage = stage["inputStage"]
+    return {
+        "stage": stage.get("stage"),
+        "index": stage.get("indexName"),
+        "keys_examined": stats["totalKeysExamined"],
+        "docs_examined": stats["totalDocsExamined"],
+        "returned": stats["nReturned"],
+        "ms": stats["executionTimeMillis"],
+    }
+
+
+async def run(args):
+    database = configure_store(args.mongo_url, args.latency_ms / 1000)
+    from config.indexes import ensure_indexes
+    from utils.overdue_fees import mark_overdue_fees
+
+    today = date.today()
+    if args.mongo_url:
+        await database.db.fees.drop()
+        await database.db.notifications.drop()
+    await ensure_indexes(database.db)
+    start = time.perf_counter()
+    tenants, overdue = await seed_fees(database, args, today)
+    seed_s = time.perf_counter() - start
+    operations = getattr(database.client, "operations", None)
+
+    async def timed(coro):
+        before = dict(operations) if operations is not None else None
+        start = time.perf_counter()
+        result = await coro
+        elapsed = round(time.perf_counter() - start, 2)
+        commands = {k: v - before.get(k, 0) for k, v in operations.items() if v != before.get(k, 0)} if operations is not None else None
+        return elapsed, commands, result
+
+    async def baseline():
+        found = transferred = 0
+        for tenant_id in tenants:
+            async for fee in database.db.fees.find({"tenant_id": tenant_id}, {"_id": 0}):
+                transferred += 1
+                found += fee["status"] == "pending" and fee["due_date"] < today.isoformat()
+        return {"found": found, "docs_transferred": transferred}
+
+    results = {"fees": args.fees, "tenants": args.tenants, "overdue_seeded": overdue, "seed_s": round(seed_s, 1)}
+    if args.mongo_url:
+        results["candidate_query_plan"] = await explain_candidates(database, today.isoformat(), args.batch_size)
+
+    elapsed, commands, found = await timed(baseline())
+    results["baseline_client_filter"] = {"seconds": elapsed, **found}
+
+    elapsed, commands, runs = await timed(asyncio.gather(*[
+        mark_overdue_fees(database.db, today.isoformat(), args.batch_size) for _ in range(args.workers)]))
+    results["scheduler"] = {
+        "seconds": elapsed,
+        "workers": args.workers,
+        "flipped_per_worker": [run["flipped"] for run in runs],
+        "flipped_total": sum(run["flipped"] for run in runs),
+        "batches": sum(run["batches"] for run in runs),
+        "notifications": await database.db.notifications.count_documents({"type": "fee"}),
+        "mongo_commands": commands,
+    }
+    elapsed, commands, rerun = await timed(mark_overdue_fees(database.db, today.isoformat(), args.batch_size))
+    results["rerun"] = {"seconds": elapsed, **rerun, "mongo_commands": commands}
+    results["overdue_after"] = await database.db.fees.count_documents({"status": "overdue"})
+    results["still_stamped"] = await database.db.fees.count_documents({"overdue_run": {"$exists": True}})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fees", type=int, default=1000000)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--overdue-fraction", type=float, default=0.02, help="Share of fees pending past their due date")
+    parser.add_argument("--workers", type=int, default=2, help="Schedulers running at once")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--mongo-url", help="Run against a real mongod instead of the in-memory stand-in")
+    parser.add_argument("--latency-ms", type=float, default=0.5, help="Simulated Mongo round trip (in-memory only)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Report job latency: first build, identical resubmission, and after a write.
+
+Seeds --students x --days attendance rows into the in-memory Motor stand-in,
+then times submit-to-done for the attendance report job per format: once
+cold, once more with nothing changed (served from the artifact cache), and
+once after a new attendance record (rebuilt). Also fires --concurrent
+identical submissions at once to show they share one build. Artifacts go to
+a temporary directory. Run from backend/:
+
+    python -m benchmarks.bench_report_jobs --students 1000 --days 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+
+async def run(args):
+    os.environ["REPORT_ARTIFACT_DIR"] = tempfile.mkdtemp(prefix="report-artifacts-")
+    database = configure_store(None, 0)
+    import httpx
+    import server
+    from utils.background import drain_background_tasks
+    from utils.report_jobs import report_jobs
+    from utils.security import create_access_token
+
+    fixture = (await seed(database, 1, args.students, 1, args.days, random.Random(0)))[0]
+    rows = await database.db.attendance.count_documents({"tenant_id": fixture["tenant_id"]})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': fixture['admin']['id']}, timedelta(hours=1))}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://jobs") as http:
+        async def submit_and_wait(export_format):
+            response = await http.post("/api/reports/jobs", headers=headers, json={"report": "attendance", "format": export_format})
+            response.raise_for_status()
+            job = response.json()
+            while job["status"] not in ("done", "failed"):
+                await asyncio.sleep(0.005)
+                job = (await http.get(f"/api/reports/jobs/{job['id']}", headers=headers)).json()
+            assert job["status"] == "done", job
+            return job
+
+        async def timed(export_format):
+            start = time.perf_counter()
+            job = await submit_and_wait(export_format)
+            return round((time.perf_counter() - start) * 1000, 1), job
+
+        results = {}
+        for export_format in args.formats:
+            cold_ms, job = await timed(export_format)
+            cached_ms, cached = await timed(export_format)
+            await http.post("/api/attendance", headers=headers, json={
+                "student_id": fixture["students"][0]["id"], "date": "2030-01-01", "status": "present"})
+            await drain_background_tasks()
+            rebuilt_ms, rebuilt = await timed(export_format)
+            results[export_format] = {
+                "cold_ms": cold_ms,
+                "cached_ms": cached_ms,
+                "cached": cached["cached"],
+                "after_write_ms": rebuilt_ms,
+                "after_write_rebuilt": not rebuilt["cached"],
+                "bytes": job["size"],
+            }
+
+        await http.post("/api/attendance", headers=headers, json={
+            "student_id": fixture["students"][1]["id"], "date": "2030-01-02", "status": "present"})
+        await drain_background_tasks()
+        start = time.perf_counter()
+        jobs = await asyncio.gather(*[submit_and_wait("csv") for _ in range(args.concurrent)])
+        concurrent = {
+            "submissions": args.concurrent,
+            "distinct_jobs": len({job["id"] for job in jobs}),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    await report_jobs.close()
+    return {"rows": rows, "formats": results, "concurrent_identical": concurrent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=50, help="Attendance days per student")
+    parser.add_argument("--formats", type=lambda value: value.split(","), default=["csv", "csv.gz", "xlsx"])
+    parser.add_argument("--concurrent", type=int, default=20, help="Identical submissions fired at once")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Serialization cost of a 1000-student list response.
+
+Compares FastAPI's default path (validate every dict against List[Student],
+jsonable_encoder, stdlib json) with the FAST_RESPONSES path (orjson on the
+stored dicts). Run from backend/:  python -m benchmarks.bench_serialization
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import Student
+
+
+def make_students(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "tenant_id": "bench-tenant",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"student{i}@example.com",
+            "grade": str(1 + i % 12),
+            "date_of_birth": "2012-04-01",
+            "parent_email": f"parent{i}@example.com",
+            "created_at": now,
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+
+
+def validated_path(adapter: TypeAdapter, students: List[dict]) -> bytes:
+    # Mirrors fastapi.routing.serialize_response + JSONResponse.render
+    validated = adapter.validate_python(students)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(students: List[dict]) -> bytes:
+    return orjson.dumps(students)
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    students = make_students(args.count)
+    adapter = TypeAdapter(List[Student])
+    assert orjson.loads(validated_path(adapter, students)) == orjson.loads(fast_path(students))
+
+    validated = timeit(lambda: validated_path(adapter, students), args.repeat)
+    fast = timeit(lambda: fast_path(students), args.repeat)
+    print(json.dumps({
+        "students": args.count,
+        "validated_ms": round(validated * 1000, 3),
+        "fast_ms": round(fast * 1000, 3),
+        "speedup": round(validated / fast, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""A child's profile page: five list calls in sequence vs GET /students/{id}/overview.
+
+The portal used to call /students/{id}, /attendance, /grades and /fees
+filtered by student_id, and /assignments?grade=, one after another, each
+repeating authentication and the user lookup. Both flows run --iterations
+times for random students against the in-memory Motor stand-in with a
+simulated round trip of --latency-ms, reporting latency, Mongo commands and
+response bytes per page load. Run from backend/:
+
+    python -m benchmarks.bench_student_overview --latency-ms 1
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+
+async def run(args):
+    database = configure_store(None, args.latency_ms / 1000)
+    import httpx
+    import server
+    from utils.security import create_access_token
+
+    fixture = (await seed(database, 1, args.students, 2, args.days, random.Random(0)))[0]
+    operations = database.client.operations
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': fixture['admin']['id']}, timedelta(hours=1))}"}
+    rng = random.Random(1)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://overview") as http:
+        async def get(url):
+            response = await http.get(url, headers=headers)
+            response.raise_for_status()
+            return response
+
+        async def five_calls(student):
+            responses = [await get(f"/api/students/{student['id']}")]
+            for url in (f"/api/attendance?student_id={student['id']}", f"/api/grades?student_id={student['id']}",
+                        f"/api/fees?student_id={student['id']}", f"/api/assignments?grade={student['grade']}"):
+                responses.append(await get(url))
+            return responses
+
+        async def overview(student):
+            return [await get(f"/api/students/{student['id']}/overview")]
+
+        results = {}
+        for name, flow in (("five_calls", five_calls), ("overview", overview)):
+            await flow(fixture["students"][0])
+            latencies, commands, sizes = [], [], []
+            for _ in range(args.iterations):
+                student = rng.choice(fixture["students"])
+                before = sum(operations.values())
+                start = time.perf_counter()
+                responses = await flow(student)
+                latencies.append(time.perf_counter() - start)
+                commands.append(sum(operations.values()) - before)
+                sizes.append(sum(len(r.content) for r in responses))
+            results[name] = {
+                "http_requests": len(responses),
+                "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                "p95_ms": round(statistics.quantiles(latencies, n=20)[-1] * 1000, 2),
+                "mongo_commands": round(statistics.mean(commands), 1),
+                "response_bytes": round(statistics.mean(sizes)),
+            }
+
+    return {"latency_ms": args.latency_ms, "iterations": args.iterations, "cases": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30, help="Attendance days per student")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Timetable generation for a whole school: solver time and POST /api/timetable/generate.
+
+Builds a school of --classes classes (five per year) taking a full 40-period
+week of ten subjects, and --teachers teachers. Each teacher has a main
+subject, staffed in proportion to its demand, and sometimes a second one.
+A fifth of them are unavailable for a random half-day, plus
+--extra-unavailable of them for another one. Every teacher teaches at most
+--max-per-day periods a day.
+
+For each of --seeds schools it runs utils.timetable_solver directly: greedy
+placement alone, then with ejection repair. It reports lessons left unplaced,
+ejections and seconds, and checks the result against every hard constraint.
+It then seeds the first school into the in-memory Motor stand-in and times
+POST /api/timetable/generate. It times a second call with replace to show a
+regenerated week is swapped in without conflicts. Both report Mongo commands.
+Run from backend/:
+
+    python -m benchmarks.bench_timetable_solver --classes 60 --teachers 120
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+SUBJECTS = {"Math": 8, "English": 6, "Science": 6, "Social Studies": 4, "Language": 4,
+            "PE": 3, "Art": 2, "Music": 2, "Computing": 3, "Library": 2}
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+PERIODS = 8
+
+
+def build_school(args, rng):
+    """(curriculum, teacher subjects, unavailable slots as (day index, period index) lists)"""
+    curriculum = {f"{1 + i // 5}{'ABCDE'[i % 5]}": dict(SUBJECTS) for i in range(args.classes)}
+    names, demand = list(SUBJECTS), sum(SUBJECTS.values())
+    mains = [name for name in names for _ in range(max(1, round(args.teachers * SUBJECTS[name] / demand)))]
+    mains = (mains + names * args.teachers)[:args.teachers]
+    teacher_subjects, unavailable = {}, {}
+    for index, main in enumerate(mains):
+        teacher_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        teacher_subjects[teacher_id] = [main, rng.choice(names)] if rng.random() < 0.4 else [main]
+        slots = []
+        for chance in (0.2, args.extra_unavailable):
+            if rng.random() < chance:
+                day, half = rng.randrange(len(DAYS)), rng.randrange(2)
+                slots += [(day, half * PERIODS // 2 + period) for period in range(PERIODS // 2)]
+        if slots:
+            unavailable[teacher_id] = sorted(set(slots))
+    return curriculum, teacher_subjects, unavailable
+
+
+def violations(result, curriculum, teacher_subjects, blocked, max_per_day):
+    """Hard-constraint breaches in a solver result; 0 for a valid week"""
+    problems = 0
+    grades, teachers, per_day = set(), set(), Counter()
+    for grade, subject, teacher_id, slot in result["lessons"]:
+        problems += (grade, slot) in grades or (teacher_id, slot) in teachers
+        problems += bool(blocked.get(teacher_id, 0) >> slot & 1)
+        problems += subject.lower() not in [s.lower() for s in teacher_subjects[teacher_id]]
+        grades.add((grade, slot))
+        teachers.add((teacher_id, slot))
+        per_day[(teacher_id, slot // PERIODS)] += 1
+    problems += sum(count > max_per_day for count in per_day.values())
+    placed = Counter((grade, subject) for grade, subject, _, _ in result["lessons"])
+    missing = Counter({(u["grade"], u["subject"]): u["lessons"] for u in result["unplaced"]})
+    problems += sum(placed[(grade, subject)] + missing[(grade, subject)] != count
+                    for grade, subjects in curriculum.items() for subject, count in subjects.items())
+    return problems
+
+
+def run_solver(args):
+    from utils.timetable_solver import TimetableInfeasible, solve_timetable
+
+    runs = []
+    for school_seed in range(args.seeds):
+        curriculum, teacher_subjects, unavailable = build_school(args, random.Random(school_seed))
+        blocked = {t: sum(1 << (day * PERIODS + period) for day, period in slots) for t, slots in unavailable.items()}
+        run = {"seed": school_seed}
+        for name, repair in (("greedy_only", False), ("with_repair", True)):
+            try:
+                result = solve_timetable(curriculum, teacher_subjects, len(DAYS), PERIODS, blocked, None,
+                                         args.max_per_day, args.budget, repair=repair)
+            except TimetableInfeasible as e:
+                run[name] = {"infeasible": e.problems[:5]}
+                continue
+            run[name] = {
+                "seconds": round(result["seconds"], 3),
+                "placed": len(result["lessons"]),
+                "unplaced": sum(u["lessons"] for u in result["unplaced"]),
+                "iterations": result["iterations"],
+                "ejections": result["ejections"],
+                "timed_out": result["timed_out"],
+                "violations": violations(result, curriculum, teacher_subjects, blocked, args.max_per_day),
+            }
+        runs.append(run)
+    return runs
+
+
+async def run_endpoint(args):
+    database = configure_store(None, args.latency_ms / 1000)
+    import httpx
+    import server
+    from config.indexes import ensure_indexes
+    from utils.security import create_access_token
+
+    await ensure_indexes(database.db)
+    fixture = (await seed(database, 1, 1, 1, 0, random.Random(0)))[0]
+    tenant_id = fixture["admin"]["tenant_id"]
+    curriculum, teacher_subjects, unavailable = build_school(args, random.Random(0))
+    await database.db.teachers.delete_many({"tenant_id": tenant_id})
+    await database.db.teachers.insert_many([{
+        "id": teacher_id, "tenant_id": tenant_id, "first_name": "Teacher", "last_name": str(index),
+        "email": f"teacher{index}@example.com", "subjects": subjects, "qualification": "BEd",
+        "created_at": "2024-01-01T00:00:00+00:00", "is_active": True,
+    } for index, (teacher_id, subjects) in enumerate(teacher_subjects.items())])
+    operations = database.client.operations
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': fixture['admin']['id']}, timedelta(hours=1))}"}
+    body = {
+        "grades": [{"grade": grade, "subjects": subjects} for grade, subjects in curriculum.items()],
+        "days": DAYS,
+        "periods_per_day": PERIODS,
+        "teacher_unavailable": {t: [{"day": DAYS[day], "period": period + 1} for day, period in slots]
+                                for t, slots in unavailable.items()},
+        "max_teacher_periods_per_day": args.max_per_day,
+        "time_budget_seconds": args.budget,
+    }
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://timetable", timeout=None) as http:
+        for name, replace in (("generate", False), ("regenerate_replace", True)):
+            before = sum(operations.values())
+            start = time.perf_counter()
+            response = await http.post("/api/timetable/generate", headers=headers, json={**body, "replace": replace})
+            elapsed = time.perf_counter() - start
+            summary = response.json()
+            results[name] = {"status": response.status_code, "seconds": round(elapsed, 2),
+                             "mongo_commands": sum(operations.values()) - before}
+            if response.status_code == 200:
+                results[name].update({key: summary[key] for key in ("created", "replaced", "lessons", "ejections")})
+                results[name]["solver_seconds"] = summary["seconds"]
+            else:
+                results[name]["detail"] = summary.get("detail")
+    results["stored_entries"] = await database.db.timetable.count_documents({"tenant_id": tenant_id})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classes", type=int, default=60)
+    parser.add_argument("--teachers", type=int, default=120)
+    parser.add_argument("--seeds", type=int, default=3, help="Schools to solve directly")
+    parser.add_argument("--max-per-day", type=int, default=6, help="Most periods a teacher teaches a day")
+    parser.add_argument("--extra-unavailable", type=float, default=0.0, help="Share of teachers unavailable for a second half-day")
+    parser.add_argument("--budget", type=float, default=10.0, help="Solver time budget in seconds")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated Mongo round trip")
+    args = parser.parse_args()
+    results = {"classes": args.classes, "teachers": args.teachers, "lessons_per_week": args.classes * sum(SUBJECTS.values()),
+               "solver": run_solver(args), "endpoint": asyncio.run(run_endpoint(args))}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
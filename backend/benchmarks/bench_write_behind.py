@@ -0,0 +1,113 @@
+"""Insert throughput and latency with and without write-behind batching.
+
+Simulates roll call: --writers concurrent callers each insert --per-writer
+attendance documents back to back, awaiting acknowledgement every time (the
+way mark_attendance does). Runs once with plain insert_one and once per
+batch window. Uses the in-memory Motor stand-in with a simulated round trip,
+or a real server with --mongo-url. The in-memory store only models the round
+trip, not per-command server cost, so it shows the latency added by each
+window and the drop in insert commands; use --mongo-url for throughput.
+Run from backend/:
+
+    python -m benchmarks.bench_write_behind
+    python -m benchmarks.bench_write_behind --mongo-url mongodb://localhost:27017 --windows 1,2,5,10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from utils.write_behind import WriteBehindWriter
+
+BENCH_DB_NAME = "edupro_bench_write_behind"
+
+
+def attendance_doc(writer, i):
+    return {
+        "id": str(uuid.uuid4()), "tenant_id": "bench-tenant", "student_id": f"s{writer}-{i}",
+        "date": "2026-01-01", "status": "present", "notes": None, "created_at": "2026-01-01T08:30:00+00:00",
+    }
+
+
+async def run_case(collection, insert, writers, per_writer):
+    latencies = []
+
+    async def writer(w):
+        for i in range(per_writer):
+            start = time.perf_counter()
+            await insert(collection, attendance_doc(w, i))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[writer(w) for w in range(writers)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "documents": len(latencies),
+        "docs_per_second": round(len(latencies) / elapsed),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+async def run(args):
+    if args.mongo_url:
+        from config.database import create_client
+        client = create_client(args.mongo_url)
+        await client.drop_database(BENCH_DB_NAME)
+    else:
+        from benchmarks.memory_motor import MemoryClient
+        client = MemoryClient(latency=args.latency_ms / 1000)
+    database = client[BENCH_DB_NAME]
+
+    def insert_commands():
+        if args.mongo_url:
+            from utils.metrics import mongo_commands_total
+            return mongo_commands_total._values.get(("insert", "success"), 0)
+        return client.operations.get("insert", 0)
+
+    async def count_inserts(case):
+        before = insert_commands()
+        result = await case
+        result["insert_commands"] = insert_commands() - before
+        return result
+
+    async def insert_one(collection, document):
+        await collection.insert_one(document)
+
+    results = {"insert_one": await count_inserts(
+        run_case(database.attendance_plain, insert_one, args.writers, args.per_writer))}
+    for window in args.windows:
+        writer = WriteBehindWriter(window, args.max_batch)
+        results[f"write_behind_{window:g}ms"] = await count_inserts(
+            run_case(database[f"attendance_{window:g}"], writer.insert, args.writers, args.per_writer))
+        await writer.flush()
+
+    if args.mongo_url:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+    return {
+        "store": "mongo" if args.mongo_url else f"memory ({args.latency_ms}ms round trip)",
+        "writers": args.writers,
+        "max_batch": args.max_batch,
+        "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", help="Benchmark against a real server instead of the in-memory store")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated round trip of the in-memory store")
+    parser.add_argument("--writers", type=int, default=200)
+    parser.add_argument("--per-writer", type=int, default=25)
+    parser.add_argument("--max-batch", type=int, default=500)
+    parser.add_argument("--windows", type=lambda value: [float(w) for w in value.split(",")], default=[1, 2, 5, 10, 25],
+                        help="Comma-separated batch windows in milliseconds")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Cold-start import report and budget check for `import server`.
+
+Runs `python -X importtime -c "import server"` in a fresh interpreter,
+aggregates the self time of every imported module by top-level package and
+prints the heaviest ones. With --budget-ms the script exits 1 when the total
+import time exceeds the budget, so CI can enforce it. Run from backend/:
+
+    python -m benchmarks.cold_start --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def measure(runs):
+    """Return (total_us, {package: self_us}, {module: cumulative_us}) for the fastest of `runs`"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "edupro_cold_start")
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import server"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise SystemExit(f"import server failed:\n{result.stderr[-2000:]}")
+        packages, modules = {}, {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            module = name.strip()
+            package = module.split(".")[0]
+            packages[package] = packages.get(package, 0) + int(self_us)
+            # Nesting is shown as two spaces per level; `server` itself is level 0
+            if (len(name) - len(name.lstrip()) - 1) // 2 == 1:
+                modules[module] = int(cumulative_us)
+        total = sum(packages.values())
+        if best is None or total < best[0]:
+            best = (total, packages, modules)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, help="Fail when `import server` takes longer than this")
+    parser.add_argument("--runs", type=int, default=3, help="Take the fastest of this many cold interpreters")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    total, packages, modules = measure(args.runs)
+    report = {
+        "import_server_ms": round(total / 1000, 1),
+        "budget_ms": args.budget_ms,
+        "by_package_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        },
+        "direct_imports_cumulative_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(modules.items(), key=lambda item: -item[1])[:args.top]
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.budget_ms is not None and total / 1000 > args.budget_ms:
+        print(f"import server took {total / 1000:.0f}ms, over the {args.budget_ms:.0f}ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""Offline load test for the EduPro API.
+
+Boots server.app in-process (httpx ASGI transport, no network) against either
+the in-memory Motor stand-in or a local mongod, seeds synthetic tenants and
+replays a weighted mix of realistic workloads. Prints per-endpoint RPS and
+p50/p95/p99 latency as JSON so runs can be diffed across commits.
+
+Run from backend/:
+    python -m benchmarks.loadtest --tenants 2 --students 500 --operations 2000
+    python -m benchmarks.loadtest --mongo-url mongodb://localhost:27017 --output before.json
+    python -m benchmarks.loadtest --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+BENCH_DB_NAME = "edupro_loadtest"
+PASSWORD = "loadtest-password"
+
+
+def configure_store(mongo_url, latency):
+    """Point config.database at the chosen store before the routers import it"""
+    os.environ["DB_NAME"] = BENCH_DB_NAME
+    if mongo_url:
+        os.environ["MONGO_URL"] = mongo_url
+    import config.database as database
+    if not mongo_url:
+        from benchmarks.memory_motor import MemoryClient
+        database.client = MemoryClient(latency=latency)
+        database.db = database.client[BENCH_DB_NAME]
+        database.reporting_db = database.reporting_database(database.db)
+    return database
+
+
+class FakeWebSocket:
+    """Counts frames pushed by ConnectionManager instead of writing to a socket"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.frames += 1
+        self.bytes += len(json.dumps(data))
+
+    async def send_text(self, data):
+        self.frames += 1
+        self.bytes += len(data)
+
+
+def _iso(day):
+    return day.isoformat()
+
+
+async def seed(database, tenants, students_per_tenant, teachers_per_tenant, history_days, rng):
+    """Insert synthetic tenants directly into the store and return login fixtures"""
+    from utils.security import get_password_hash
+
+    db = database.db
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc).isoformat()
+    today = date.today()
+    fixtures = []
+
+    for t in range(tenants):
+        tenant_id = str(uuid.uuid4())
+        await db.schools.insert_one({
+            "id": str(uuid.uuid4()), "tenant_id": tenant_id, "name": f"Load Test School {t}",
+            "address": "1 Bench Street", "contact_email": f"school{t}@example.com",
+            "contact_phone": "000", "created_at": now, "is_active": True,
+        })
+
+        def user(role, email, name):
+            return {
+                "id": str(uuid.uuid4()), "email": email, "full_name": name, "role": role,
+                "tenant_id": tenant_id, "hashed_password": hashed_password,
+                "created_at": now, "is_active": True,
+            }
+
+        admin = user("school_admin", f"admin{t}@example.com", f"Admin {t}")
+        teacher_users = [user("teacher", f"teacher{t}-{i}@example.com", f"Teacher {i}") for i in range(teachers_per_tenant)]
+        students = []
+        for i in range(students_per_tenant):
+            students.append({
+                "id": str(uuid.uuid4()), "tenant_id": tenant_id, "first_name": f"Student{i}",
+                "last_name": f"T{t}", "email": f"student{t}-{i}@example.com", "grade": str(1 + i % 12),
+                "date_of_birth": "2012-04-01", "parent_email": f"parent{t}-{i}@example.com",
+                "created_at": now, "is_active": True,
+            })
+        student_users = [user("student", s["email"], f"{s['first_name']} {s['last_name']}") for s in students]
+        await db.users.insert_many([admin] + teacher_users + student_users)
+        await db.students.insert_many(students)
+        await db.teachers.insert_many([{
+            "id": str(uuid.uuid4()), "tenant_id": tenant_id, "first_name": u["full_name"], "last_name": f"T{t}",
+            "email": u["email"], "subjects": ["Math", "Science"], "qualification": "MSc",
+            "created_at": now, "is_active": True,
+        } for u in teacher_users])
+
+        assignments = [{
+            "id": str(uuid.uuid4()), "tenant_id": tenant_id, "title": f"Homework {i}", "description": "Bench",
+            "due_date": _iso(today + timedelta(days=i % 14)), "subject": "Math", "teacher_id": teacher_users[0]["id"],
+            "grade": str(1 + i % 12), "max_score": 100.0, "created_at": now,
+        } for i in range(24)]
+        await db.assignments.insert_many(assignments)
+
+        attendance = []
+        for day_offset in range(history_days):
+            day = _iso(today - timedelta(days=day_offset))
+            for s in students:
+                attendance.append({
+                    "id": str(uuid.uuid4()), "tenant_id": tenant_id, "student_id": s["id"], "date": day,
+                    "status": "present" if rng.random() < 0.93 else "absent", "notes": None, "created_at": now,
+                })
+        if attendance:
+            await db.attendance.insert_many(attendance)
+
+        await db.grades.insert_many([{
+            "id": str(uuid.uuid4()), "tenant_id": tenant_id, "assignment_id": a["id"], "student_id": s["id"],
+            "score": float(rng.randint(40, 100)), "feedback": None, "created_at": now,
+        } for s in students for a in assignments if a["grade"] == s["grade"]][:students_per_tenant * 4])
+
+        await db.fees.insert_many([{
+            "id": str(uuid.uuid4()), "tenant_id": tenant_id, "student_id": s["id"], "amount": 250.0,
+            "due_date": _iso(today + timedelta(days=30)), "description": "Term fee",
+            "status": "pending", "created_at": now, "paid_date": None,
+        } for s in students])
+
+        fixtures.append({
+            "tenant_id": tenant_id,
+            "admin": admin,
+            "teachers": teacher_users,
+            "students": students,
+            "student_users": student_users,
+        })
+    return fixtures
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, label, seconds, ok):
+        self.latencies.setdefault(label, []).append(seconds)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, elapsed):
+        def percentile(values, q):
+            if len(values) == 1:
+                return values[0]
+            return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            values.sort()
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(statistics.fmean(values) * 1000, 3),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {"total_requests": total, "elapsed_s": round(elapsed, 3), "rps": round(total / elapsed, 2)}, endpoints
+
+
+async def run(args):
+    database = configure_store(args.mongo_url, args.latency_ms / 1000)
+    import httpx
+    import server
+    from utils.security import create_access_token
+    from utils.websocket import manager
+
+    if args.mongo_url:
+        await database.client.drop_database(BENCH_DB_NAME)
+    rng = random.Random(args.seed)
+    fixtures = await seed(database, args.tenants, args.students, args.teachers, args.history_days, rng)
+    await server.app.router.startup()
+
+    tokens = {}
+    for fixture in fixtures:
+        for user in [fixture["admin"]] + fixture["teachers"] + fixture["student_users"]:
+            tokens[user["id"]] = create_access_token({"sub": user["id"]}, timedelta(hours=1))
+
+    # WebSocket fan-out: every student user holds one live connection
+    sockets = []
+    for fixture in fixtures:
+        for student_user in fixture["student_users"][:args.websockets]:
+            socket = FakeWebSocket()
+            await manager.connect(socket, student_user["id"], fixture["tenant_id"])
+            sockets.append(socket)
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=server.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as http:
+        async def call(label, method, url, user=None, **kwargs):
+            headers = {"Authorization": f"Bearer {tokens[user['id']]}"} if user else {}
+            start = time.perf_counter()
+            response = await http.request(method, url, headers=headers, **kwargs)
+            if method == "GET" and response.status_code == 200:
+                await response.aread()
+            recorder.record(label, time.perf_counter() - start, response.status_code < 400)
+
+        async def login_burst(fixture, worker_rng):
+            user = worker_rng.choice(fixture["student_users"] + fixture["teachers"])
+            await call("POST /api/auth/login", "POST", "/api/auth/login", json={"email": user["email"], "password": PASSWORD})
+
+        async def roll_call(fixture, worker_rng):
+            student = worker_rng.choice(fixture["students"])
+            await call("POST /api/attendance", "POST", "/api/attendance", worker_rng.choice(fixture["teachers"]), json={
+                "student_id": student["id"], "date": date.today().isoformat(), "status": "present",
+            })
+
+        async def dashboard_polling(fixture, worker_rng):
+            await call("GET /api/dashboard/stats", "GET", "/api/dashboard/stats", fixture["admin"])
+
+        async def student_list(fixture, worker_rng):
+            await call("GET /api/students", "GET", "/api/students", fixture["admin"])
+
+        async def notifications_poll(fixture, worker_rng):
+            await call("GET /api/notifications", "GET", "/api/notifications", worker_rng.choice(fixture["student_users"]))
+
+        async def report_export(fixture, worker_rng):
+            start = (date.today() - timedelta(days=args.history_days)).isoformat()
+            await call("GET /api/reports/attendance", "GET", f"/api/reports/attendance?start_date={start}", fixture["admin"])
+
+        async def assignment_fanout(fixture, worker_rng):
+            await call("POST /api/assignments", "POST", "/api/assignments", worker_rng.choice(fixture["teachers"]), json={
+                "title": "Load test", "description": "Fan-out", "due_date": date.today().isoformat(),
+                "subject": "Math", "teacher_id": fixture["teachers"][0]["id"],
+                "grade": worker_rng.choice(fixture["students"])["grade"], "max_score": 100.0,
+            })
+
+        workloads = [
+            (login_burst, args.weight_login),
+            (roll_call, args.weight_roll_call),
+            (dashboard_polling, args.weight_dashboard),
+            (student_list, args.weight_lists),
+            (notifications_poll, args.weight_lists),
+            (report_export, args.weight_reports),
+            (assignment_fanout, args.weight_fanout),
+        ]
+        functions = [w for w, weight in workloads if weight > 0]
+        weights = [weight for _, weight in workloads if weight > 0]
+
+        remaining = [args.operations]
+
+        async def worker(index):
+            worker_rng = random.Random(args.seed * 1000 + index)
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                workload = worker_rng.choices(functions, weights)[0]
+                await workload(worker_rng.choice(fixtures), worker_rng)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(i) for i in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+
+    await server.app.router.shutdown()
+
+    overall, endpoints = recorder.summary(elapsed)
+    overall["websocket_frames"] = sum(s.frames for s in sockets)
+    overall["websocket_bytes"] = sum(s.bytes for s in sockets)
+    overall["db_operations"] = dict(sorted(getattr(database.client, "operations", {}).items()))
+    return {"meta": _meta(args), "overall": overall, "endpoints": endpoints}
+
+
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    config["store"] = "mongod" if args.mongo_url else "memory"
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": config,
+    }
+
+
+def compare(previous, current):
+    """Per-endpoint deltas against a previous run's JSON"""
+    deltas = {}
+    for label, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(label)
+        if not before:
+            continue
+        deltas[label] = {
+            key: f"{(stats[key] - before[key]) / before[key] * 100:+.1f}%"
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms") if before[key]
+        }
+    return {"against": previous.get("meta", {}).get("commit"), "endpoints": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", help="Use a real mongod instead of the in-memory stand-in (database is dropped first)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated round-trip latency for the in-memory store")
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--students", type=int, default=300, help="Students per tenant")
+    parser.add_argument("--teachers", type=int, default=20, help="Teachers per tenant")
+    parser.add_argument("--history-days", type=int, default=10, help="Days of attendance history to seed")
+    parser.add_argument("--websockets", type=int, default=300, help="Live notification sockets per tenant")
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--weight-login", type=float, default=2)
+    parser.add_argument("--weight-roll-call", type=float, default=40)
+    parser.add_argument("--weight-dashboard", type=float, default=25)
+    parser.add_argument("--weight-lists", type=float, default=15)
+    parser.add_argument("--weight-reports", type=float, default=2)
+    parser.add_argument("--weight-fanout", type=float, default=3)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(json.load(f), report)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
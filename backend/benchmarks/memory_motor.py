@@ -0,0 +1,548 @@
+"""In-memory stand-in for the subset of the Motor API the routers use.
+
+Good enough to boot server.app without a mongod for load tests: documents
+live in Python lists, every operation yields to the event loop once (plus an
+optional simulated round-trip latency) and is counted on the client and
+reported to utils.metrics.MongoCommandMetrics, the listener real clients
+use, so per-request command counts and metrics match a real deployment.
+It does not implement indexes, transactions or the full query language.
+"""
+import asyncio
+import copy
+import itertools
+import re
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from utils.metrics import mongo_command_listener
+
+_object_ids = itertools.count(1)
+_MISSING = object()
+
+
+def _get(document, path):
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _compare(value, operator, operand):
+    if operator == "$eq":
+        return value == operand or (isinstance(value, list) and operand in value)
+    if operator == "$ne":
+        return not _compare(value, "$eq", operand)
+    if operator == "$in":
+        if not isinstance(value, list):
+            return value in operand
+        return any(_compare(value, "$eq", item) for item in operand)
+    if operator == "$nin":
+        return not _compare(value, "$in", operand)
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator == "$regex":
+        return isinstance(value, str) and re.search(operand, value) is not None
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise NotImplementedError(f"Query operator {operator} is not supported by the in-memory store")
+
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+            continue
+        value = _get(document, key)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items() if op != "$options"):
+                return False
+        elif not _compare(None if value is _MISSING else value, "$eq", condition):
+            return False
+    return True
+
+
+def project(document, projection):
+    if not projection:
+        return copy.deepcopy(document)
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        result = {k: copy.deepcopy(document[k]) for k in fields if k in document}
+    else:
+        result = {k: copy.deepcopy(v) for k, v in document.items() if k not in fields}
+    if include_id and "_id" in document:
+        result["_id"] = document["_id"]
+    elif not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def _sort_key(spec):
+    def key(document):
+        values = []
+        for field, direction in spec:
+            value = _get(document, field)
+            present = value is not _MISSING and value is not None
+            values.append((present, value if present else 0))
+        return values
+    return key
+
+
+def sort_documents(documents, spec):
+    for field, direction in reversed(spec):
+        documents.sort(key=_sort_key([(field, direction)]), reverse=direction < 0)
+    return documents
+
+
+def apply_update(document, update, inserting=False):
+    for operator, fields in update.items():
+        if operator == "$set" or (operator == "$setOnInsert" and inserting):
+            for key, value in fields.items():
+                document[key] = copy.deepcopy(value)
+        elif operator == "$inc":
+            for key, value in fields.items():
+                document[key] = document.get(key, 0) + value
+        elif operator == "$unset":
+            for key in fields:
+                document.pop(key, None)
+        elif operator == "$push":
+            for key, value in fields.items():
+                document.setdefault(key, []).append(copy.deepcopy(value))
+        elif operator == "$max":
+            for key, value in fields.items():
+                if key not in document or document[key] < value:
+                    document[key] = value
+        elif operator != "$setOnInsert":
+            raise NotImplementedError(f"Update operator {operator} is not supported by the in-memory store")
+
+
+class MemoryCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = list(key) if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def _results(self):
+        documents = [d for d in self._collection.documents if matches(d, self._query)]
+        if self._sort:
+            sort_documents(documents, self._sort)
+        documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [project(d, self._projection) for d in documents]
+
+    async def to_list(self, length=None):
+        await self._collection.round_trip("find")
+        results = self._results()
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await self._collection.round_trip("find")
+        if self._sort or self._skip or self._limit:
+            documents = self._results()
+        else:
+            # Project lazily, like a real cursor holds one batch at a time
+            documents = (project(d, self._projection) for d in list(self._collection.documents) if matches(d, self._query))
+        for document in documents:
+            yield document
+
+
+class MemoryCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.documents = []
+        self.unique_keys = []
+        # tuple(keys) -> partialFilterExpression of a partial unique index
+        self.unique_filters = {}
+        # Hashed unique-key values, rebuilt after anything but an insert may have changed them
+        self._unique_values = None
+
+    @property
+    def full_name(self):
+        return f"{self.database.name}.{self.name}"
+
+    async def round_trip(self, operation):
+        self.database.client.operations[operation] = self.database.client.operations.get(operation, 0) + 1
+        if operation in ("update", "delete", "findAndModify", "bulkWrite"):
+            self._unique_values = None
+        latency = self.database.client.latency
+        await asyncio.sleep(latency)
+        mongo_command_listener.succeeded(SimpleNamespace(command_name=operation, duration_micros=int(latency * 1e6)))
+
+    def _check_unique(self, document, ignore=None):
+        if ignore is None and self.unique_keys:
+            try:
+                return self._check_unique_hashed(document)
+            except TypeError:
+                # Unhashable key values (lists, dicts): fall back to a scan
+                self._unique_values = None
+        for keys in self.unique_keys:
+            if not self._indexed_by(document, tuple(keys)):
+                continue
+            values = [document.get(k) for k in keys]
+            for existing in self.documents:
+                if existing is not ignore and self._indexed_by(existing, tuple(keys)) and [existing.get(k) for k in keys] == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {keys}")
+
+    def _indexed_by(self, document, keys):
+        partial = self.unique_filters.get(keys)
+        return partial is None or matches(document, partial)
+
+    def _check_unique_hashed(self, document):
+        if self._unique_values is None:
+            self._unique_values = {tuple(keys): set() for keys in self.unique_keys}
+            for existing in self.documents:
+                for keys, seen in self._unique_values.items():
+                    if self._indexed_by(existing, keys):
+                        seen.add(tuple(existing.get(k) for k in keys))
+        values = {keys: tuple(document.get(k) for k in keys) for keys in self._unique_values if self._indexed_by(document, keys)}
+        for keys, value in values.items():
+            if value in self._unique_values[keys]:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {list(keys)}")
+        for keys, value in values.items():
+            self._unique_values[keys].add(value)
+
+    def _insert(self, document):
+        document.setdefault("_id", f"oid{next(_object_ids)}")
+        self._check_unique(document)
+        self.documents.append(copy.deepcopy(document))
+
+    async def create_index(self, keys, unique=False, **kwargs):
+        await self.round_trip("createIndexes")
+        fields = [keys] if isinstance(keys, str) else [k for k, _ in keys]
+        if unique and fields not in self.unique_keys:
+            self.unique_keys.append(fields)
+            if kwargs.get("partialFilterExpression"):
+                self.unique_filters[tuple(fields)] = kwargs["partialFilterExpression"]
+            self._unique_values = None
+        return "_".join(fields)
+
+    async def insert_one(self, document):
+        await self.round_trip("insert")
+        self._insert(document)
+        return SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents, ordered=True):
+        await self.round_trip("insert")
+        errors = []
+        for index, document in enumerate(documents):
+            try:
+                self._insert(document)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            inserted = (errors[0]["index"] if ordered else len(documents)) - (0 if ordered else len(errors))
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in documents], acknowledged=True)
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self, query, projection)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        await self.round_trip("find")
+        documents = [d for d in self.documents if matches(d, query or {})]
+        if sort:
+            sort_documents(documents, sort)
+        return project(documents[0], projection) if documents else None
+
+    async def count_documents(self, query, **kwargs):
+        await self.round_trip("aggregate")
+        count = sum(1 for d in self.documents if matches(d, query))
+        if kwargs.get("limit"):
+            count = min(count, kwargs["limit"])
+        return count
+
+    async def estimated_document_count(self):
+        await self.round_trip("count")
+        return len(self.documents)
+
+    async def distinct(self, key, query=None):
+        await self.round_trip("distinct")
+        values = []
+        for document in self.documents:
+            if matches(document, query or {}):
+                value = _get(document, key)
+                if value is not _MISSING and value not in values:
+                    values.append(value)
+        return values
+
+    def _update(self, query, update, upsert, many):
+        matched = [d for d in self.documents if matches(d, query)]
+        if not many:
+            matched = matched[:1]
+        for document in matched:
+            apply_update(document, update)
+        upserted_id = None
+        if not matched and upsert:
+            document = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            apply_update(document, update, inserting=True)
+            self._insert(document)
+            upserted_id = document["_id"]
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched), upserted_id=upserted_id)
+
+    async def update_one(self, query, update, upsert=False):
+        await self.round_trip("update")
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query, update, upsert=False):
+        await self.round_trip("update")
+        return self._update(query, update, upsert, many=True)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        await self.round_trip("update")
+        for index, document in enumerate(self.documents):
+            if matches(document, query):
+                replacement = copy.deepcopy(replacement)
+                replacement["_id"] = document["_id"]
+                self.documents[index] = replacement
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            self._insert(copy.deepcopy(replacement))
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False, return_document=False):
+        await self.round_trip("findAndModify")
+        documents = [d for d in self.documents if matches(d, query)]
+        if sort:
+            sort_documents(documents, sort)
+        if not documents:
+            if not upsert:
+                return None
+            document = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            apply_update(document, update, inserting=True)
+            self._insert(document)
+            return project(document, projection) if return_document else None
+        document = documents[0]
+        before = project(document, projection)
+        apply_update(document, update)
+        return project(document, projection) if return_document else before
+
+    async def find_one_and_delete(self, query, projection=None):
+        await self.round_trip("findAndModify")
+        for document in self.documents:
+            if matches(document, query):
+                self.documents.remove(document)
+                return project(document, projection)
+        return None
+
+    async def delete_one(self, query):
+        await self.round_trip("delete")
+        for document in self.documents:
+            if matches(document, query):
+                self.documents.remove(document)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query):
+        await self.round_trip("delete")
+        remaining = [d for d in self.documents if not matches(d, query)]
+        deleted = len(self.documents) - len(remaining)
+        self.documents = remaining
+        return SimpleNamespace(deleted_count=deleted)
+
+    async def bulk_write(self, requests, ordered=True):
+        """Apply pymongo write models (InsertOne, UpdateOne, ...) in one round trip"""
+        await self.round_trip("bulkWrite")
+        counts = {"inserted_count": 0, "matched_count": 0, "modified_count": 0, "deleted_count": 0, "upserted_count": 0}
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self._insert(request._doc)
+                counts["inserted_count"] += 1
+            elif kind in ("UpdateOne", "UpdateMany"):
+                result = self._update(request._filter, request._doc, request._upsert, many=kind == "UpdateMany")
+                counts["matched_count"] += result.matched_count
+                counts["modified_count"] += result.modified_count
+                counts["upserted_count"] += result.upserted_id is not None
+            elif kind in ("DeleteOne", "DeleteMany"):
+                matched = [d for d in self.documents if matches(d, request._filter)]
+                for document in matched[:1] if kind == "DeleteOne" else matched:
+                    self.documents.remove(document)
+                    counts["deleted_count"] += 1
+            else:
+                raise NotImplementedError(f"{kind} is not supported by the in-memory store")
+        return SimpleNamespace(acknowledged=True, **counts)
+
+    def aggregate(self, pipeline):
+        return MemoryAggregation(self, pipeline)
+
+
+class MemoryAggregation:
+    """Supports $match, $sort, $skip, $limit, $project (inclusion), $group, $count and $facet"""
+
+    def __init__(self, collection, pipeline):
+        self._collection = collection
+        self._pipeline = pipeline
+
+    async def to_list(self, length=None):
+        await self._collection.round_trip("aggregate")
+        documents, pipeline = self._collection.documents, self._pipeline
+        if pipeline and "$match" in pipeline[0]:
+            # Filter before copying, as a leading $match would use an index
+            documents = [d for d in documents if matches(d, pipeline[0]["$match"])]
+            pipeline = pipeline[1:]
+        results = run_pipeline(copy.deepcopy(documents), pipeline)
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in await self.to_list():
+            yield document
+
+
+def _accumulate(operator, values):
+    values = [v for v in values if v is not _MISSING]
+    if operator == "$sum":
+        return sum(values)
+    if operator == "$max":
+        return max(values) if values else None
+    if operator == "$min":
+        return min(values) if values else None
+    if operator == "$first":
+        return values[0] if values else None
+    if operator == "$push":
+        return values
+    raise NotImplementedError(f"Accumulator {operator} is not supported by the in-memory store")
+
+
+def _evaluate(document, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get(document, expression[1:])
+    return expression
+
+
+def run_pipeline(documents, pipeline):
+    for stage in pipeline:
+        (operator, spec), = stage.items()
+        if operator == "$match":
+            documents = [d for d in documents if matches(d, spec)]
+        elif operator == "$sort":
+            documents = sort_documents(documents, list(spec.items()))
+        elif operator == "$skip":
+            documents = documents[spec:]
+        elif operator == "$limit":
+            documents = documents[:spec]
+        elif operator == "$project":
+            documents = [project(d, spec) for d in documents]
+        elif operator == "$count":
+            documents = [{spec: len(documents)}] if documents else []
+        elif operator == "$facet":
+            documents = [{name: run_pipeline(copy.deepcopy(documents), sub) for name, sub in spec.items()}]
+        elif operator == "$group":
+            groups = {}
+            for document in documents:
+                key = _evaluate(document, spec["_id"])
+                if isinstance(spec["_id"], dict):
+                    key = tuple((k, _evaluate(document, v)) for k, v in spec["_id"].items())
+                groups.setdefault(key, []).append(document)
+            grouped = []
+            for key, members in groups.items():
+                result = {"_id": dict(key) if isinstance(key, tuple) else key}
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    (op, expression), = accumulator.items()
+                    result[field] = _accumulate(op, [_evaluate(m, expression) for m in members])
+                grouped.append(result)
+            documents = grouped
+        else:
+            raise NotImplementedError(f"Pipeline stage {operator} is not supported by the in-memory store")
+    return documents
+
+
+class MemoryDatabase:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def command(self, command, *args, **kwargs):
+        await self[next(iter(command)) if isinstance(command, dict) else command].round_trip("command")
+        return {"ok": 1.0}
+
+    async def list_collection_names(self):
+        return [name for name, collection in self._collections.items() if collection.documents]
+
+
+class MemoryClient:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.operations = {}
+        self._databases = {}
+
+    def __getitem__(self, name):
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def get_database(self, name, **kwargs):
+        return self[name]
+
+    @property
+    def admin(self):
+        return self["admin"]
+
+    def close(self):
+        pass
@@ -0,0 +1,228 @@
+"""Microbenchmarks for hot helpers, checked against stored baselines.
+
+Each round times every case right after a fixed pure-Python calibration
+loop and records the ratio of the two, with the garbage collector off.
+The stored number is the median ratio over all rounds, so it is roughly
+comparable across machines and drift in CPU speed during the run cancels
+out. Each pass runs in --processes child interpreters with fixed, distinct
+hash seeds, since dict layout alone moves the fan-out cases by ~15%
+between processes, and the median across them is used. A case fails
+when that exceeds the baseline by more than its own tolerance in
+baselines.json (--tolerance for new cases); cheap cases that allocate
+heavily need more headroom than steady arithmetic. Run from backend/:
+
+    python -m benchmarks.microbench                 # compare, exit 1 on regression
+    python -m benchmarks.microbench --update        # rewrite baselines.json, keeping tolerances
+    python -m benchmarks.microbench -k broadcast    # only matching cases
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+
+class FakeWebSocket:
+    __slots__ = ("frames",)
+
+    def __init__(self):
+        self.frames = 0
+
+    async def send_json(self, data):
+        self.frames += 1
+
+
+def _calibration():
+    total = 0
+    for i in range(200_000):
+        total += i * i % 7
+    return total
+
+
+def _connections(manager, tenants, per_tenant):
+    manager.active_connections.clear()
+    for t in range(tenants):
+        for u in range(per_tenant):
+            manager.active_connections[f"tenant-{t}:user-{u}"] = [FakeWebSocket()]
+
+
+def build_cases():
+    """Return {name: (setup, run)}; run() is timed, setup() is not"""
+    from routers.students import build_student_doc
+    from routers.teachers import build_teacher_doc
+    from utils.exports import csv_chunks
+    from utils.security import create_access_token, decode_token
+    from utils.websocket import ConnectionManager
+
+    token = create_access_token({"sub": "bench-user"}, timedelta(minutes=30))
+    notification = {
+        "id": "n1", "title": "New Assignment", "message": "Algebra worksheet due Friday",
+        "type": "assignment", "user_id": "user-0", "tenant_id": "tenant-0", "read": False,
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+    attendance_rows = [
+        {"id": f"a{i}", "tenant_id": "t", "student_id": f"s{i % 500}", "date": "2026-01-01",
+         "status": "present", "notes": None, "created_at": "2026-01-01T08:30:00+00:00"}
+        for i in range(10_000)
+    ]
+    student_rows = [
+        {"first_name": f"First{i}", "last_name": f"Last{i}", "email": f"s{i}@example.com",
+         "grade": "7", "date_of_birth": "2012-01-01", "parent_email": f"p{i}@example.com"}
+        for i in range(1_000)
+    ]
+    teacher_rows = [
+        {"first_name": f"First{i}", "last_name": f"Last{i}", "email": f"t{i}@example.com",
+         "subjects": "Math;Physics", "qualification": "MSc"}
+        for i in range(1_000)
+    ]
+    manager = ConnectionManager()
+    loop = asyncio.new_event_loop()
+
+    def run_async(coro_factory):
+        return lambda: loop.run_until_complete(coro_factory())
+
+    async def personal_x1000():
+        for _ in range(1000):
+            await manager.send_personal_notification(notification, "user-0", "tenant-0")
+
+    async def broadcast():
+        await manager.broadcast_to_tenant(notification, "tenant-0")
+
+    async def attendance_stream():
+        for row in attendance_rows:
+            yield row
+
+    async def export_csv():
+        return [chunk async for chunk in csv_chunks(attendance_stream())]
+
+    return {
+        "create_access_token_x1000": (
+            None, lambda: [create_access_token({"sub": "bench-user"}, timedelta(minutes=30)) for _ in range(1000)]),
+        "decode_token_x1000": (
+            None, lambda: [decode_token(token) for _ in range(1000)]),
+        "send_personal_notification_x1000_at_10k": (
+            lambda: _connections(manager, 10, 1000), run_async(personal_x1000)),
+        "broadcast_to_tenant_1k_of_10k": (
+            lambda: _connections(manager, 10, 1000), run_async(broadcast)),
+        "broadcast_to_tenant_10k_of_10k": (
+            lambda: _connections(manager, 1, 10_000), run_async(broadcast)),
+        "exports_csv_chunks_10k": (
+            None, run_async(export_csv)),
+        "bulk_import_student_rows_1k": (
+            None, lambda: [build_student_doc(row, "t") for row in student_rows]),
+        "bulk_import_teacher_rows_1k": (
+            None, lambda: [build_teacher_doc(row, "t", True) for row in teacher_rows]),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def measure(cases, rounds):
+    """Median case/calibration ratio per case, with case and calibration timed back to back"""
+    ratios = {name: [] for name in cases}
+    calibrations = []
+    for name, (setup, run) in cases.items():
+        if setup:
+            setup()
+        run()
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(rounds):
+            for name, (setup, run) in cases.items():
+                # The broadcast cases share one ConnectionManager; restore this case's connections
+                if setup:
+                    setup()
+                gc.collect()
+                gc.disable()
+                calibration = timed(_calibration)
+                seconds = timed(run)
+                gc.enable()
+                calibrations.append(calibration)
+                ratios[name].append((seconds, seconds / calibration))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    medians = {}
+    for name, samples in ratios.items():
+        medians[name] = {
+            "ms": statistics.median(seconds for seconds, _ in samples) * 1000,
+            "normalized": statistics.median(ratio for _, ratio in samples),
+        }
+    return statistics.median(calibrations), medians
+
+
+def measure_in_processes(args):
+    """Run measure() in child interpreters with hash seeds 0..processes-1; median per case"""
+    command = [sys.executable, "-m", "benchmarks.microbench", "--child", "--rounds", str(args.rounds)]
+    if args.pattern:
+        command += ["-k", args.pattern]
+    runs = []
+    for seed in range(args.processes):
+        env = {**os.environ, "PYTHONHASHSEED": str(seed)}
+        output = subprocess.run(command, env=env, cwd=Path(__file__).parent.parent, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+    medians = {
+        name: {key: statistics.median(run["cases"][name][key] for run in runs) for key in ("ms", "normalized")}
+        for name in runs[0]["cases"]
+    }
+    return statistics.median(run["calibration"] for run in runs), medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="Store the current results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=0.30,
+                        help="Allowed slowdown for cases without a stored tolerance (0.30 = 30%%)")
+    parser.add_argument("--rounds", type=int, default=21)
+    parser.add_argument("--processes", type=int, default=3, help="Child interpreters to take the median over")
+    parser.add_argument("-k", dest="pattern", help="Only run cases whose name contains this string")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        cases = {name: case for name, case in build_cases().items() if not args.pattern or args.pattern in name}
+        calibration, medians = measure(cases, args.rounds)
+        print(json.dumps({"calibration": calibration, "cases": medians}))
+        return 0
+
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    calibration, medians = measure_in_processes(args)
+
+    results, regressions = {}, []
+    for name, measured in medians.items():
+        results[name] = {"ms": round(measured["ms"], 3), "normalized": round(measured["normalized"], 4)}
+        if name in baselines:
+            change = measured["normalized"] / baselines[name]["normalized"] - 1
+            tolerance = baselines[name].get("tolerance", args.tolerance)
+            results[name].update({"change": f"{change * 100:+.1f}%", "tolerance": f"{tolerance * 100:.0f}%"})
+            if change > tolerance:
+                regressions.append(name)
+
+    print(json.dumps({"calibration_ms": round(calibration * 1000, 3), "cases": results, "regressions": regressions}, indent=2))
+
+    if args.update:
+        for name, result in results.items():
+            baselines[name] = {
+                "normalized": result["normalized"],
+                "tolerance": baselines.get(name, {}).get("tolerance", args.tolerance),
+            }
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Check which replica-set member serves each endpoint's Mongo commands.
+
+Needs a real replica set; a single-machine one is enough:
+
+    for i in 0 1 2; do mkdir -p /tmp/rs$i; mongod --replSet rs0 --port 2701$i --dbpath /tmp/rs$i --bind_ip localhost --fork --logpath /tmp/rs$i.log; done
+    mongosh --port 27010 --eval 'rs.initiate({_id: "rs0", members: [{_id: 0, host: "localhost:27010"}, {_id: 1, host: "localhost:27011"}, {_id: 2, host: "localhost:27012"}]})'
+
+Then, from backend/:
+
+    python -m benchmarks.read_routing --mongo-url "mongodb://localhost:27010,localhost:27011,localhost:27012/?replicaSet=rs0"
+
+The script enables SECONDARY_READS_ENABLED, calls a few endpoints through the
+app and reports, per route, which members answered. Reporting and dashboard
+reads should land on secondaries; writes and the auth lookup (the `users`
+find in every route) on the primary.
+Exits 1 if a write or read-after-write route touched a secondary.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import monitoring
+
+DB_NAME = "edupro_read_routing"
+
+
+class AddressRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.by_route = {}
+
+    def started(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def succeeded(self, event):
+        from utils.request_context import get_request_context
+
+        context = get_request_context()
+        if context is None:
+            return
+        host, port = event.connection_id
+        self.by_route.setdefault(context.route, []).append((event.command_name, f"{host}:{port}"))
+
+
+async def run(mongo_url):
+    os.environ.update({"MONGO_URL": mongo_url, "DB_NAME": DB_NAME, "SECONDARY_READS_ENABLED": "true"})
+    recorder = AddressRecorder()
+    monitoring.register(recorder)
+
+    import httpx
+    import server
+    from config.database import client, db
+    from utils.security import create_access_token
+
+    await client.drop_database(DB_NAME)
+    tenant_id = str(uuid.uuid4())
+    admin_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    await db.users.insert_one({
+        "id": admin_id, "email": "admin@example.com", "full_name": "Admin", "role": "school_admin",
+        "tenant_id": tenant_id, "hashed_password": "x", "created_at": now, "is_active": True,
+    })
+    # Give secondaries a moment to replicate the seed data
+    await asyncio.sleep(2)
+
+    await server.app.router.startup()
+    primary = "%s:%s" % client.primary
+    token = create_access_token({"sub": admin_id}, timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://routing") as http:
+        await http.post("/api/students", headers=headers, json={
+            "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+            "grade": "7", "date_of_birth": "2012-01-01",
+        })
+        await http.get("/api/students", headers=headers)
+        await http.get("/api/dashboard/stats", headers=headers)
+        await http.get("/api/reports/students", headers=headers)
+    await server.app.router.shutdown()
+
+    report, violations = {}, []
+    for route, commands in recorder.by_route.items():
+        members = sorted({address for _, address in commands})
+        report[route] = {
+            "commands": [name for name, _ in commands],
+            "members": members,
+            "on_primary": [address == primary for address in members],
+        }
+    for route in ("/api/students",):
+        if any(address != primary for _, address in recorder.by_route.get(route, [])):
+            violations.append(route)
+    print(json.dumps({"primary": primary, "routes": report, "violations": violations}, indent=2))
+    return 1 if violations else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", required=True, help="Replica set connection string")
+    args = parser.parse_args()
+    return asyncio.run(run(args.mongo_url))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Mongo round trips per request, checked against a per-endpoint budget.
+
+Boots server.app against the in-memory Motor stand-in (see loadtest.py),
+calls each budgeted endpoint and reads the commands it sent before the
+response from http_request_db_operations, which MongoCommandMetrics feeds
+per request. Work handed to run_in_background is drained and reported
+separately, since it no longer delays the response. Each endpoint is
+called once to warm the per-worker caches (tenant route, admin list) and
+then measured. tests/test_round_trips.py runs the same check under pytest;
+this script prints the full report and exits 1 when an endpoint exceeds
+its budget. Run from backend/:
+
+    python -m benchmarks.round_trips
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import timedelta
+
+from benchmarks.loadtest import configure_store, seed
+
+# Steady-state budgets; every authenticated request spends one on the user lookup
+BUDGETS = {
+    "PUT /api/fees/{fee_id}/pay": 2,
+    "PUT /api/students/{student_id}": 2,
+    "GET /api/students/{student_id}": 2,
+    # Commands, not latency: the six queries after the user lookup run in two concurrent waves
+    "GET /api/students/{student_id}/overview": 7,
+    "POST /api/attendance": 2,
+    "POST /api/grades": 2,
+    "GET /api/students": 2,
+    "GET /api/fees": 2,
+    "GET /api/notifications": 2,
+    "GET /api/notifications/unread-count": 2,
+    "GET /api/dashboard/stats": 6,
+}
+
+
+def build_calls(fixture):
+    """Return {endpoint: [request kwargs for the warm-up call, then the measured call]}"""
+    students = fixture["students"]
+    student = students[0]
+    student_update = {key: student[key] for key in ("first_name", "last_name", "email", "grade", "date_of_birth", "parent_email")}
+
+    def fee_payment(index):
+        return {"method": "PUT", "url": f"/api/fees/{fixture['fee_ids'][index]}/pay"}
+
+    return {
+        "PUT /api/fees/{fee_id}/pay": [fee_payment(0), fee_payment(1)],
+        "PUT /api/students/{student_id}": [
+            {"method": "PUT", "url": f"/api/students/{student['id']}", "json": {**student_update, "grade": "8"}},
+            {"method": "PUT", "url": f"/api/students/{student['id']}", "json": {**student_update, "grade": "9"}},
+        ],
+        "GET /api/students/{student_id}": [{"method": "GET", "url": f"/api/students/{student['id']}"}] * 2,
+        "GET /api/students/{student_id}/overview": [{"method": "GET", "url": f"/api/students/{student['id']}/overview"}] * 2,
+        "POST /api/attendance": [
+            {"method": "POST", "url": "/api/attendance", "json": {"student_id": s["id"], "date": "2026-02-02", "status": "present"}}
+            for s in students[:2]
+        ],
+        "POST /api/grades": [
+            {"method": "POST", "url": "/api/grades", "json": {"assignment_id": "bench", "student_id": s["id"], "score": 90.0}}
+            for s in students[:2]
+        ],
+        "GET /api/students": [{"method": "GET", "url": "/api/students"}] * 2,
+        "GET /api/fees": [{"method": "GET", "url": "/api/fees"}] * 2,
+        "GET /api/notifications": [{"method": "GET", "url": "/api/notifications"}] * 2,
+        "GET /api/notifications/unread-count": [{"method": "GET", "url": "/api/notifications/unread-count"}] * 2,
+        "GET /api/dashboard/stats": [{"method": "GET", "url": "/api/dashboard/stats"}] * 2,
+    }
+
+
+async def measure_round_trips(students=20):
+    """Return ({endpoint: report}, [endpoints over budget]); the store must already be configured"""
+    import config.database as database
+    import httpx
+    import server
+    from utils.background import drain_background_tasks
+    from utils.metrics import http_request_db_operations
+    from utils.security import create_access_token
+
+    fixture = (await seed(database, 1, students, 2, 1, random.Random(0)))[0]
+    fixture["fee_ids"] = [fee["id"] for fee in await database.db.fees.find({"tenant_id": fixture["tenant_id"]}).to_list(2)]
+    await server.app.router.startup()
+    operations = database.client.operations
+    token = create_access_token({"sub": fixture["admin"]["id"]}, timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    report, over_budget = {}, []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://round-trips") as http:
+            for endpoint, calls in build_calls(fixture).items():
+                method, route = endpoint.split(" ", 1)
+                for call in calls:
+                    before, (_, observed_before) = dict(operations), http_request_db_operations.totals((method, route))
+                    response = await http.request(headers=headers, **call)
+                    in_request, (_, observed) = dict(operations), http_request_db_operations.totals((method, route))
+                    await drain_background_tasks()
+                    after = dict(operations)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{endpoint} returned {response.status_code}: {response.text}")
+                round_trips = int(observed - observed_before)
+                report[endpoint] = {
+                    "round_trips": round_trips,
+                    "budget": BUDGETS[endpoint],
+                    "commands": {name: in_request[name] - before.get(name, 0) for name in in_request if in_request[name] != before.get(name, 0)},
+                    "background_round_trips": sum(after.values()) - sum(in_request.values()),
+                }
+                if round_trips > BUDGETS[endpoint]:
+                    over_budget.append(endpoint)
+    finally:
+        await server.app.router.shutdown()
+    return report, over_budget
+
+
+async def run(args):
+    configure_store(None, 0)
+    report, over_budget = await measure_round_trips(args.students)
+    print(json.dumps({"endpoints": report, "over_budget": over_budget}, indent=2))
+    return 1 if over_budget else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=20)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
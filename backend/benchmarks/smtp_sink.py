@@ -0,0 +1,95 @@
+"""Minimal local SMTP server that accepts and discards mail, for benchmarks and tests.
+
+Speaks enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP,
+QUIT), waits `latency` seconds before answering each message as a real
+relay would, and answers a `fail_rate` share of messages with a temporary
+451 so retries can be exercised. Replies queued in `replies` (e.g. "550
+No such user") answer the next messages first, for deterministic tests.
+Counts connections, accepted and rejected messages, and keeps the
+accepted messages' raw data.
+"""
+import asyncio
+import random
+
+
+class SMTPSink:
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.recipients = []
+        self.messages = []
+        self.replies = []
+        self.server = None
+        self.port = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = await asyncio.start_server(self._session, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 smtp-sink ready")
+        recipients = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("latin-1").strip()
+                verb = command[:4].upper()
+                if verb == "EHLO":
+                    writer.write(b"250-smtp-sink\r\n250-8BITMIME\r\n")
+                    await reply("250 SMTPUTF8")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.split(":", 1)[1].strip(" <>"))
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    while (line := await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        data.append(line)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    scripted = self.replies.pop(0) if self.replies else None
+                    if scripted is None and self.random.random() < self.fail_rate:
+                        scripted = "451 Temporary failure, try again later"
+                    if scripted is not None and not scripted.startswith("2"):
+                        self.rejected += 1
+                        await reply(scripted)
+                    else:
+                        self.accepted += 1
+                        self.recipients.extend(recipients)
+                        self.messages.append(b"".join(data))
+                        await reply(scripted or "250 Queued")
+                    recipients = []
+                elif verb in ("RSET", "NOOP"):
+                    recipients = [] if verb == "RSET" else recipients
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,15 +1,87 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Secondary, SecondaryPreferred
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from config.settings import (
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_COMPRESSORS,
+    MONGO_WARMUP_CONNECTIONS, HEALTH_CHECK_TIMEOUT_MS,
+    SECONDARY_READS_ENABLED, SECONDARY_READ_PREFERENCE, READ_MAX_STALENESS_SECONDS,
+)
+from config.indexes import ensure_indexes
+from utils.metrics import mongo_command_listener, MongoPoolMetrics
+from utils.slow_queries import slow_query_monitor
 
 ROOT_DIR = Path(__file__).parent.parent
 load_dotenv(ROOT_DIR / '.env')
 
+logger = logging.getLogger(__name__)
+
+def create_client(url: str) -> AsyncIOMotorClient:
+    """Build a Motor client with the configured pool settings and monitoring listeners"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    listeners = [mongo_command_listener, slow_query_monitor, MongoPoolMetrics(MONGO_MAX_POOL_SIZE)]
+    return AsyncIOMotorClient(url, event_listeners=listeners, **options)
+
+# Creating the client does no I/O; connections are opened and warmed in
+# start_database() from the app's startup hook and released in close_database().
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = create_client(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+_READ_PREFERENCES = {"secondary": Secondary, "secondaryPreferred": SecondaryPreferred, "nearest": Nearest}
+
+def reporting_database(database):
+    """Staleness-tolerant view of `database` for read-only reporting and dashboard endpoints.
+
+    With SECONDARY_READS_ENABLED these reads go to secondaries no more than
+    READ_MAX_STALENESS_SECONDS behind the primary. Writes and read-after-write
+    paths must keep using the primary `db`.
+    """
+    if not SECONDARY_READS_ENABLED:
+        return database
+    # The server rejects maxStalenessSeconds below 90
+    max_staleness = max(READ_MAX_STALENESS_SECONDS, 90) if READ_MAX_STALENESS_SECONDS > 0 else -1
+    read_preference = _READ_PREFERENCES[SECONDARY_READ_PREFERENCE](max_staleness=max_staleness)
+    return database.with_options(read_preference=read_preference)
+
+reporting_db = reporting_database(db)
+
+async def warm_up(mongo_client, connections: int):
+    """Open `connections` pooled connections up front so early requests skip the handshake"""
+    await mongo_client.admin.command("ping")
+    if connections > 1:
+        await asyncio.gather(*[mongo_client.admin.command("ping") for _ in range(connections)])
+
+async def start_database():
+    try:
+        await warm_up(client, max(MONGO_MIN_POOL_SIZE, MONGO_WARMUP_CONNECTIONS))
+        logger.info("Database connection pool warmed up")
+        await ensure_indexes(db)
+    except Exception as e:
+        # Keep booting; /health reports the worker as not ready until Mongo is reachable
+        logger.error(f"Database warm-up failed: {e}")
+    slow_query_monitor.start(client)
+
+async def ping_database() -> bool:
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), HEALTH_CHECK_TIMEOUT_MS / 1000)
+        return True
+    except Exception:
+        return False
+
 async def get_database():
     return db
 
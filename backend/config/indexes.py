@@ -0,0 +1,77 @@
+from config.settings import NOTIFICATION_READ_TTL_DAYS, EMAIL_SENT_RETENTION_DAYS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# collection -> [(keys, options)], created in the shared database at startup
+# and in each dedicated tenant database the first time it is routed to.
+INDEXES = {
+    "notifications": [
+        ([("user_id", 1), ("created_at", 1)], {"name": "user_created_at"}),
+        # Archive job scans by age
+        ([("created_at", 1)], {"name": "created_at"}),
+    ] + ([
+        # TTL only applies to documents whose read_at is a date, i.e. read notifications
+        ([("read_at", 1)], {"name": "read_at_ttl", "expireAfterSeconds": NOTIFICATION_READ_TTL_DAYS * 86400}),
+    ] if NOTIFICATION_READ_TTL_DAYS > 0 else []),
+    "notification_counters": [
+        ([("user_id", 1)], {"name": "user_id_unique", "unique": True}),
+        # Announcements bump every counter in the tenant
+        ([("tenant_id", 1)], {"name": "tenant_id"}),
+    ],
+    "announcement_reads": [
+        ([("user_id", 1), ("announcement_id", 1)], {"name": "user_announcement_unique", "unique": True}),
+    ],
+    "collection_versions": [
+        ([("tenant_id", 1), ("collection", 1)], {"name": "tenant_collection_unique", "unique": True}),
+    ],
+    "report_jobs": [
+        ([("id", 1)], {"name": "id_unique", "unique": True}),
+    ],
+    "email_outbox": [
+        # Worker claim scan: due pending messages, then expired leases
+        ([("status", 1), ("next_attempt_at", 1)], {"name": "status_next_attempt_at"}),
+        ([("status", 1), ("locked_until", 1)], {"name": "status_locked_until"}),
+        # Claim sweep over the batch's recipients
+        ([("to", 1), ("status", 1)], {"name": "to_status"}),
+        ([("claim", 1)], {"name": "claim", "sparse": True}),
+        # Only sent messages have sent_at; failed ones stay for inspection
+        ([("sent_at", 1)], {"name": "sent_at_ttl", "expireAfterSeconds": EMAIL_SENT_RETENTION_DAYS * 86400}),
+    ],
+    # No teacher and no grade booked twice in one slot; also serves GET /timetable?grade=&day=
+    "timetable": [
+        ([("tenant_id", 1), ("grade", 1), ("day", 1), ("period", 1)], {"name": "tenant_grade_slot_unique", "unique": True}),
+        ([("tenant_id", 1), ("teacher_id", 1), ("day", 1), ("period", 1)], {"name": "tenant_teacher_slot_unique", "unique": True}),
+    ],
+    # Per-student lookups: the ?student_id= list filters and GET /students/{id}/overview
+    "attendance": [
+        ([("tenant_id", 1), ("student_id", 1), ("date", -1)], {"name": "tenant_student_date"}),
+    ],
+    "grades": [
+        ([("tenant_id", 1), ("student_id", 1), ("created_at", -1)], {"name": "tenant_student_created_at"}),
+    ],
+    "fees": [
+        ([("tenant_id", 1), ("student_id", 1), ("due_date", 1)], {"name": "tenant_student_due_date"}),
+        # Overdue scheduler: pending fees past their due date, across tenants
+        ([("status", 1), ("due_date", 1)], {"name": "status_due_date"}),
+        ([("overdue_run", 1)], {"name": "overdue_run", "sparse": True}),
+        # One fee per student and term from POST /fees/generate; fees without a term_key are not covered
+        ([("tenant_id", 1), ("student_id", 1), ("term_key", 1)], {
+            "name": "tenant_student_term_unique", "unique": True,
+            "partialFilterExpression": {"term_key": {"$exists": True}},
+        }),
+    ],
+    "assignments": [
+        ([("tenant_id", 1), ("grade", 1), ("due_date", 1)], {"name": "tenant_grade_due_date"}),
+    ],
+}
+
+async def ensure_indexes(database):
+    """Create the indexes in INDEXES; createIndexes is a no-op for ones that already exist"""
+    for collection, indexes in INDEXES.items():
+        for keys, options in indexes:
+            try:
+                await database[collection].create_index(keys, **options)
+            except Exception as e:
+                # An index with the same name but different options needs a manual migration
+                logger.error(f"Could not create index {options.get('name')} on {database.name}.{collection}: {e}")
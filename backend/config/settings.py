@@ -10,3 +10,85 @@ ALGORITHM = os.environ.get('ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
+FAST_RESPONSES = os.environ.get('FAST_RESPONSES', 'false').lower() == 'true'
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', '0.1'))
+SLOW_QUERY_BUFFER_SIZE = int(os.environ.get('SLOW_QUERY_BUFFER_SIZE', '200'))
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', str(ROOT_DIR / 'logs' / 'slow_queries.log'))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', '5'))
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+PROFILE_DIR = os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'logs' / 'profiles'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+PROFILE_MAX_CONCURRENT = int(os.environ.get('PROFILE_MAX_CONCURRENT', '2'))
+# Comma-separated "<path prefix>=<percent>" pairs, e.g. "/api/reports/grades=5"
+PROFILE_SAMPLE_ROUTES = {
+    path.strip(): float(percent)
+    for path, percent in (
+        item.split('=', 1) for item in os.environ.get('PROFILE_SAMPLE_ROUTES', '').split(',') if '=' in item
+    )
+}
+PRELOAD_HEAVY_MODULES = os.environ.get('PRELOAD_HEAVY_MODULES', 'false').lower() == 'true'
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0')) or None
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0')) or None
+# e.g. "zstd,snappy,zlib"; zstd and snappy need the zstandard / python-snappy packages
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', '0'))
+HEALTH_CHECK_TIMEOUT_MS = int(os.environ.get('HEALTH_CHECK_TIMEOUT_MS', '1000'))
+SECONDARY_READS_ENABLED = os.environ.get('SECONDARY_READS_ENABLED', 'false').lower() == 'true'
+SECONDARY_READ_PREFERENCE = os.environ.get('SECONDARY_READ_PREFERENCE', 'secondaryPreferred')
+READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS', '90'))
+TENANT_ROUTE_CACHE_SECONDS = float(os.environ.get('TENANT_ROUTE_CACHE_SECONDS', '60'))
+WRITE_BEHIND_ENABLED = os.environ.get('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+WRITE_BEHIND_MAX_DELAY_MS = float(os.environ.get('WRITE_BEHIND_MAX_DELAY_MS', '5'))
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', '500'))
+TENANT_ADMIN_CACHE_SECONDS = float(os.environ.get('TENANT_ADMIN_CACHE_SECONDS', '300'))
+NOTIFICATION_REPLAY_LIMIT = int(os.environ.get('NOTIFICATION_REPLAY_LIMIT', '500'))
+# Read notifications are deleted this long after being read (0 disables the TTL index).
+# Keep it above NOTIFICATION_ARCHIVE_AFTER_DAYS so the archive job sees them first.
+NOTIFICATION_READ_TTL_DAYS = int(os.environ.get('NOTIFICATION_READ_TTL_DAYS', '180'))
+NOTIFICATION_ARCHIVE_AFTER_DAYS = int(os.environ.get('NOTIFICATION_ARCHIVE_AFTER_DAYS', '90'))
+NOTIFICATION_ARCHIVE_DIR = os.environ.get('NOTIFICATION_ARCHIVE_DIR', str(ROOT_DIR / 'archive' / 'notifications'))
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_ARCHIVE_BATCH_SIZE', '1000'))
+# Merge a user's notifications of one type within this window into one WebSocket frame (0 = off)
+NOTIFICATION_DIGEST_WINDOW_MS = float(os.environ.get('NOTIFICATION_DIGEST_WINDOW_MS', '0'))
+NOTIFICATION_DIGEST_STORE = os.environ.get('NOTIFICATION_DIGEST_STORE', 'false').lower() == 'true'
+# zlib level for gzip report exports (1 = fastest, 9 = smallest)
+EXPORT_GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', '6'))
+# Background report jobs (POST /api/reports/jobs); artifacts are shared by the workers of one host
+REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', '2'))
+REPORT_JOB_QUEUE_SIZE = int(os.environ.get('REPORT_JOB_QUEUE_SIZE', '100'))
+REPORT_ARTIFACT_DIR = os.environ.get('REPORT_ARTIFACT_DIR', str(ROOT_DIR / 'archive' / 'reports'))
+REPORT_ARTIFACT_MAX_MB = int(os.environ.get('REPORT_ARTIFACT_MAX_MB', '2048'))
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', '20'))
+# Outbound email (utils.email_outbox); leaving SMTP_HOST empty disables email entirely
+SMTP_HOST = os.environ.get('SMTP_HOST', '')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME', '')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', 'true').lower() == 'true'
+SMTP_TIMEOUT_SECONDS = float(os.environ.get('SMTP_TIMEOUT_SECONDS', '30'))
+SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'no-reply@edupro.local')
+EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', '2'))
+EMAIL_SMTP_POOL_SIZE = int(os.environ.get('EMAIL_SMTP_POOL_SIZE', '2'))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '100'))
+# Messages to one recipient queued within this window go out as one email
+EMAIL_GROUP_WINDOW_SECONDS = float(os.environ.get('EMAIL_GROUP_WINDOW_SECONDS', '30'))
+EMAIL_POLL_INTERVAL_SECONDS = float(os.environ.get('EMAIL_POLL_INTERVAL_SECONDS', '2'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '6'))
+EMAIL_RETRY_BASE_SECONDS = float(os.environ.get('EMAIL_RETRY_BASE_SECONDS', '30'))
+EMAIL_LEASE_SECONDS = float(os.environ.get('EMAIL_LEASE_SECONDS', '300'))
+EMAIL_SENT_RETENTION_DAYS = int(os.environ.get('EMAIL_SENT_RETENTION_DAYS', '7'))
+# Pending fees past their due date are marked overdue this often by every worker (0 disables)
+FEE_OVERDUE_INTERVAL_SECONDS = float(os.environ.get('FEE_OVERDUE_INTERVAL_SECONDS', '3600'))
+FEE_OVERDUE_BATCH_SIZE = int(os.environ.get('FEE_OVERDUE_BATCH_SIZE', '1000'))
+# Fee documents per insert_many when generating term fees
+FEE_GENERATION_CHUNK_SIZE = int(os.environ.get('FEE_GENERATION_CHUNK_SIZE', '1000'))
+# Most entries accepted by one POST /api/timetable/bulk upload
+TIMETABLE_BULK_MAX_ENTRIES = int(os.environ.get('TIMETABLE_BULK_MAX_ENTRIES', '5000'))
+# Default and most search time for POST /api/timetable/generate
+TIMETABLE_SOLVER_BUDGET_SECONDS = float(os.environ.get('TIMETABLE_SOLVER_BUDGET_SECONDS', '10'))
@@ -0,0 +1,81 @@
+from config.database import db, mongo_url, create_client, reporting_database
+from config.indexes import ensure_indexes
+from config.settings import TENANT_ROUTE_CACHE_SECONDS
+from typing import Dict, Optional, Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tenant-scoped collections that follow a tenant to its dedicated database.
+# users, schools and tenant_routes always stay in the shared database because
+# they are read before the tenant is known (login, token lookup).
+TENANT_COLLECTIONS = [
+    "students", "teachers", "assignments", "grades", "attendance", "fees", "timetable", "notifications",
+    "announcement_reads", "notification_counters", "collection_versions", "report_jobs",
+]
+
+class TenantRouter:
+    """Resolves the database holding a tenant's collections.
+
+    Routes live in the shared `tenant_routes` collection as
+    {tenant_id, db_name, uri?}; tenants without a route use the shared
+    database. Lookups are cached per worker for TENANT_ROUTE_CACHE_SECONDS,
+    so a route change takes at most that long to reach every worker.
+    """
+
+    def __init__(self, shared_db, shared_url: str):
+        self.shared_db = shared_db
+        self.shared_url = shared_url
+        self._clients = {}
+        self._indexed = set()
+        self._cache: Dict[Optional[str], Tuple[float, object]] = {}
+
+    async def get_database(self, tenant_id: Optional[str]):
+        if tenant_id is None:
+            return self.shared_db
+        cached = self._cache.get(tenant_id)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        route = await self.shared_db.tenant_routes.find_one({"tenant_id": tenant_id}, {"_id": 0})
+        database = self._resolve(route) if route else self.shared_db
+        if database is not self.shared_db and (route.get("uri"), route["db_name"]) not in self._indexed:
+            await ensure_indexes(database)
+            self._indexed.add((route.get("uri"), route["db_name"]))
+        self._cache[tenant_id] = (now + TENANT_ROUTE_CACHE_SECONDS, database)
+        return database
+
+    async def get_reporting_database(self, tenant_id: Optional[str]):
+        return reporting_database(await self.get_database(tenant_id))
+
+    async def databases(self) -> list:
+        """The shared database plus every dedicated tenant database, each once"""
+        databases = {self.shared_db.name: self.shared_db}
+        async for route in self.shared_db.tenant_routes.find({}, {"_id": 0, "tenant_id": 1}):
+            database = await self.get_database(route["tenant_id"])
+            databases.setdefault(database.name, database)
+        return list(databases.values())
+
+    def _resolve(self, route: dict):
+        uri = route.get("uri") or self.shared_url
+        if uri == self.shared_url:
+            return self.shared_db.client[route["db_name"]]
+        if uri not in self._clients:
+            self._clients[uri] = create_client(uri)
+            logger.info(f"Opened dedicated Mongo client for tenant database {route['db_name']}")
+        return self._clients[uri][route["db_name"]]
+
+    def invalidate(self, tenant_id: Optional[str] = None):
+        if tenant_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(tenant_id, None)
+
+    def close(self):
+        for dedicated_client in self._clients.values():
+            dedicated_client.close()
+        self._clients.clear()
+
+tenant_router = TenantRouter(db, mongo_url)
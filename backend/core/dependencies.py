@@ -1,23 +1,43 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from config.database import db
+from config.tenants import tenant_router
 from utils.security import decode_token
+from utils.request_context import get_request_context
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# ASGI scope key under which POST /api/batch hands its sub-requests the user it
+# already authenticated. Only set in-process; clients cannot reach the scope.
+AUTHENTICATED_USER_SCOPE_KEY = "edupro.authenticated_user"
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    user_id = decode_token(token)
-    if user_id is None:
-        raise credentials_exception
-    
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = request.scope.get(AUTHENTICATED_USER_SCOPE_KEY)
     if user is None:
-        raise credentials_exception
+        user_id = decode_token(token)
+        if user_id is None:
+            raise credentials_exception
+        
+        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        if user is None:
+            raise credentials_exception
+    
+    context = get_request_context()
+    if context is not None:
+        context.tenant_id = user.get("tenant_id")
     
     return user
+
+async def get_tenant_db(current_user: dict = Depends(get_current_user)):
+    """Database holding the current user's tenant-scoped collections"""
+    return await tenant_router.get_database(current_user.get("tenant_id"))
+
+async def get_tenant_reporting_db(current_user: dict = Depends(get_current_user)):
+    """Staleness-tolerant view of the tenant database for reports and dashboards"""
+    return await tenant_router.get_reporting_database(current_user.get("tenant_id"))
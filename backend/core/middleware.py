@@ -0,0 +1,129 @@
+from utils.metrics import (
+    http_requests_total, http_requests_in_progress, http_request_duration_seconds,
+    http_request_db_operations, http_request_db_seconds,
+)
+from utils.request_context import RequestContext, set_request_context, reset_request_context
+from utils.profiler import RequestProfiler, profile_filename
+from utils.security import decode_token
+from config.database import db
+from config.settings import PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MAX_CONCURRENT, PROFILE_SAMPLE_ROUTES
+from pathlib import Path
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request metrics.
+
+    Labels use the matched route template (e.g. /api/students/{student_id})
+    rather than the raw path so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        context = RequestContext(scope)
+        token = set_request_context(context)
+        http_requests_in_progress.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec((method,))
+            reset_request_context(token)
+            route_path = context.route
+            status = str(status_holder[0])
+            http_requests_total.inc((method, route_path, status))
+            http_request_duration_seconds.observe(elapsed, (method, route_path, status))
+            http_request_db_operations.observe(context.db_operations, (method, route_path))
+            http_request_db_seconds.observe(context.db_seconds, (method, route_path))
+
+class ProfilingMiddleware:
+    """Opt-in statistical profiling of individual requests.
+
+    A request is profiled when a super_admin sends `X-Profile: 1`, or when
+    its path matches PROFILE_SAMPLE_ROUTES and wins the sampling draw.
+    Untriggered requests only pay for a header scan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active >= PROFILE_MAX_CONCURRENT or not await self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        filename = None
+
+        async def send_wrapper(message):
+            nonlocal filename
+            if message["type"] == "http.response.start":
+                # Routing is done by now, so the file can be named after the route template
+                filename = _profile_filename(scope)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", filename.encode())]
+            await send(message)
+
+        self.active += 1
+        profiler = RequestProfiler(PROFILE_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self.active -= 1
+            await asyncio.to_thread(_write_profile, profiler, filename or _profile_filename(scope))
+
+    async def _should_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile" and value in (b"1", b"true"):
+                return await _is_super_admin(scope["headers"])
+        if PROFILE_SAMPLE_ROUTES:
+            path = scope["path"]
+            for prefix, percent in PROFILE_SAMPLE_ROUTES.items():
+                if path.startswith(prefix):
+                    return random.random() * 100 < percent
+        return False
+
+async def _is_super_admin(headers) -> bool:
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            user_id = decode_token(token)
+            if user_id is None:
+                return False
+            user = await db.users.find_one({"id": user_id}, {"_id": 0, "role": 1})
+            return user is not None and user["role"] == "super_admin"
+    return False
+
+def _profile_filename(scope) -> str:
+    route = scope.get("route")
+    return profile_filename(scope["method"], route.path if route is not None else None)
+
+def _write_profile(profiler: RequestProfiler, filename: str):
+    if not profiler.samples:
+        return
+    directory = Path(PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / filename).write_text(profiler.folded())
+    logger.info(f"Request profile written to {directory / filename} ({sum(profiler.samples.values())} samples)")
@@ -1,25 +1,31 @@
 from .user import User, UserCreate, UserLogin
-from .student import Student, StudentCreate
+from .student import Student, StudentCreate, StudentOverview
 from .teacher import Teacher, TeacherCreate
 from .assignment import Assignment, AssignmentCreate
 from .attendance import Attendance, AttendanceCreate
 from .grade import Grade, GradeCreate
-from .timetable import Timetable, TimetableCreate
-from .fee import Fee, FeeCreate
+from .timetable import (Timetable, TimetableCreate, TimetableBulkCreate, TimetableBulkResult, TimetableConflict,
+    TimetableSlot, GradeCurriculum, TimetableGenerate, TimetableTeacherAssignment, TimetableGenerationResult)
+from .fee import Fee, FeeCreate, FeeGenerate, FeeGenerationSummary
 from .school import School, SchoolCreate
-from .notification import Notification, NotificationBase
+from .notification import Notification, NotificationBase, AnnouncementCreate
+from .report import ReportJob, ReportJobCreate
 from .token import Token, TokenData
+from .batch import BatchRequest, BatchSubRequest
 
 __all__ = [
     'User', 'UserCreate', 'UserLogin',
-    'Student', 'StudentCreate',
+    'Student', 'StudentCreate', 'StudentOverview',
     'Teacher', 'TeacherCreate',
     'Assignment', 'AssignmentCreate',
     'Attendance', 'AttendanceCreate',
     'Grade', 'GradeCreate',
-    'Timetable', 'TimetableCreate',
-    'Fee', 'FeeCreate',
+    'Timetable', 'TimetableCreate', 'TimetableBulkCreate', 'TimetableBulkResult', 'TimetableConflict',
+    'TimetableSlot', 'GradeCurriculum', 'TimetableGenerate', 'TimetableTeacherAssignment', 'TimetableGenerationResult',
+    'Fee', 'FeeCreate', 'FeeGenerate', 'FeeGenerationSummary',
     'School', 'SchoolCreate',
-    'Notification', 'NotificationBase',
-    'Token', 'TokenData'
+    'Notification', 'NotificationBase', 'AnnouncementCreate',
+    'ReportJob', 'ReportJobCreate',
+    'Token', 'TokenData',
+    'BatchRequest', 'BatchSubRequest'
 ]
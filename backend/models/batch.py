@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import List
+
+class BatchSubRequest(BaseModel):
+    # An API GET path with optional query string, e.g. "/api/students?grade=5"
+    path: str
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
@@ -11,8 +11,26 @@ class FeeBase(BaseModel):
 class FeeCreate(FeeBase):
     pass
 
+class FeeGenerate(BaseModel):
+    """One fee per active student in `grade`, or in the whole school when grade is omitted"""
+    term_key: str
+    amount: float
+    due_date: str
+    description: str
+    grade: Optional[str] = None
+
+class FeeGenerationSummary(BaseModel):
+    term_key: str
+    grade: Optional[str] = None
+    students: int
+    created: int
+    already_existing: int
+
 class Fee(FeeBase):
     id: str
     tenant_id: str
     created_at: str
     paid_date: Optional[str] = None
+    # Set on fees raised by POST /fees/generate
+    term_key: Optional[str] = None
+    overdue_at: Optional[str] = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 class NotificationBase(BaseModel):
     title: str
@@ -11,3 +12,11 @@ class Notification(NotificationBase):
     id: str
     tenant_id: str
     created_at: str
+    # Set on stored digests (NOTIFICATION_DIGEST_STORE) that stand for several notifications
+    count: int = 1
+    items: Optional[List[dict]] = None
+
+class AnnouncementCreate(BaseModel):
+    title: str
+    message: str
+    type: str = "system"
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+class ReportJobCreate(BaseModel):
+    report: Literal["attendance", "grades", "students"]
+    format: str = "csv"
+    # attendance only
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+class ReportJob(BaseModel):
+    id: str
+    report: str
+    format: str
+    params: dict
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    size: Optional[int] = None
+    cached: bool = False
+    error: Optional[str] = None
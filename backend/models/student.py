@@ -1,5 +1,9 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Dict, List, Optional
+from .assignment import Assignment
+from .attendance import Attendance
+from .fee import Fee
+from .grade import Grade
 
 class StudentBase(BaseModel):
     first_name: str
@@ -17,3 +21,25 @@ class Student(StudentBase):
     tenant_id: str
     created_at: str
     is_active: bool = True
+
+class StudentAttendanceSummary(BaseModel):
+    recent: List[Attendance]
+    # Share of all recorded days marked present; None before the first record
+    rate: Optional[float] = None
+    total: int
+    by_status: Dict[str, int]
+
+class StudentGrade(Grade):
+    assignment_title: str
+    max_score: Optional[float] = None
+
+class StudentFeeSummary(BaseModel):
+    outstanding: List[Fee]
+    total_due: float
+
+class StudentOverview(BaseModel):
+    student: Student
+    attendance: StudentAttendanceSummary
+    grades: List[StudentGrade]
+    fees: StudentFeeSummary
+    upcoming_assignments: List[Assignment]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Dict, List, Optional
 
 class TimetableBase(BaseModel):
     grade: str
@@ -16,3 +17,64 @@ class Timetable(TimetableBase):
     id: str
     tenant_id: str
     created_at: str
+
+class TimetableBulkCreate(BaseModel):
+    """A week (or any set) of entries, validated together; nothing is stored if any entry clashes"""
+    entries: List[TimetableCreate]
+    dry_run: bool = False
+
+class TimetableConflict(BaseModel):
+    kind: str  # "teacher" or "grade"
+    day: str
+    period: int
+    # Position of the clashing entry in the upload; absent for single creates
+    index: Optional[int] = None
+    teacher_id: Optional[str] = None
+    grade: Optional[str] = None
+    # The entry already holding the slot: earlier in the upload, or stored
+    conflicting_index: Optional[int] = None
+    conflicting_id: Optional[str] = None
+
+class TimetableBulkResult(BaseModel):
+    created: int
+    conflicts: List[TimetableConflict]
+
+class TimetableSlot(BaseModel):
+    day: str
+    period: int
+
+class GradeCurriculum(BaseModel):
+    grade: str
+    # Subject name (as in Teacher.subjects) -> periods per week
+    subjects: Dict[str, int]
+
+class TimetableGenerate(BaseModel):
+    """A curriculum to turn into a conflict-free week; teachers come from their subjects"""
+    grades: List[GradeCurriculum]
+    days: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    periods_per_day: int = 8
+    day_start: str = "08:00"
+    period_minutes: int = 45
+    break_minutes: int = 5
+    # Teacher id -> slots they cannot teach
+    teacher_unavailable: Dict[str, List[TimetableSlot]] = {}
+    max_teacher_periods_per_day: Optional[int] = None
+    time_budget_seconds: Optional[float] = None
+    # Replace the grades' stored entries instead of filling around them
+    replace: bool = False
+    dry_run: bool = False
+
+class TimetableTeacherAssignment(BaseModel):
+    grade: str
+    subject: str
+    teacher_id: str
+
+class TimetableGenerationResult(BaseModel):
+    created: int
+    replaced: int
+    lessons: int
+    seconds: float
+    iterations: int
+    ejections: int
+    teacher_assignments: List[TimetableTeacherAssignment]
+    entries: List[TimetableCreate]
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
+from config.settings import PROFILE_DIR
+from core.dependencies import get_current_user
+from utils.slow_queries import slow_query_monitor
+from pathlib import Path
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = 50, collscan_only: bool = False, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] not in ["super_admin", "school_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # School admins only see queries issued on behalf of their own tenant
+    tenant_id = None if current_user["role"] == "super_admin" else current_user["tenant_id"]
+    return {
+        "threshold_ms": slow_query_monitor.threshold_micros / 1000,
+        "queries": slow_query_monitor.latest(min(limit, 500), tenant_id=tenant_id, collscan_only=collscan_only)
+    }
+
+@router.get("/profiles")
+async def list_profiles(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "super_admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    directory = Path(PROFILE_DIR)
+    files = sorted(directory.glob("*.folded"), reverse=True) if directory.is_dir() else []
+    return [{"name": f.name, "size": f.stat().st_size} for f in files[:200]]
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "super_admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    path = Path(PROFILE_DIR) / name
+    if Path(name).name != name or path.suffix != ".folded" or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
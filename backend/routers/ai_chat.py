@@ -2,12 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends
 from models.chat import ChatMessage, ChatResponse
 from core.dependencies import get_current_user
 from config.settings import EMERGENT_LLM_KEY
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 @router.post("/chat", response_model=ChatResponse)
 async def ai_chat(chat_message: ChatMessage, current_user: dict = Depends(get_current_user)):
+    # emergentintegrations pulls in litellm, openai and the Google SDKs; import on first use
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
+    
     try:
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from models import Assignment, AssignmentCreate
 from config.database import db
-from core.dependencies import get_current_user
-from utils.notifications import create_notification
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
+from utils.notifications import notify_users
+from utils.email_outbox import enqueue_emails
+from utils.collection_versions import bump_collection_version
+from utils.background import run_in_background
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
@@ -10,7 +14,7 @@ from datetime import datetime, timezone
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
 @router.post("", response_model=Assignment)
-async def create_assignment(assignment: AssignmentCreate, current_user: dict = Depends(get_current_user)):
+async def create_assignment(assignment: AssignmentCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["teacher", "school_admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -22,11 +26,12 @@ async def create_assignment(assignment: AssignmentCreate, current_user: dict = D
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.assignments.insert_one(assignment_doc)
+    await tenant_db.assignments.insert_one(assignment_doc)
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "assignments"))
     assignment_doc.pop("_id")
     
     # Send notifications to students
-    students = await db.students.find({
+    students = await tenant_db.students.find({
         "tenant_id": current_user["tenant_id"],
         "grade": assignment.grade
     }, {"_id": 0}).to_list(1000)
@@ -37,22 +42,28 @@ async def create_assignment(assignment: AssignmentCreate, current_user: dict = D
         "role": "student"
     }, {"_id": 0}).to_list(1000)
     
-    for student_user in student_users:
-        await create_notification(
-            title="New Assignment",
-            message=f"New assignment '{assignment.title}' for {assignment.subject}. Due: {assignment.due_date}",
-            notification_type="assignment",
-            user_id=student_user["id"],
-            tenant_id=current_user["tenant_id"]
-        )
+    await notify_users(
+        title="New Assignment",
+        message=f"New assignment '{assignment.title}' for {assignment.subject}. Due: {assignment.due_date}",
+        notification_type="assignment",
+        user_ids=[student_user["id"] for student_user in student_users],
+        tenant_id=current_user["tenant_id"]
+    )
+    # Queued durably before responding; outbox workers deliver it
+    await enqueue_emails([{
+        "to": student_user["email"],
+        "subject": f"New assignment: {assignment.title}",
+        "body": f"A new {assignment.subject} assignment '{assignment.title}' has been posted. Due: {assignment.due_date}",
+        "tenant_id": current_user["tenant_id"],
+    } for student_user in student_users])
     
     return assignment_doc
 
 @router.get("", response_model=List[Assignment])
-async def get_assignments(grade: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_assignments(grade: Optional[str] = None, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     query = {"tenant_id": current_user["tenant_id"]}
     if grade:
         query["grade"] = grade
     
-    assignments = await db.assignments.find(query, {"_id": 0}).to_list(1000)
-    return assignments
+    assignments = await tenant_db.assignments.find(query, model_projection(Assignment)).to_list(1000)
+    return list_response(assignments)
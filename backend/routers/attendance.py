@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from models import Attendance, AttendanceCreate
-from config.database import db
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
+from utils.write_behind import insert_document
+from utils.collection_versions import bump_collection_version
+from utils.background import run_in_background
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
@@ -9,7 +12,7 @@ from datetime import datetime, timezone
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
 @router.post("", response_model=Attendance)
-async def mark_attendance(attendance: AttendanceCreate, current_user: dict = Depends(get_current_user)):
+async def mark_attendance(attendance: AttendanceCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["teacher", "school_admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -21,17 +24,18 @@ async def mark_attendance(attendance: AttendanceCreate, current_user: dict = Dep
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.attendance.insert_one(attendance_doc)
+    await insert_document(tenant_db.attendance, attendance_doc)
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "attendance"))
     attendance_doc.pop("_id")
     return attendance_doc
 
 @router.get("", response_model=List[Attendance])
-async def get_attendance(student_id: Optional[str] = None, date: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_attendance(student_id: Optional[str] = None, date: Optional[str] = None, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     query = {"tenant_id": current_user["tenant_id"]}
     if student_id:
         query["student_id"] = student_id
     if date:
         query["date"] = date
     
-    attendance_records = await db.attendance.find(query, {"_id": 0}).to_list(1000)
-    return attendance_records
+    attendance_records = await tenant_db.attendance.find(query, model_projection(Attendance)).to_list(1000)
+    return list_response(attendance_records)
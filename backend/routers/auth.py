@@ -4,6 +4,7 @@ from config.database import db
 from config.settings import ACCESS_TOKEN_EXPIRE_MINUTES
 from utils.security import verify_password, get_password_hash, create_access_token
 from core.dependencies import get_current_user
+from utils.notifications import ADMIN_ROLES, invalidate_tenant_admins
 from datetime import datetime, timezone, timedelta
 import uuid
 
@@ -30,6 +31,8 @@ async def register(user: UserCreate):
     }
     
     await db.users.insert_one(user_doc)
+    if user.role in ADMIN_ROLES:
+        invalidate_tenant_admins(user.tenant_id)
     user_doc.pop("hashed_password")
     user_doc.pop("_id")
     return user_doc
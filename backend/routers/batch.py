@@ -0,0 +1,90 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from core.dependencies import AUTHENTICATED_USER_SCOPE_KEY, get_current_user
+from config.settings import BATCH_MAX_REQUESTS
+from models import BatchRequest
+from urllib.parse import unquote
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Scope keys a sub-request inherits from the batch request
+_INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state", "app")
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"accept-encoding"}
+
+async def dispatch(request: Request, path: str, user: dict):
+    """Run one GET sub-request through the app in-process; returns (status, content type, body)"""
+    path, _, query = path.partition("?")
+    scope = {key: request.scope[key] for key in _INHERITED_SCOPE_KEYS if key in request.scope}
+    scope.update({
+        "method": "GET",
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        # Sub-responses are embedded in the batch body, so no body headers or compression
+        "headers": [(name, value) for name, value in request.scope["headers"] if name not in _DROPPED_HEADERS],
+        AUTHENTICATED_USER_SCOPE_KEY: dict(user),
+    })
+    response = {"status": 500, "content_type": "", "body": []}
+    finished = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect until they are done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            for name, value in message.get("headers", []):
+                if name == b"content-type":
+                    response["content_type"] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+            if not message.get("more_body"):
+                finished.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        # The app has already answered 500; the other sub-requests still count
+        logger.error(f"Batch sub-request GET {path} failed: {e!r}")
+    finished.set()
+    return response["status"], response["content_type"], b"".join(response["body"])
+
+@router.post("")
+async def batch(batch_request: BatchRequest, request: Request, current_user: dict = Depends(get_current_user)):
+    """Run several API GET requests in one call, concurrently, authenticating once.
+
+    Responses come back in request order as {"path", "status", "body"}; JSON
+    bodies are embedded as-is, anything else as a string. A failing
+    sub-request only fails its own entry.
+    """
+    if not batch_request.requests:
+        raise HTTPException(status_code=400, detail="No requests given")
+    if len(batch_request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+    for sub_request in batch_request.requests:
+        if not sub_request.path.startswith("/api/") or sub_request.path.split("?")[0].rstrip("/") == "/api/batch":
+            raise HTTPException(status_code=400, detail=f"Not an API GET path: {sub_request.path}")
+
+    results = await asyncio.gather(*[dispatch(request, r.path, current_user) for r in batch_request.requests])
+
+    # Splice the sub-response JSON in directly instead of parsing and re-encoding it
+    parts = []
+    for sub_request, (status, content_type, body) in zip(batch_request.requests, results):
+        if not content_type.startswith("application/json"):
+            body = json.dumps(body.decode("utf-8", errors="replace")).encode()
+        elif not body:
+            body = b"null"
+        parts.append(b'{"path":' + json.dumps(sub_request.path).encode() + b',"status":' + str(status).encode() + b',"body":' + body + b"}")
+    return Response(b'{"responses":[' + b",".join(parts) + b"]}", media_type="application/json")
@@ -1,28 +1,28 @@
 from fastapi import APIRouter, Depends
-from config.database import db
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_tenant_reporting_db
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/stats")
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_reporting_db)):
     tenant_id = current_user["tenant_id"]
     
-    total_students = await db.students.count_documents({"tenant_id": tenant_id, "is_active": True})
-    total_teachers = await db.teachers.count_documents({"tenant_id": tenant_id, "is_active": True})
-    total_assignments = await db.assignments.count_documents({"tenant_id": tenant_id})
+    total_students = await tenant_db.students.count_documents({"tenant_id": tenant_id, "is_active": True})
+    total_teachers = await tenant_db.teachers.count_documents({"tenant_id": tenant_id, "is_active": True})
+    total_assignments = await tenant_db.assignments.count_documents({"tenant_id": tenant_id})
     
     today = datetime.now(timezone.utc).date().isoformat()
-    present_today = await db.attendance.count_documents({
+    present_today = await tenant_db.attendance.count_documents({
         "tenant_id": tenant_id,
         "date": today,
         "status": "present"
     })
     
-    pending_fees = await db.fees.count_documents({
+    # Overdue fees are still unpaid
+    pending_fees = await tenant_db.fees.count_documents({
         "tenant_id": tenant_id,
-        "status": "pending"
+        "status": {"$in": ["pending", "overdue"]}
     })
     
     return {
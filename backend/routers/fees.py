@@ -1,16 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends
-from models import Fee, FeeCreate
-from config.database import db
-from core.dependencies import get_current_user
-from utils.notifications import create_notification
-from typing import List, Optional
+from models import Fee, FeeCreate, FeeGenerate, FeeGenerationSummary
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
+from utils.notifications import get_tenant_admin_ids, notify_users
+from utils.email_outbox import enqueue_email
+from utils.background import run_in_background
+from config.settings import FEE_GENERATION_CHUNK_SIZE
+from pymongo.errors import BulkWriteError
+from typing import List, Optional, Tuple
 import uuid
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/fees", tags=["fees"])
 
 @router.post("", response_model=Fee)
-async def create_fee(fee: FeeCreate, current_user: dict = Depends(get_current_user)):
+async def create_fee(fee: FeeCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["school_admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -23,51 +27,116 @@ async def create_fee(fee: FeeCreate, current_user: dict = Depends(get_current_us
         "paid_date": None
     }
     
-    await db.fees.insert_one(fee_doc)
+    await tenant_db.fees.insert_one(fee_doc)
     fee_doc.pop("_id")
     return fee_doc
 
+async def insert_fee_chunk(tenant_db, fees: List[dict]) -> Tuple[int, int]:
+    """Insert a chunk of generated fees; returns (created, already existing)"""
+    try:
+        # Unordered, so fees that already exist for the term do not stop the rest
+        await tenant_db.fees.insert_many(fees, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        return len(fees) - len(errors), len(errors)
+    return len(fees), 0
+
+@router.post("/generate", response_model=FeeGenerationSummary)
+async def generate_fees(template: FeeGenerate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    """Raise a term fee for every active student in a grade, or in the whole school.
+
+    Students are streamed and fees inserted FEE_GENERATION_CHUNK_SIZE at a
+    time. Each fee is unique per (tenant, student, term_key), so repeating
+    the call only creates the fees that are still missing.
+    """
+    if current_user["role"] not in ["school_admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    tenant_id = current_user["tenant_id"]
+    query = {"tenant_id": tenant_id, "is_active": {"$ne": False}}
+    if template.grade:
+        query["grade"] = template.grade
+    now = datetime.now(timezone.utc).isoformat()
+    
+    students = created = existing = 0
+    chunk = []
+    async for student in tenant_db.students.find(query, {"_id": 0, "id": 1}).batch_size(FEE_GENERATION_CHUNK_SIZE):
+        students += 1
+        chunk.append({
+            "id": str(uuid.uuid4()),
+            "tenant_id": tenant_id,
+            "student_id": student["id"],
+            "term_key": template.term_key,
+            "amount": template.amount,
+            "due_date": template.due_date,
+            "description": template.description,
+            "status": "pending",
+            "created_at": now,
+            "paid_date": None
+        })
+        if len(chunk) >= FEE_GENERATION_CHUNK_SIZE:
+            inserted, skipped = await insert_fee_chunk(tenant_db, chunk)
+            created, existing, chunk = created + inserted, existing + skipped, []
+    if chunk:
+        inserted, skipped = await insert_fee_chunk(tenant_db, chunk)
+        created, existing = created + inserted, existing + skipped
+    
+    return {
+        "term_key": template.term_key,
+        "grade": template.grade,
+        "students": students,
+        "created": created,
+        "already_existing": existing
+    }
+
 @router.get("", response_model=List[Fee])
-async def get_fees(student_id: Optional[str] = None, status: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_fees(student_id: Optional[str] = None, status: Optional[str] = None, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     query = {"tenant_id": current_user["tenant_id"]}
     if student_id:
         query["student_id"] = student_id
     if status:
         query["status"] = status
     
-    fees = await db.fees.find(query, {"_id": 0}).to_list(1000)
-    return fees
+    fees = await tenant_db.fees.find(query, model_projection(Fee)).to_list(1000)
+    return list_response(fees)
 
 @router.put("/{fee_id}/pay")
-async def pay_fee(fee_id: str, current_user: dict = Depends(get_current_user)):
-    fee = await db.fees.find_one({"id": fee_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
-    if not fee:
-        raise HTTPException(status_code=404, detail="Fee not found")
-    
-    result = await db.fees.update_one(
+async def pay_fee(fee_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    # One atomic round trip: returns the fee as it was before the payment
+    fee = await tenant_db.fees.find_one_and_update(
         {"id": fee_id, "tenant_id": current_user["tenant_id"]},
-        {"$set": {"status": "paid", "paid_date": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"status": "paid", "paid_date": datetime.now(timezone.utc).isoformat()}},
+        projection={"_id": 0, "amount": 1, "student_id": 1}
     )
     
-    if result.modified_count == 0:
+    if not fee:
         raise HTTPException(status_code=404, detail="Fee not found")
     
-    # Notify admins
-    admins = await db.users.find({
-        "tenant_id": current_user["tenant_id"],
-        "role": {"$in": ["school_admin", "super_admin"]}
-    }, {"_id": 0}).to_list(100)
+    run_in_background(notify_admins_of_payment(fee, current_user["tenant_id"], tenant_db))
     
-    student = await db.students.find_one({"id": fee["student_id"]}, {"_id": 0})
+    return {"message": "Fee paid successfully"}
+
+async def notify_admins_of_payment(fee: dict, tenant_id: str, tenant_db):
+    admin_ids = await get_tenant_admin_ids(tenant_id)
+    student = await tenant_db.students.find_one({"id": fee["student_id"]}, {"_id": 0, "first_name": 1, "last_name": 1, "parent_email": 1})
     student_name = f"{student['first_name']} {student['last_name']}" if student else "Student"
     
-    for admin in admins:
-        await create_notification(
-            title="Fee Payment Received",
-            message=f"${fee['amount']} payment received for {student_name}",
-            notification_type="fee",
-            user_id=admin["id"],
-            tenant_id=current_user["tenant_id"]
+    if student and student.get("parent_email"):
+        await enqueue_email(
+            to=student["parent_email"],
+            subject="Payment receipt",
+            body=f"We received a payment of ${fee['amount']} for {student_name}. Thank you.",
+            tenant_id=tenant_id
         )
+    if not admin_ids:
+        return
     
-    return {"message": "Fee paid successfully"}
+    await notify_users(
+        title="Fee Payment Received",
+        message=f"${fee['amount']} payment received for {student_name}",
+        notification_type="fee",
+        user_ids=admin_ids,
+        tenant_id=tenant_id
+    )
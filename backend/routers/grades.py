@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from models import Grade, GradeCreate
-from config.database import db
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
+from utils.write_behind import insert_document
+from utils.collection_versions import bump_collection_version
+from utils.background import run_in_background
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
@@ -9,7 +12,7 @@ from datetime import datetime, timezone
 router = APIRouter(prefix="/grades", tags=["grades"])
 
 @router.post("", response_model=Grade)
-async def create_grade(grade: GradeCreate, current_user: dict = Depends(get_current_user)):
+async def create_grade(grade: GradeCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["teacher", "school_admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -21,17 +24,18 @@ async def create_grade(grade: GradeCreate, current_user: dict = Depends(get_curr
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.grades.insert_one(grade_doc)
+    await insert_document(tenant_db.grades, grade_doc)
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "grades"))
     grade_doc.pop("_id")
     return grade_doc
 
 @router.get("", response_model=List[Grade])
-async def get_grades(student_id: Optional[str] = None, assignment_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_grades(student_id: Optional[str] = None, assignment_id: Optional[str] = None, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     query = {"tenant_id": current_user["tenant_id"]}
     if student_id:
         query["student_id"] = student_id
     if assignment_id:
         query["assignment_id"] = assignment_id
     
-    grades = await db.grades.find(query, {"_id": 0}).to_list(1000)
-    return grades
+    grades = await tenant_db.grades.find(query, model_projection(Grade)).to_list(1000)
+    return list_response(grades)
@@ -1,17 +1,35 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
-from models import Notification
+from models import Notification, AnnouncementCreate
 from config.database import db
-from core.dependencies import get_current_user
+from config.settings import NOTIFICATION_REPLAY_LIMIT
+from config.tenants import tenant_router
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
 from utils.websocket import manager
+from utils.notifications import (
+    adjust_unread_counts, get_unread_count, visible_notifications_query, find_visible_notifications,
+    find_announcement, write_read_receipt, mark_announcements_read, broadcast_notification,
+)
+from utils.notification_archive import read_archive
 from utils.security import decode_token
-from typing import List
+from typing import List, Optional
+from datetime import datetime, timezone
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 @router.websocket("/ws")
-async def websocket_notifications(websocket: WebSocket, token: str):
+async def websocket_notifications(websocket: WebSocket, token: str, since: Optional[str] = None):
+    """Live notifications for the token's user.
+
+    `since` is the created_at of the newest notification the client has seen;
+    notifications created after it are replayed, oldest first, right after the
+    handshake. The connection is registered before the replay query runs, so a
+    notification created in between may arrive twice but is never lost;
+    clients de-duplicate by id.
+    """
     try:
         user_id = decode_token(token)
         if not user_id:
@@ -25,6 +43,9 @@ async def websocket_notifications(websocket: WebSocket, token: str):
         
         await manager.connect(websocket, user_id, user["tenant_id"])
         
+        if since:
+            await replay_notifications(websocket, user_id, user["tenant_id"], since)
+        
         try:
             while True:
                 data = await websocket.receive_text()
@@ -36,43 +57,98 @@ async def websocket_notifications(websocket: WebSocket, token: str):
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.close()
 
+async def replay_notifications(websocket: WebSocket, user_id: str, tenant_id: str, since: str):
+    tenant_db = await tenant_router.get_database(tenant_id)
+    # Served by the (user_id, created_at) index
+    missed = await find_visible_notifications(
+        tenant_db, user_id, {**visible_notifications_query(user_id, tenant_id), "created_at": {"$gt": since}},
+        model_projection(Notification), 1, NOTIFICATION_REPLAY_LIMIT
+    )
+    for notification in missed:
+        await websocket.send_json(notification)
+
 @router.get("", response_model=List[Notification])
-async def get_notifications(unread_only: bool = False, current_user: dict = Depends(get_current_user)):
-    query = {"user_id": current_user["id"], "tenant_id": current_user["tenant_id"]}
+async def get_notifications(unread_only: bool = False, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    query = visible_notifications_query(current_user["id"], current_user["tenant_id"])
     if unread_only:
         query["read"] = False
     
-    notifications = await db.notifications.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return notifications
+    notifications = await find_visible_notifications(
+        tenant_db, current_user["id"], query, model_projection(Notification), -1, 100, unread_only
+    )
+    return list_response(notifications)
+
+@router.post("/announcements", response_model=Notification)
+async def create_announcement(announcement: AnnouncementCreate, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] not in ["school_admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return await broadcast_notification(
+        title=announcement.title,
+        message=announcement.message,
+        notification_type=announcement.type,
+        tenant_id=current_user["tenant_id"],
+        exclude_user_id=current_user["id"]
+    )
+
+@router.get("/archive", response_model=List[Notification])
+async def get_archived_notifications(before: Optional[str] = None, limit: int = 50, current_user: dict = Depends(get_current_user)):
+    """Notifications moved out of Mongo by the archive job, newest first.
+
+    Page backwards by passing the created_at of the last item as `before`.
+    """
+    limit = max(1, min(limit, 500))
+    archived = await asyncio.to_thread(read_archive, current_user["tenant_id"], current_user["id"], before, limit)
+    return list_response([{field: doc[field] for field in Notification.model_fields if field in doc} for doc in archived])
+
+@router.get("/unread-count")
+async def get_notifications_unread_count(current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    return {"unread": await get_unread_count(tenant_db, current_user["id"], current_user["tenant_id"])}
 
 @router.put("/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.notifications.update_one(
-        {"id": notification_id, "user_id": current_user["id"]},
-        {"$set": {"read": True}}
+async def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    result = await tenant_db.notifications.update_one(
+        {"id": notification_id, "user_id": current_user["id"], "read": False},
+        {"$set": {"read": True, "read_at": datetime.now(timezone.utc)}}
     )
     
-    if result.modified_count == 0:
+    if result.modified_count == 1:
+        await adjust_unread_counts(tenant_db, {current_user["id"]: -1})
+        return {"message": "Notification marked as read"}
+    
+    if not await find_announcement(tenant_db, notification_id, current_user["id"], current_user["tenant_id"]):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    if await write_read_receipt(tenant_db, notification_id, current_user["id"], current_user["tenant_id"]) is not None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
     return {"message": "Notification marked as read"}
 
 @router.put("/read-all")
-async def mark_all_notifications_read(current_user: dict = Depends(get_current_user)):
-    await db.notifications.update_many(
+async def mark_all_notifications_read(current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    result = await tenant_db.notifications.update_many(
         {"user_id": current_user["id"], "read": False},
-        {"$set": {"read": True}}
+        {"$set": {"read": True, "read_at": datetime.now(timezone.utc)}}
     )
+    newly_read = await mark_announcements_read(tenant_db, current_user["id"], current_user["tenant_id"])
+    await adjust_unread_counts(tenant_db, {current_user["id"]: -(result.modified_count + newly_read)})
     
     return {"message": "All notifications marked as read"}
 
 @router.delete("/{notification_id}")
-async def delete_notification(notification_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.notifications.delete_one(
-        {"id": notification_id, "user_id": current_user["id"]}
+async def delete_notification(notification_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    deleted = await tenant_db.notifications.find_one_and_delete(
+        {"id": notification_id, "user_id": current_user["id"]},
+        projection={"_id": 0, "read": 1}
     )
     
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Notification not found")
+    if deleted is None:
+        # Announcements are shared by the tenant; deleting one only hides it for this user
+        if not await find_announcement(tenant_db, notification_id, current_user["id"], current_user["tenant_id"]):
+            raise HTTPException(status_code=404, detail="Notification not found")
+        previous = await write_read_receipt(tenant_db, notification_id, current_user["id"], current_user["tenant_id"], hidden=True)
+        if previous is not None and previous.get("hidden"):
+            raise HTTPException(status_code=404, detail="Notification not found")
+    elif not deleted["read"]:
+        await adjust_unread_counts(tenant_db, {current_user["id"]: -1})
     
     return {"message": "Notification deleted"}
@@ -1,19 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-from config.database import db
-from core.dependencies import get_current_user
-from typing import Optional
-import io
-import csv
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from core.dependencies import get_current_user, get_tenant_db, get_tenant_reporting_db
+from models import ReportJob, ReportJobCreate
+from utils.collection_versions import get_collection_versions
+from utils.exports import EXPORT_FORMATS, export_chunks, negotiate_format
+from utils.report_jobs import QueueFull, artifact_key, report_jobs
+from typing import AsyncIterator, Optional
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
-@router.get("/attendance")
-async def generate_attendance_report(start_date: Optional[str] = None, end_date: Optional[str] = None, current_user: dict = Depends(get_current_user)):
-    if current_user["role"] not in ["super_admin", "school_admin", "teacher"]:
+REPORT_ROLES = {
+    "attendance": ["super_admin", "school_admin", "teacher"],
+    "grades": ["super_admin", "school_admin", "teacher"],
+    "students": ["super_admin", "school_admin"],
+}
+# Collections each report reads; a write to any of them invalidates its cached files
+REPORT_COLLECTIONS = {
+    "attendance": ["attendance"],
+    "grades": ["grades", "students", "assignments"],
+    "students": ["students"],
+}
+
+def get_export_format(request: Request, format: Optional[str] = None) -> str:
+    """Report format from ?format=csv|csv.gz|xlsx, else the Accept header, else CSV"""
+    export_format = negotiate_format(format, request.headers.get("accept"))
+    if export_format is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported format; use one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+def export_response(rows: AsyncIterator[dict], name: str, export_format: str) -> StreamingResponse:
+    """Stream rows as a report download without holding the whole file in memory"""
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        export_chunks(rows, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={name}.{extension}"}
+    )
+
+def check_report_role(current_user: dict, report: str):
+    if current_user["role"] not in REPORT_ROLES[report]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    
-    query = {"tenant_id": current_user["tenant_id"]}
+
+def attendance_rows(tenant_db, tenant_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None):
+    query = {"tenant_id": tenant_id}
     if start_date:
         query["date"] = {"$gte": start_date}
     if end_date:
@@ -21,77 +50,91 @@ async def generate_attendance_report(start_date: Optional[str] = None, end_date:
             query["date"]["$lte"] = end_date
         else:
             query["date"] = {"$lte": end_date}
-    
-    attendance_records = await db.attendance.find(query, {"_id": 0}).to_list(10000)
-    
-    output = io.StringIO()
-    if attendance_records:
-        writer = csv.DictWriter(output, fieldnames=attendance_records[0].keys())
-        writer.writeheader()
-        writer.writerows(attendance_records)
-    
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=attendance_report.csv"}
-    )
+    return tenant_db.attendance.find(query, {"_id": 0})
+
+async def grades_rows(tenant_db, tenant_id: str):
+    # Names are looked up per tenant up front so the grades themselves can be streamed
+    students = await tenant_db.students.find({"tenant_id": tenant_id}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}).to_list(None)
+    assignments = await tenant_db.assignments.find({"tenant_id": tenant_id}, {"_id": 0, "id": 1, "title": 1}).to_list(None)
 
-@router.get("/grades")
-async def generate_grades_report(grade: Optional[str] = None, current_user: dict = Depends(get_current_user)):
-    if current_user["role"] not in ["super_admin", "school_admin", "teacher"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    grades = await db.grades.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(10000)
-    
-    student_ids = list(set([g["student_id"] for g in grades]))
-    assignment_ids = list(set([g["assignment_id"] for g in grades]))
-    
-    students = await db.students.find({"id": {"$in": student_ids}}, {"_id": 0}).to_list(10000)
-    assignments = await db.assignments.find({"id": {"$in": assignment_ids}}, {"_id": 0}).to_list(10000)
-    
     student_map = {s["id"]: f"{s['first_name']} {s['last_name']}" for s in students}
     assignment_map = {a["id"]: a["title"] for a in assignments}
-    
-    report_data = []
-    for g in grades:
-        report_data.append({
+
+    async for g in tenant_db.grades.find({"tenant_id": tenant_id}, {"_id": 0}):
+        yield {
             "student_name": student_map.get(g["student_id"], "Unknown"),
             "assignment": assignment_map.get(g["assignment_id"], "Unknown"),
             "score": g["score"],
             "feedback": g.get("feedback", ""),
             "created_at": g["created_at"]
-        })
-    
-    output = io.StringIO()
-    if report_data:
-        writer = csv.DictWriter(output, fieldnames=report_data[0].keys())
-        writer.writeheader()
-        writer.writerows(report_data)
-    
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=grades_report.csv"}
-    )
+        }
+
+def students_rows(tenant_db, tenant_id: str):
+    return tenant_db.students.find({"tenant_id": tenant_id}, {"_id": 0})
+
+REPORT_ROWS = {"attendance": attendance_rows, "grades": grades_rows, "students": students_rows}
+
+@router.get("/attendance")
+async def generate_attendance_report(start_date: Optional[str] = None, end_date: Optional[str] = None, export_format: str = Depends(get_export_format), current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_reporting_db)):
+    check_report_role(current_user, "attendance")
+    rows = attendance_rows(tenant_db, current_user["tenant_id"], start_date, end_date)
+    return export_response(rows, "attendance_report", export_format)
+
+@router.get("/grades")
+async def generate_grades_report(grade: Optional[str] = None, export_format: str = Depends(get_export_format), current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_reporting_db)):
+    check_report_role(current_user, "grades")
+    return export_response(grades_rows(tenant_db, current_user["tenant_id"]), "grades_report", export_format)
 
 @router.get("/students")
-async def generate_students_report(current_user: dict = Depends(get_current_user)):
-    if current_user["role"] not in ["super_admin", "school_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    students = await db.students.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(10000)
-    
-    output = io.StringIO()
-    if students:
-        writer = csv.DictWriter(output, fieldnames=students[0].keys())
-        writer.writeheader()
-        writer.writerows(students)
-    
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=students_report.csv"}
-    )
+async def generate_students_report(export_format: str = Depends(get_export_format), current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_reporting_db)):
+    check_report_role(current_user, "students")
+    return export_response(students_rows(tenant_db, current_user["tenant_id"]), "students_report", export_format)
+
+@router.post("/jobs", response_model=ReportJob, status_code=202)
+async def submit_report_job(job_request: ReportJobCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db), reporting_db=Depends(get_tenant_reporting_db)):
+    """Build a report in the background; poll GET /reports/jobs/{id}, then download it"""
+    check_report_role(current_user, job_request.report)
+    export_format = negotiate_format(job_request.format, None)
+    if export_format is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported format; use one of: {', '.join(EXPORT_FORMATS)}")
+
+    tenant_id = current_user["tenant_id"]
+    params = {"start_date": job_request.start_date, "end_date": job_request.end_date} if job_request.report == "attendance" else {}
+    # Versions are read from the same database as the rows, before them, so a file never predates its key
+    versions = await get_collection_versions(reporting_db, tenant_id, REPORT_COLLECTIONS[job_request.report])
+    job = {
+        "tenant_id": tenant_id,
+        "user_id": current_user["id"],
+        "report": job_request.report,
+        "format": export_format,
+        "params": params,
+        "key": artifact_key(tenant_id, job_request.report, params, export_format, versions),
+    }
+    rows = REPORT_ROWS[job_request.report]
+    try:
+        return await report_jobs.submit(tenant_db, job, lambda: rows(reporting_db, tenant_id, **params))
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many reports in progress, try again shortly", headers={"Retry-After": "30"})
+
+async def get_report_job(job_id: str, current_user: dict, tenant_db) -> dict:
+    job = await tenant_db.report_jobs.find_one({"id": job_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    check_report_role(current_user, job["report"])
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ReportJob)
+async def get_report_job_status(job_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    return await get_report_job(job_id, current_user, tenant_db)
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(job_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    job = await get_report_job(job_id, current_user, tenant_db)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job['status']}")
+
+    path = report_jobs.artifacts.get(job["key"], job["format"])
+    if path is None:
+        raise HTTPException(status_code=410, detail="Report file was evicted; submit the job again")
+    media_type, extension = EXPORT_FORMATS[job["format"]]
+    return FileResponse(path, media_type=media_type, filename=f"{job['report']}_report.{extension}")
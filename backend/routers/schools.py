@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from models import School, SchoolCreate
 from config.database import db
 from core.dependencies import get_current_user
+from utils.serialization import model_projection, list_response
 from typing import List
 import uuid
 from datetime import datetime, timezone
@@ -35,7 +36,7 @@ async def create_school(school: SchoolCreate, current_user: dict = Depends(get_c
 async def get_schools(current_user: dict = Depends(get_current_user)):
     query = {}
     if current_user["role"] == "super_admin":
-        schools = await db.schools.find({}, {"_id": 0}).to_list(1000)
+        schools = await db.schools.find({}, model_projection(School)).to_list(1000)
     else:
-        schools = await db.schools.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(1000)
-    return schools
+        schools = await db.schools.find({"tenant_id": current_user["tenant_id"]}, model_projection(School)).to_list(1000)
+    return list_response(schools)
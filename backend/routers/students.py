@@ -1,17 +1,41 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from models import Student, StudentCreate
-from config.database import db
-from core.dependencies import get_current_user
+from models import Assignment, Attendance, Fee, Grade, Student, StudentCreate, StudentOverview
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
+from utils.collection_versions import bump_collection_version
+from utils.background import run_in_background
+from pymongo import ReturnDocument
 from typing import List
+import asyncio
 import uuid
 from datetime import datetime, timezone
-import pandas as pd
 import io
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+# Bounded slices returned by GET /students/{id}/overview
+OVERVIEW_ATTENDANCE = 30
+OVERVIEW_GRADES = 50
+OVERVIEW_FEES = 50
+OVERVIEW_ASSIGNMENTS = 20
+
+def build_student_doc(row, tenant_id: str) -> dict:
+    """Build a student document from one bulk-import CSV row"""
+    return {
+        "id": str(uuid.uuid4()),
+        "tenant_id": tenant_id,
+        "first_name": str(row['first_name']),
+        "last_name": str(row['last_name']),
+        "email": str(row['email']),
+        "grade": str(row['grade']),
+        "date_of_birth": str(row['date_of_birth']),
+        "parent_email": str(row.get('parent_email', '')),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "is_active": True
+    }
+
 @router.post("", response_model=Student)
-async def create_student(student: StudentCreate, current_user: dict = Depends(get_current_user)):
+async def create_student(student: StudentCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -24,53 +48,123 @@ async def create_student(student: StudentCreate, current_user: dict = Depends(ge
         "is_active": True
     }
     
-    await db.students.insert_one(student_doc)
+    await tenant_db.students.insert_one(student_doc)
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "students"))
     student_doc.pop("_id")
     return student_doc
 
 @router.get("", response_model=List[Student])
-async def get_students(current_user: dict = Depends(get_current_user)):
-    students = await db.students.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(1000)
-    return students
+async def get_students(current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    students = await tenant_db.students.find({"tenant_id": current_user["tenant_id"]}, model_projection(Student)).to_list(1000)
+    return list_response(students)
 
 @router.get("/{student_id}", response_model=Student)
-async def get_student(student_id: str, current_user: dict = Depends(get_current_user)):
-    student = await db.students.find_one({"id": student_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+async def get_student(student_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    student = await tenant_db.students.find_one({"id": student_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
+@router.get("/{student_id}/overview", response_model=StudentOverview)
+async def get_student_overview(student_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    """Profile, attendance, grades, fees and upcoming assignments of a student in one request.
+
+    The profile, attendance, grades and fees queries are independent and run
+    concurrently; the assignment queries need the student's grade and graded
+    assignment ids, so they run concurrently in a second wave.
+    """
+    tenant_id = current_user["tenant_id"]
+    scope = {"tenant_id": tenant_id, "student_id": student_id}
+    student, attendance, grades, fees = await asyncio.gather(
+        tenant_db.students.find_one({"id": student_id, "tenant_id": tenant_id}, model_projection(Student)),
+        tenant_db.attendance.aggregate([
+            {"$match": scope},
+            {"$facet": {
+                "recent": [{"$sort": {"date": -1}}, {"$limit": OVERVIEW_ATTENDANCE}, {"$project": model_projection(Attendance)}],
+                "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            }},
+        ]).to_list(1),
+        tenant_db.grades.find(scope, model_projection(Grade)).sort("created_at", -1).to_list(OVERVIEW_GRADES),
+        tenant_db.fees.aggregate([
+            {"$match": {**scope, "status": {"$ne": "paid"}}},
+            {"$facet": {
+                "outstanding": [{"$sort": {"due_date": 1}}, {"$limit": OVERVIEW_FEES}, {"$project": model_projection(Fee)}],
+                "total": [{"$group": {"_id": None, "amount": {"$sum": "$amount"}}}],
+            }},
+        ]).to_list(1),
+    )
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    today = datetime.now(timezone.utc).date().isoformat()
+    graded, upcoming = await asyncio.gather(
+        tenant_db.assignments.find(
+            {"tenant_id": tenant_id, "id": {"$in": list({g["assignment_id"] for g in grades})}},
+            {"_id": 0, "id": 1, "title": 1, "max_score": 1}
+        ).to_list(OVERVIEW_GRADES),
+        tenant_db.assignments.find(
+            {"tenant_id": tenant_id, "grade": student["grade"], "due_date": {"$gte": today}}, model_projection(Assignment)
+        ).sort("due_date", 1).to_list(OVERVIEW_ASSIGNMENTS),
+    )
+    assignment_map = {a["id"]: a for a in graded}
+    for g in grades:
+        assignment = assignment_map.get(g["assignment_id"], {})
+        g["assignment_title"] = assignment.get("title", "Unknown")
+        g["max_score"] = assignment.get("max_score")
+    
+    by_status = {row["_id"]: row["count"] for row in attendance[0]["by_status"]}
+    total_days = sum(by_status.values())
+    fee_total = fees[0]["total"]
+    return {
+        "student": student,
+        "attendance": {
+            "recent": attendance[0]["recent"],
+            "rate": round(by_status.get("present", 0) / total_days, 4) if total_days else None,
+            "total": total_days,
+            "by_status": by_status,
+        },
+        "grades": grades,
+        "fees": {"outstanding": fees[0]["outstanding"], "total_due": fee_total[0]["amount"] if fee_total else 0.0},
+        "upcoming_assignments": upcoming,
+    }
+
 @router.put("/{student_id}", response_model=Student)
-async def update_student(student_id: str, student: StudentCreate, current_user: dict = Depends(get_current_user)):
+async def update_student(student_id: str, student: StudentCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    result = await db.students.update_one(
+    updated_student = await tenant_db.students.find_one_and_update(
         {"id": student_id, "tenant_id": current_user["tenant_id"]},
-        {"$set": student.model_dump()}
+        {"$set": student.model_dump()},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count == 0:
+    if not updated_student:
         raise HTTPException(status_code=404, detail="Student not found")
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "students"))
     
-    updated_student = await db.students.find_one({"id": student_id}, {"_id": 0})
     return updated_student
 
 @router.delete("/{student_id}")
-async def delete_student(student_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_student(student_id: str, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    result = await db.students.delete_one({"id": student_id, "tenant_id": current_user["tenant_id"]})
+    result = await tenant_db.students.delete_one({"id": student_id, "tenant_id": current_user["tenant_id"]})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Student not found")
+    run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "students"))
     return {"message": "Student deleted successfully"}
 
 @router.post("/bulk-import")
-async def bulk_import_students(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+async def bulk_import_students(file: UploadFile = File(...), current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    # pandas is heavy to import, so load it on first bulk import rather than at boot
+    import pandas as pd
+    
     try:
         contents = await file.read()
         df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
@@ -81,20 +175,11 @@ async def bulk_import_students(file: UploadFile = File(...), current_user: dict
         
         students_added = 0
         for _, row in df.iterrows():
-            student_doc = {
-                "id": str(uuid.uuid4()),
-                "tenant_id": current_user["tenant_id"],
-                "first_name": str(row['first_name']),
-                "last_name": str(row['last_name']),
-                "email": str(row['email']),
-                "grade": str(row['grade']),
-                "date_of_birth": str(row['date_of_birth']),
-                "parent_email": str(row.get('parent_email', '')),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_active": True
-            }
-            await db.students.insert_one(student_doc)
+            student_doc = build_student_doc(row, current_user["tenant_id"])
+            await tenant_db.students.insert_one(student_doc)
             students_added += 1
+        if students_added:
+            run_in_background(bump_collection_version(tenant_db, current_user["tenant_id"], "students"))
         
         return {"message": f"Successfully imported {students_added} students"}
     except Exception as e:
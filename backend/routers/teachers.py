@@ -1,17 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from models import Teacher, TeacherCreate
-from config.database import db
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_tenant_db
+from utils.serialization import model_projection, list_response
 from typing import List
 import uuid
 from datetime import datetime, timezone
-import pandas as pd
 import io
 
 router = APIRouter(prefix="/teachers", tags=["teachers"])
 
+def build_teacher_doc(row, tenant_id: str, has_subjects: bool) -> dict:
+    """Build a teacher document from one bulk-import CSV row"""
+    return {
+        "id": str(uuid.uuid4()),
+        "tenant_id": tenant_id,
+        "first_name": str(row['first_name']),
+        "last_name": str(row['last_name']),
+        "email": str(row['email']),
+        "subjects": str(row.get('subjects', '')).split(';') if has_subjects else [],
+        "qualification": str(row['qualification']),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "is_active": True
+    }
+
 @router.post("", response_model=Teacher)
-async def create_teacher(teacher: TeacherCreate, current_user: dict = Depends(get_current_user)):
+async def create_teacher(teacher: TeacherCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -24,20 +37,23 @@ async def create_teacher(teacher: TeacherCreate, current_user: dict = Depends(ge
         "is_active": True
     }
     
-    await db.teachers.insert_one(teacher_doc)
+    await tenant_db.teachers.insert_one(teacher_doc)
     teacher_doc.pop("_id")
     return teacher_doc
 
 @router.get("", response_model=List[Teacher])
-async def get_teachers(current_user: dict = Depends(get_current_user)):
-    teachers = await db.teachers.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(1000)
-    return teachers
+async def get_teachers(current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    teachers = await tenant_db.teachers.find({"tenant_id": current_user["tenant_id"]}, model_projection(Teacher)).to_list(1000)
+    return list_response(teachers)
 
 @router.post("/bulk-import")
-async def bulk_import_teachers(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+async def bulk_import_teachers(file: UploadFile = File(...), current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["super_admin", "school_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    # pandas is heavy to import, so load it on first bulk import rather than at boot
+    import pandas as pd
+    
     try:
         contents = await file.read()
         df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
@@ -47,20 +63,10 @@ async def bulk_import_teachers(file: UploadFile = File(...), current_user: dict
             raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_columns)}")
         
         teachers_added = 0
+        has_subjects = 'subjects' in df.columns
         for _, row in df.iterrows():
-            subjects = str(row.get('subjects', '')).split(';') if 'subjects' in df.columns else []
-            teacher_doc = {
-                "id": str(uuid.uuid4()),
-                "tenant_id": current_user["tenant_id"],
-                "first_name": str(row['first_name']),
-                "last_name": str(row['last_name']),
-                "email": str(row['email']),
-                "subjects": subjects,
-                "qualification": str(row['qualification']),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_active": True
-            }
-            await db.teachers.insert_one(teacher_doc)
+            teacher_doc = build_teacher_doc(row, current_user["tenant_id"], has_subjects)
+            await tenant_db.teachers.insert_one(teacher_doc)
             teachers_added += 1
         
         return {"message": f"Successfully imported {teachers_added} teachers"}
@@ -1,15 +1,25 @@
 from fastapi import APIRouter, HTTPException, Depends
-from models import Timetable, TimetableCreate
-from config.database import db
-from core.dependencies import get_current_user
+from models import (Timetable, TimetableCreate, TimetableBulkCreate, TimetableBulkResult,
+                    TimetableGenerate, TimetableGenerationResult)
+from core.dependencies import get_current_user, get_tenant_db
+from config.settings import TIMETABLE_BULK_MAX_ENTRIES, TIMETABLE_SOLVER_BUDGET_SECONDS
+from utils.serialization import model_projection, list_response
+from utils.timetable import SlotOccupancy, describe_conflict, find_conflicts
+from utils.timetable_solver import TimetableInfeasible, solve_timetable
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 from typing import List, Optional
+from collections import Counter
+import asyncio
+import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/timetable", tags=["timetable"])
 
 @router.post("", response_model=Timetable)
-async def create_timetable(timetable: TimetableCreate, current_user: dict = Depends(get_current_user)):
+async def create_timetable(timetable: TimetableCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     if current_user["role"] not in ["school_admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -21,17 +31,231 @@ async def create_timetable(timetable: TimetableCreate, current_user: dict = Depe
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.timetable.insert_one(timetable_doc)
+    # The slot indexes reject a double-booked teacher or grade. If the holder is gone by the
+    # time it is looked up, the slot may be free again: try once more before giving up
+    for _ in range(2):
+        try:
+            await tenant_db.timetable.insert_one(timetable_doc)
+            break
+        except DuplicateKeyError:
+            holders = await tenant_db.timetable.find({
+                "tenant_id": current_user["tenant_id"],
+                "day": timetable.day,
+                "period": timetable.period,
+                "$or": [{"teacher_id": timetable.teacher_id}, {"grade": timetable.grade}]
+            }, {"_id": 0, "id": 1, "day": 1, "period": 1, "teacher_id": 1, "grade": 1}).to_list(2)
+            if holders:
+                occupancy = SlotOccupancy()
+                for holder in holders:
+                    occupancy.add(holder, {"id": holder["id"]})
+                conflicts = [describe_conflict(timetable_doc, kind, holder) for kind, holder in occupancy.conflicts(timetable_doc)]
+                raise HTTPException(status_code=409, detail={"message": "Timetable slot already taken", "conflicts": conflicts})
+    else:
+        raise HTTPException(status_code=500, detail="Timetable entry rejected as a duplicate, but no lesson holds its slot")
     timetable_doc.pop("_id")
     return timetable_doc
 
+def duplicate_keys_only(error: BulkWriteError) -> bool:
+    """Whether every write of a failed insert_many was refused by a unique index"""
+    write_errors = error.details.get("writeErrors", [])
+    return bool(write_errors) and all(e.get("code") == 11000 for e in write_errors) and not error.details.get("writeConcernErrors")
+
+@router.post("/bulk", response_model=TimetableBulkResult)
+async def bulk_create_timetable(upload: TimetableBulkCreate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    """Add many entries at once, e.g. a grade's whole week.
+
+    The upload is checked in one pass against the stored timetable and
+    against itself; if anything clashes, every conflict is returned with a
+    409 and nothing is stored. With dry_run the check runs without storing.
+    """
+    if current_user["role"] not in ["school_admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not upload.entries:
+        raise HTTPException(status_code=400, detail="No timetable entries given")
+    if len(upload.entries) > TIMETABLE_BULK_MAX_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"At most {TIMETABLE_BULK_MAX_ENTRIES} entries per upload")
+    
+    tenant_id = current_user["tenant_id"]
+    entries = [entry.model_dump() for entry in upload.entries]
+    conflicts = find_conflicts(await SlotOccupancy.load(tenant_db, tenant_id), entries)
+    if conflicts:
+        raise HTTPException(status_code=409, detail={"message": f"{len(conflicts)} timetable conflicts", "conflicts": conflicts})
+    if upload.dry_run:
+        return {"created": 0, "conflicts": []}
+    
+    now = datetime.now(timezone.utc).isoformat()
+    timetable_docs = [{"id": str(uuid.uuid4()), "tenant_id": tenant_id, **entry, "created_at": now} for entry in entries]
+    try:
+        await tenant_db.timetable.insert_many(timetable_docs)
+    except BulkWriteError as e:
+        # Another write took one of the slots after the check: undo this upload and report against the new state
+        await tenant_db.timetable.delete_many({"id": {"$in": [doc["id"] for doc in timetable_docs]}})
+        if not duplicate_keys_only(e):
+            raise
+        conflicts = find_conflicts(await SlotOccupancy.load(tenant_db, tenant_id), entries)
+        raise HTTPException(status_code=409, detail={"message": f"{len(conflicts)} timetable conflicts", "conflicts": conflicts})
+    return {"created": len(timetable_docs), "conflicts": []}
+
+def period_times(request: TimetableGenerate) -> List[tuple]:
+    """(start_time, end_time) as HH:MM for each period of a day"""
+    try:
+        start = datetime.strptime(request.day_start, "%H:%M")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="day_start must be HH:MM")
+    times = []
+    for period in range(request.periods_per_day):
+        begins = start + timedelta(minutes=period * (request.period_minutes + request.break_minutes))
+        ends = begins + timedelta(minutes=request.period_minutes)
+        if ends.date() != start.date():
+            raise HTTPException(status_code=400, detail="The school day runs past midnight")
+        times.append((begins.strftime("%H:%M"), ends.strftime("%H:%M")))
+    return times
+
+async def restore_replaced(tenant_db, replaced: List[dict]) -> List[dict]:
+    """Put deleted entries back and return those that could not be, e.g. because their slot was taken meanwhile.
+
+    The delete and the restore cannot share a transaction on a standalone
+    server, so lost entries go back to the client instead of vanishing.
+    """
+    if not replaced:
+        return []
+    try:
+        await tenant_db.timetable.insert_many(replaced, ordered=False)
+        return []
+    except BulkWriteError as e:
+        lost = [replaced[error["index"]] for error in e.details.get("writeErrors", [])]
+    except PyMongoError:
+        # Unknown how far the write got: report every entry rather than drop one silently
+        lost = replaced
+    logger.error("Could not restore %d replaced timetable entries: %s", len(lost), [doc["id"] for doc in lost])
+    return [{key: value for key, value in doc.items() if key != "_id"} for doc in lost]
+
+@router.post("/generate", response_model=TimetableGenerationResult)
+async def generate_timetable(request: TimetableGenerate, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
+    """Build a conflict-free week for the given grades and store it in one write.
+
+    Each (grade, subject) gets one teacher who lists the subject; lessons go
+    in slots where neither the grade nor the teacher is busy, the teacher is
+    available and, optionally, under max_teacher_periods_per_day. Stored
+    entries of other grades stay and block their teachers; the grades' own
+    entries stay too unless replace is set, and count towards the curriculum.
+    Returns 422 with the reasons if the curriculum cannot fit. With dry_run
+    the week is returned unstored.
+    """
+    if current_user["role"] not in ["school_admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not request.grades or not request.days or request.periods_per_day < 1:
+        raise HTTPException(status_code=400, detail="Grades, days and periods_per_day are required")
+    grades = [entry.grade for entry in request.grades]
+    if len(set(grades)) != len(grades) or len(set(request.days)) != len(request.days):
+        raise HTTPException(status_code=400, detail="Grades and days must be unique")
+    if any(count < 0 for entry in request.grades for count in entry.subjects.values()):
+        raise HTTPException(status_code=400, detail="Periods per week cannot be negative")
+    times = period_times(request)
+    tenant_id = current_user["tenant_id"]
+    periods = request.periods_per_day
+    day_index = {day: index for index, day in enumerate(request.days)}
+
+    def slot_of(day: str, period: int) -> Optional[int]:
+        if day not in day_index or not 1 <= period <= periods:
+            return None
+        return day_index[day] * periods + period - 1
+
+    teacher_subjects = {teacher["id"]: teacher.get("subjects", []) async for teacher in tenant_db.teachers.find(
+        {"tenant_id": tenant_id, "is_active": {"$ne": False}}, {"_id": 0, "id": 1, "subjects": 1})}
+    unknown = [teacher_id for teacher_id in request.teacher_unavailable if teacher_id not in teacher_subjects]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown teachers: {', '.join(unknown)}")
+    teacher_blocked = {teacher_id: 0 for teacher_id in teacher_subjects}
+    for teacher_id, unavailable in request.teacher_unavailable.items():
+        for slot in unavailable:
+            bit = slot_of(slot.day, slot.period)
+            if bit is None:
+                raise HTTPException(status_code=400, detail=f"No slot {slot.day} period {slot.period} in this week")
+            teacher_blocked[teacher_id] |= 1 << bit
+
+    # Stored lessons: the grades' own are replaced, or kept and counted against the curriculum;
+    # other grades' block their teachers
+    replaced = await tenant_db.timetable.find({"tenant_id": tenant_id, "grade": {"$in": grades}}, {"_id": 0}).to_list(None) if request.replace else []
+    grade_blocked = {grade: 0 for grade in grades}
+    kept = Counter()
+    async for entry in tenant_db.timetable.find(
+        {"tenant_id": tenant_id}, {"_id": 0, "day": 1, "period": 1, "teacher_id": 1, "grade": 1, "subject": 1}
+    ):
+        if entry["grade"] in grade_blocked:
+            if request.replace:
+                continue
+            kept[(entry["grade"], entry.get("subject", "").strip().lower())] += 1
+        bit = slot_of(entry["day"], entry["period"])
+        if bit is None:
+            continue
+        if entry["teacher_id"] in teacher_blocked:
+            teacher_blocked[entry["teacher_id"]] |= 1 << bit
+        if entry["grade"] in grade_blocked:
+            grade_blocked[entry["grade"]] |= 1 << bit
+
+    budget = min(request.time_budget_seconds or TIMETABLE_SOLVER_BUDGET_SECONDS, TIMETABLE_SOLVER_BUDGET_SECONDS)
+    curriculum = {entry.grade: {subject: max(count - kept[(entry.grade, subject.strip().lower())], 0)
+                                for subject, count in entry.subjects.items()} for entry in request.grades}
+    try:
+        # Pure CPU: keep the event loop serving other requests
+        result = await asyncio.to_thread(
+            solve_timetable, curriculum, teacher_subjects, len(request.days), periods,
+            teacher_blocked, grade_blocked, request.max_teacher_periods_per_day, budget)
+    except TimetableInfeasible as e:
+        raise HTTPException(status_code=422, detail={"message": "The curriculum cannot fit this week", "problems": e.problems})
+    if result["unplaced"]:
+        message = "No timetable found within the time budget" if result["timed_out"] else "No timetable found"
+        raise HTTPException(status_code=422, detail={"message": message, "unplaced": result["unplaced"]})
+
+    entries = []
+    for grade, subject, teacher_id, slot in result["lessons"]:
+        day, period = divmod(slot, periods)
+        entries.append({
+            "grade": grade, "day": request.days[day], "period": period + 1, "subject": subject,
+            "teacher_id": teacher_id, "start_time": times[period][0], "end_time": times[period][1]
+        })
+    summary = {
+        "created": 0,
+        "replaced": 0,
+        "lessons": len(entries),
+        "seconds": round(result["seconds"], 3),
+        "iterations": result["iterations"],
+        "ejections": result["ejections"],
+        "teacher_assignments": [{"grade": grade, "subject": subject, "teacher_id": teacher_id}
+                                for (grade, subject), teacher_id in result["assignments"].items()],
+        "entries": entries
+    }
+    if request.dry_run or not entries:
+        return summary
+
+    now = datetime.now(timezone.utc).isoformat()
+    timetable_docs = [{"id": str(uuid.uuid4()), "tenant_id": tenant_id, **entry, "created_at": now} for entry in entries]
+    if replaced:
+        await tenant_db.timetable.delete_many({"id": {"$in": [doc["id"] for doc in replaced]}})
+    try:
+        await tenant_db.timetable.insert_many(timetable_docs)
+    except BulkWriteError as e:
+        # Another write took one of the slots while solving: undo and put the replaced week back
+        await tenant_db.timetable.delete_many({"id": {"$in": [doc["id"] for doc in timetable_docs]}})
+        if not duplicate_keys_only(e):
+            await restore_replaced(tenant_db, replaced)
+            raise
+        lost = await restore_replaced(tenant_db, replaced)
+        if lost:
+            raise HTTPException(status_code=409, detail={
+                "message": "The timetable changed while generating and some replaced lessons could not be put back",
+                "lost_entries": lost})
+        raise HTTPException(status_code=409, detail="The timetable changed while generating; try again")
+    return {**summary, "created": len(timetable_docs), "replaced": len(replaced)}
+
 @router.get("", response_model=List[Timetable])
-async def get_timetable(grade: Optional[str] = None, day: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_timetable(grade: Optional[str] = None, day: Optional[str] = None, current_user: dict = Depends(get_current_user), tenant_db=Depends(get_tenant_db)):
     query = {"tenant_id": current_user["tenant_id"]}
     if grade:
         query["grade"] = grade
     if day:
         query["day"] = day
     
-    timetable = await db.timetable.find(query, {"_id": 0}).sort("period", 1).to_list(1000)
-    return timetable
+    timetable = await tenant_db.timetable.find(query, model_projection(Timetable)).sort("period", 1).to_list(1000)
+    return list_response(timetable)
@@ -0,0 +1,86 @@
+"""Archive old notifications to gzip NDJSON files and report the effect.
+
+Moves notifications older than NOTIFICATION_ARCHIVE_AFTER_DAYS (or
+--older-than-days) out of the shared database and every dedicated tenant
+database (see config.tenants), then prints per database the document count,
+collection and index size, and the median latency of the get_notifications
+query for a sample of users, before and after. Meant for a daily cron on a
+single host. Run from backend/:
+
+    python -m scripts.archive_notifications
+    python -m scripts.archive_notifications --older-than-days 30 --report-only
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+
+async def collection_report(database, sample_users):
+    report = {"count": await database.notifications.estimated_document_count()}
+    try:
+        stats = await database.command("collStats", "notifications")
+        report.update({
+            "size_bytes": stats.get("size"),
+            "storage_bytes": stats.get("storageSize"),
+            "index_bytes": stats.get("totalIndexSize"),
+        })
+    except Exception:
+        pass
+
+    latencies = []
+    for user_id in sample_users:
+        start = time.perf_counter()
+        # Same query as GET /api/notifications
+        await database.notifications.find({"user_id": user_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
+        latencies.append(time.perf_counter() - start)
+    if latencies:
+        report["get_notifications_p50_ms"] = round(statistics.median(latencies) * 1000, 3)
+    return report
+
+
+async def run(args):
+    from config.settings import NOTIFICATION_ARCHIVE_AFTER_DAYS, NOTIFICATION_ARCHIVE_BATCH_SIZE
+    from config.tenants import tenant_router
+    from utils.notification_archive import archive_notifications
+
+    days = args.older_than_days if args.older_than_days is not None else NOTIFICATION_ARCHIVE_AFTER_DAYS
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    results = {}
+    for database in await tenant_router.databases():
+        # Heaviest users first: they are the ones a growing collection slows down
+        heaviest = await database.notifications.aggregate([
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": args.sample_users},
+        ]).to_list(args.sample_users)
+        sample_users = [row["_id"] for row in heaviest]
+
+        result = {"before": await collection_report(database, sample_users)}
+        if not args.report_only:
+            start = time.perf_counter()
+            result["archive"] = await archive_notifications(database, cutoff, args.batch_size or NOTIFICATION_ARCHIVE_BATCH_SIZE)
+            result["archive"]["seconds"] = round(time.perf_counter() - start, 2)
+            result["after"] = await collection_report(database, sample_users)
+        results[database.name] = result
+    tenant_router.close()
+
+    print(json.dumps({"cutoff": cutoff, "databases": results}, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--older-than-days", type=int, help="Default: NOTIFICATION_ARCHIVE_AFTER_DAYS")
+    parser.add_argument("--batch-size", type=int, help="Default: NOTIFICATION_ARCHIVE_BATCH_SIZE")
+    parser.add_argument("--sample-users", type=int, default=20, help="Users whose query latency is measured")
+    parser.add_argument("--report-only", action="store_true", help="Only print the current size and latency")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
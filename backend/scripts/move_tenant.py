@@ -0,0 +1,176 @@
+"""Move a tenant's collections to another database while the app keeps serving.
+
+The move runs in four phases:
+
+1. open a change stream on the tenant's current database,
+2. bulk-copy every tenant-scoped collection (see config.tenants.TENANT_COLLECTIONS),
+3. replay the changes written during the copy until the stream is idle,
+4. point the tenant's route at the new database and keep replaying for
+   --settle-seconds, so writes from workers still holding the old route in
+   their cache (TENANT_ROUTE_CACHE_SECONDS) are carried over.
+
+Change streams need a replica set or sharded cluster. Run from backend/:
+
+    python -m scripts.move_tenant --tenant-id <id> --target-db edupro_tenant_acme
+    python -m scripts.move_tenant --tenant-id <id> --target-db acme --target-uri mongodb://other-cluster:27017
+
+The source documents are kept unless --delete-source is given.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from pymongo import DeleteOne, ReplaceOne
+
+logger = logging.getLogger("move_tenant")
+
+
+class TenantMove:
+    def __init__(self, tenant_id, source, target, batch_size):
+        self.tenant_id = tenant_id
+        self.source = source
+        self.target = target
+        self.batch_size = batch_size
+        self.copied = {}
+        self.replayed = 0
+
+    def watch(self):
+        from config.tenants import TENANT_COLLECTIONS
+
+        # Deletes carry no fullDocument, so they cannot be filtered by tenant
+        # here; they are applied by _id, which only matches this tenant's
+        # documents in the target.
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": TENANT_COLLECTIONS},
+            "$or": [{"operationType": "delete"}, {"fullDocument.tenant_id": self.tenant_id}],
+        }}]
+        return self.source.watch(pipeline, full_document="updateLookup")
+
+    async def copy_indexes(self, name):
+        info = await self.source[name].index_information()
+        for index_name, spec in info.items():
+            if index_name == "_id_":
+                continue
+            options = {key: value for key, value in spec.items() if key not in ("key", "v", "ns")}
+            await self.target[name].create_index(spec["key"], name=index_name, **options)
+
+    async def copy_collection(self, name):
+        await self.copy_indexes(name)
+        copied = 0
+        batch = []
+        async for doc in self.source[name].find({"tenant_id": self.tenant_id}).batch_size(self.batch_size):
+            batch.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+            if len(batch) >= self.batch_size:
+                await self.target[name].bulk_write(batch, ordered=False)
+                copied += len(batch)
+                batch = []
+        if batch:
+            await self.target[name].bulk_write(batch, ordered=False)
+            copied += len(batch)
+        self.copied[name] = copied
+        logger.info(f"Copied {copied} {name} documents")
+
+    async def replay(self, stream, idle_seconds):
+        """Apply pending changes; return once no change arrived for `idle_seconds`"""
+        pending = {}
+        idle_since = time.monotonic()
+        while time.monotonic() - idle_since < idle_seconds:
+            change = await stream.try_next()
+            if change is None:
+                await self._flush(pending)
+                await asyncio.sleep(0.1)
+                continue
+            idle_since = time.monotonic()
+            name = change["ns"]["coll"]
+            key = change["documentKey"]["_id"]
+            if change["operationType"] == "delete":
+                op = DeleteOne({"_id": key})
+            elif change.get("fullDocument") is not None:
+                op = ReplaceOne({"_id": key}, change["fullDocument"], upsert=True)
+            else:
+                # Updated then deleted before the lookup; the delete event follows
+                continue
+            pending.setdefault(name, []).append(op)
+            self.replayed += 1
+            if len(pending[name]) >= self.batch_size:
+                await self._flush(pending)
+        await self._flush(pending)
+
+    async def _flush(self, pending):
+        # ordered=True keeps the per-document order of the stream
+        for name, ops in pending.items():
+            if ops:
+                await self.target[name].bulk_write(ops, ordered=True)
+        pending.clear()
+
+    async def delete_source(self):
+        from config.tenants import TENANT_COLLECTIONS
+
+        for name in TENANT_COLLECTIONS:
+            result = await self.source[name].delete_many({"tenant_id": self.tenant_id})
+            logger.info(f"Deleted {result.deleted_count} {name} documents from the source")
+
+
+async def run(args):
+    from config.database import db, mongo_url, create_client
+    from config.settings import TENANT_ROUTE_CACHE_SECONDS
+    from config.tenants import TENANT_COLLECTIONS, tenant_router
+
+    source = await tenant_router.get_database(args.tenant_id)
+    target_uri = args.target_uri or mongo_url
+    target_client = db.client if target_uri == mongo_url else create_client(target_uri)
+    target = target_client[args.target_db]
+    if target_uri == mongo_url and target.name == source.name:
+        logger.error(f"Tenant {args.tenant_id} already lives in {target.name}")
+        return 1
+
+    settle_seconds = args.settle_seconds if args.settle_seconds is not None else TENANT_ROUTE_CACHE_SECONDS + 5
+    move = TenantMove(args.tenant_id, source, target, args.batch_size)
+    started = time.monotonic()
+
+    async with move.watch() as stream:
+        for name in TENANT_COLLECTIONS:
+            await move.copy_collection(name)
+        logger.info("Bulk copy finished, catching up")
+        await move.replay(stream, args.idle_seconds)
+
+        route = {"tenant_id": args.tenant_id, "db_name": args.target_db}
+        if args.target_uri:
+            route["uri"] = args.target_uri
+        await db.tenant_routes.replace_one({"tenant_id": args.tenant_id}, route, upsert=True)
+        logger.info(f"Route switched to {args.target_db}; replaying for {settle_seconds}s while workers refresh")
+        deadline = time.monotonic() + settle_seconds
+        while time.monotonic() < deadline:
+            await move.replay(stream, min(args.idle_seconds, max(deadline - time.monotonic(), 0)))
+
+    if args.delete_source:
+        await move.delete_source()
+    tenant_router.close()
+    if target_client is not db.client:
+        target_client.close()
+
+    logger.info(
+        f"Moved tenant {args.tenant_id} in {time.monotonic() - started:.1f}s: "
+        f"copied {sum(move.copied.values())} documents, replayed {move.replayed} changes"
+    )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenant-id", required=True)
+    parser.add_argument("--target-db", required=True, help="Database name for the tenant's collections")
+    parser.add_argument("--target-uri", help="Connection string of another cluster (default: the shared MONGO_URL)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--idle-seconds", type=float, default=2.0, help="Catch-up is done after this long without changes")
+    parser.add_argument("--settle-seconds", type=float, help="Keep replaying this long after the switch (default: route cache TTL + 5)")
+    parser.add_argument("--delete-source", action="store_true", help="Delete the tenant's documents from the old database afterwards")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
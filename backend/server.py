@@ -1,13 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from config.settings import CORS_ORIGINS
-from config.database import close_database
+from config.settings import CORS_ORIGINS, PROFILING_ENABLED, PRELOAD_HEAVY_MODULES
+from config.database import start_database, close_database, ping_database
+from config.tenants import tenant_router
+from core.middleware import MetricsMiddleware, ProfilingMiddleware
+from utils.metrics import registry
+from utils.write_behind import write_behind
+from utils.background import drain_background_tasks
+from utils.notifications import notification_coalescer
+from utils.report_jobs import report_jobs
+from utils.email_outbox import email_outbox
+from utils.overdue_fees import overdue_fee_scheduler
+import importlib
 import logging
+import threading
 
 # Import all routers
 from routers import auth, students, teachers, assignments, grades
 from routers import attendance, fees, timetable, notifications
-from routers import reports, schools, ai_chat, dashboard
+from routers import reports, schools, ai_chat, dashboard, admin, batch
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,6 +37,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand request profiling (X-Profile header or PROFILE_SAMPLE_ROUTES)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Per-route request metrics, exposed on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include all routers with /api prefix
 app.include_router(auth.router, prefix="/api")
 app.include_router(students.router, prefix="/api")
@@ -39,6 +58,8 @@ app.include_router(reports.router, prefix="/api")
 app.include_router(schools.router, prefix="/api")
 app.include_router(ai_chat.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(batch.router, prefix="/api")
 
 # Logging
 logging.basicConfig(
@@ -47,8 +68,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Imported lazily by the routers that need them; see benchmarks/cold_start.py
+HEAVY_MODULES = ["pandas", "emergentintegrations.llm.chat"]
+
+def preload_heavy_modules():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Could not preload {name}: {e}")
+    logger.info("Heavy modules preloaded")
+
+@app.on_event("startup")
+async def startup_event():
+    await start_database()
+    email_outbox.start()
+    overdue_fee_scheduler.start()
+    if PRELOAD_HEAVY_MODULES:
+        # Warm the import cache off the event loop so the worker can serve immediately
+        threading.Thread(target=preload_heavy_modules, name="preload-heavy-modules", daemon=True).start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
+    # Background work and buffered inserts must reach Mongo before the client closes
+    await drain_background_tasks()
+    await overdue_fee_scheduler.close()
+    await report_jobs.close()
+    await email_outbox.close()
+    await notification_coalescer.flush()
+    await write_behind.flush()
+    tenant_router.close()
     await close_database()
     logger.info("Database connection closed")
 
@@ -62,4 +111,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": "2.0.0"}
+    # Readiness probe: only report healthy while the database answers a ping
+    if not await ping_database():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "version": "2.0.0", "database": "unreachable"}
+        )
+    return {"status": "healthy", "version": "2.0.0", "database": "ok"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_tasks = set()
+
+def run_in_background(coro):
+    """Run `coro` after the current request returns; failures are logged, not raised.
+
+    A reference is kept until the task finishes so it is not garbage collected
+    mid-flight, and shutdown waits for pending tasks via drain_background_tasks().
+    """
+    task = asyncio.get_running_loop().create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_finished)
+    return task
+
+def _finished(task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task failed: {task.exception()!r}")
+
+async def drain_background_tasks():
+    while _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
@@ -0,0 +1,22 @@
+from typing import Dict, List
+
+# Per-tenant write counters for collections whose derived artifacts are cached
+# (report files, see utils.report_jobs). Stored as {tenant_id, collection, version}
+# in the tenant database; a missing document means version 0.
+# Write endpoints bump them with run_in_background so the request keeps its round
+# trip budget: a report submitted within that one round trip can still be served
+# the previous file, the same staleness reports already accept from secondaries.
+
+async def bump_collection_version(tenant_db, tenant_id: str, collection: str):
+    """Record a write to `collection`; call after the write is acknowledged"""
+    await tenant_db.collection_versions.update_one(
+        {"tenant_id": tenant_id, "collection": collection}, {"$inc": {"version": 1}}, upsert=True
+    )
+
+async def get_collection_versions(database, tenant_id: str, collections: List[str]) -> Dict[str, int]:
+    documents = await database.collection_versions.find(
+        {"tenant_id": tenant_id, "collection": {"$in": collections}}, {"_id": 0, "collection": 1, "version": 1}
+    ).to_list(len(collections))
+    versions = {collection: 0 for collection in collections}
+    versions.update({d["collection"]: d["version"] for d in documents})
+    return versions
@@ -0,0 +1,98 @@
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import uuid
+
+DIGEST_PREVIEW_ITEMS = 3
+
+def build_digest(notifications: List[dict], with_items: bool) -> dict:
+    """One notification-shaped frame standing for several of the same type and user"""
+    first, latest = notifications[0], notifications[-1]
+    count = len(notifications)
+    preview = "; ".join(n["title"] for n in notifications[:DIGEST_PREVIEW_ITEMS])
+    if count > DIGEST_PREVIEW_ITEMS:
+        preview += f" and {count - DIGEST_PREVIEW_ITEMS} more"
+    digest = {
+        "id": str(uuid.uuid4()),
+        "title": f"{count} new {first['type']} notifications",
+        "message": preview,
+        "type": first["type"],
+        "user_id": first["user_id"],
+        "tenant_id": first["tenant_id"],
+        "read": False,
+        "created_at": latest["created_at"],
+        "count": count,
+    }
+    if with_items:
+        # The digest replaces the individual documents, so it keeps their content
+        digest["items"] = [
+            {"title": n["title"], "message": n["message"], "created_at": n["created_at"]} for n in notifications
+        ]
+    else:
+        # The individual documents are stored; the client can reload them
+        digest["notification_ids"] = [n["id"] for n in notifications]
+    return digest
+
+class NotificationCoalescer:
+    """Merges a user's notifications of one type within a window into a single frame.
+
+    The first notification of a (user, type) pair is delivered immediately and
+    opens a window of `window_ms`. Anything arriving for the same pair while the
+    window is open is held back and delivered when it closes: as-is when only one
+    arrived, otherwise as one digest frame, after which a new window opens so a
+    sustained burst yields at most one frame per window. A window of 0 disables
+    coalescing.
+
+    With `persist`, the coalescer also stores what it delivers (one document per
+    digest instead of one per notification); otherwise callers store the
+    individual notifications themselves before handing them over.
+    """
+
+    def __init__(self, manager, window_ms: float, persist: Optional[Callable[[dict], Awaitable[None]]] = None):
+        self.manager = manager
+        self.window = window_ms / 1000
+        self.persist = persist
+        self._windows = {}
+        self._timers = {}
+        self._deliveries = set()
+
+    async def send(self, notification: dict):
+        if self.window <= 0:
+            await self._deliver([notification])
+            return
+        key = (notification["tenant_id"], notification["user_id"], notification["type"])
+        pending = self._windows.get(key)
+        if pending is not None:
+            pending.append(notification)
+            return
+        self._open_window(key)
+        await self._deliver([notification])
+
+    def _open_window(self, key):
+        self._windows[key] = []
+        self._timers[key] = asyncio.get_running_loop().call_later(self.window, self._close_window, key)
+
+    def _close_window(self, key):
+        self._timers.pop(key, None)
+        pending = self._windows.pop(key, None)
+        if not pending:
+            return
+        self._open_window(key)
+        task = asyncio.get_running_loop().create_task(self._deliver(pending))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, notifications: List[dict]):
+        frame = notifications[0] if len(notifications) == 1 else build_digest(notifications, self.persist is not None)
+        if self.persist is not None:
+            await self.persist(frame)
+        await self.manager.send_personal_notification(frame, frame["user_id"], frame["tenant_id"])
+
+    async def flush(self):
+        """Deliver everything still held back, e.g. on shutdown"""
+        for key in list(self._windows):
+            self._timers.pop(key).cancel()
+            pending = self._windows.pop(key)
+            if pending:
+                await self._deliver(pending)
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
@@ -0,0 +1,285 @@
+from config.database import db
+from config.settings import (
+    SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS, SMTP_TIMEOUT_SECONDS, SENDER_EMAIL,
+    EMAIL_WORKERS, EMAIL_SMTP_POOL_SIZE, EMAIL_BATCH_SIZE, EMAIL_GROUP_WINDOW_SECONDS, EMAIL_POLL_INTERVAL_SECONDS,
+    EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_BASE_SECONDS, EMAIL_LEASE_SECONDS,
+)
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+from utils.metrics import email_messages_total, email_queue_lag_seconds, email_send_seconds
+import asyncio
+import logging
+import random
+import smtplib
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between two attempts at one message
+EMAIL_RETRY_MAX_SECONDS = 3600
+# The server answered and refused the message; the session itself is still usable
+_REFUSALS = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+
+class SMTPPool:
+    """Up to `size` reusable SMTP connections.
+
+    smtplib is blocking, so connecting and sending run in worker threads. A
+    connection goes back to the pool after each message, including ones the
+    server refused; it is dropped on connection errors. A pooled connection
+    the server has since closed is replaced once, transparently.
+    """
+
+    def __init__(self, size: int, host: str, port: int, username: str = "", password: str = "",
+                 starttls: bool = False, timeout: float = 30):
+        self.host, self.port = host, port
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    async def send(self, message: EmailMessage):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            reused = connection is not None
+            while True:
+                if connection is None:
+                    connection = await asyncio.to_thread(self._connect)
+                try:
+                    await asyncio.to_thread(connection.send_message, message)
+                except _REFUSALS:
+                    # smtplib has already reset the session
+                    self._idle.append(connection)
+                    raise
+                except OSError:
+                    # Connection-level failure (SMTPException subclasses OSError, refusals are handled above)
+                    self._discard(connection)
+                    connection = None
+                    if not reused:
+                        raise
+                    reused = False
+                    continue
+                except BaseException:
+                    self._discard(connection)
+                    raise
+                self._idle.append(connection)
+                return
+
+    def _discard(self, connection: smtplib.SMTP):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            try:
+                await asyncio.to_thread(connection.quit)
+            except Exception:
+                self._discard(connection)
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies mean retrying cannot help"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter after `attempts` failed attempts"""
+    delay = min(EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), EMAIL_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+def build_email(to: str, messages: List[dict], sender: str) -> EmailMessage:
+    """One email for all of a recipient's queued messages"""
+    email = EmailMessage()
+    email["From"] = sender
+    email["To"] = to
+    if len(messages) == 1:
+        email["Subject"] = messages[0]["subject"]
+        email.set_content(messages[0]["body"])
+    else:
+        email["Subject"] = f"{len(messages)} new notifications from EduPro"
+        email.set_content("\n\n".join(f"{m['subject']}\n{'-' * len(m['subject'])}\n{m['body']}" for m in messages))
+    return email
+
+class EmailOutbox:
+    """Durable outgoing email queue in the `email_outbox` collection.
+
+    enqueue() stores messages as pending, due after the grouping window.
+    Worker tasks claim due messages in batches with a lease (claim id plus
+    locked_until), so any number of workers in any number of processes can
+    share the queue and a crashed worker's claim expires and is picked up
+    again. Each recipient's messages in a batch go out as one email over the
+    SMTP pool. Temporary failures are retried with exponential backoff up to
+    `max_attempts`; 5xx replies fail at once. Delivery is at least once.
+    """
+
+    def __init__(self, database, pool: Optional[SMTPPool], workers: int, batch_size: int, sender: str):
+        self.database = database
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.sender = sender
+        self.max_attempts = EMAIL_MAX_ATTEMPTS
+        self._tasks = []
+        self._stopping = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.pool is not None
+
+    async def enqueue(self, messages: List[dict]) -> int:
+        """Queue {to, subject, body, tenant_id} messages; a no-op while email is not configured"""
+        messages = [m for m in messages if m.get("to")]
+        if not self.enabled or not messages:
+            return 0
+        now = datetime.now(timezone.utc)
+        due = now + timedelta(seconds=EMAIL_GROUP_WINDOW_SECONDS)
+        await self.database.email_outbox.insert_many([{
+            "id": str(uuid.uuid4()),
+            "tenant_id": m.get("tenant_id"),
+            "to": m["to"],
+            "subject": m["subject"],
+            "body": m["body"],
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": due,
+        } for m in messages])
+        return len(messages)
+
+    def start(self):
+        if not self.enabled or self._tasks:
+            return
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        logger.info(f"Email outbox started with {self.workers} workers")
+
+    async def _work(self):
+        while not self._stopping.is_set():
+            try:
+                handled = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox batch failed: {e!r}")
+                handled = 0
+            if not handled:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), EMAIL_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def process_batch(self) -> int:
+        """Claim due messages for up to batch_size recipients and send them; returns how many were claimed"""
+        outbox = self.database.email_outbox
+        now = datetime.now(timezone.utc)
+        due = {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now}},
+            # Claimed by a worker that never finished
+            {"status": "sending", "locked_until": {"$lte": now}},
+        ]}
+        candidates = await outbox.find(due, {"_id": 0, "to": 1}).sort("next_attempt_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return 0
+        # Claim every due message for these recipients, not just the oldest ones, so each gets one email
+        claim = str(uuid.uuid4())
+        await outbox.update_many(
+            {"to": {"$in": list({c["to"] for c in candidates})}, **due},
+            {"$set": {"status": "sending", "claim": claim, "locked_until": now + timedelta(seconds=EMAIL_LEASE_SECONDS)}},
+        )
+        # Other workers may have claimed some of them first
+        claimed = await outbox.find({"claim": claim}, {"_id": 0}).to_list(None)
+        if not claimed:
+            return 0
+
+        groups: Dict[str, List[dict]] = {}
+        for message in claimed:
+            groups.setdefault(message["to"], []).append(message)
+        errors = await asyncio.gather(*[self._send(to, messages) for to, messages in groups.items()])
+
+        sent = [m for messages, error in zip(groups.values(), errors) if error is None for m in messages]
+        finished = datetime.now(timezone.utc)
+        if sent:
+            await outbox.update_many(
+                {"id": {"$in": [m["id"] for m in sent]}, "claim": claim},
+                {"$set": {"status": "sent", "sent_at": finished}, "$unset": {"claim": "", "locked_until": ""}},
+            )
+            email_messages_total.inc(("sent",), len(sent))
+            for message in sent:
+                email_queue_lag_seconds.observe((finished - _aware(message["created_at"])).total_seconds())
+        for messages, error in zip(groups.values(), errors):
+            if error is not None:
+                await self._fail(messages, error, claim, finished)
+        return len(claimed)
+
+    async def _send(self, to: str, messages: List[dict]) -> Optional[Exception]:
+        start = time.perf_counter()
+        try:
+            await self.pool.send(build_email(to, messages, self.sender))
+        except Exception as e:
+            return e
+        finally:
+            email_send_seconds.observe(time.perf_counter() - start)
+        return None
+
+    async def _fail(self, messages: List[dict], error: Exception, claim: str, now: datetime):
+        attempts = max(m.get("attempts", 0) for m in messages) + 1
+        update = {"attempts": attempts, "last_error": repr(error)[:500]}
+        if is_permanent(error) or attempts >= self.max_attempts:
+            update["status"] = "failed"
+            result = "failed"
+            logger.error(f"Giving up on {len(messages)} email(s) to {messages[0]['to']} after {attempts} attempts: {error!r}")
+        else:
+            update["status"] = "pending"
+            update["next_attempt_at"] = now + timedelta(seconds=retry_delay(attempts))
+            result = "retried"
+        await self.database.email_outbox.update_many(
+            {"id": {"$in": [m["id"] for m in messages]}, "claim": claim},
+            {"$set": update, "$unset": {"claim": "", "locked_until": ""}},
+        )
+        email_messages_total.inc((result,), len(messages))
+
+    async def close(self, timeout: float = 10):
+        """Let workers finish their current batch, then stop them and close SMTP connections"""
+        if self._tasks:
+            self._stopping.set()
+            done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                # Their claims expire after EMAIL_LEASE_SECONDS and are retried
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._tasks = []
+        if self.pool is not None:
+            await self.pool.close()
+
+def _aware(value: datetime) -> datetime:
+    # Motor returns naive UTC datetimes unless the client is tz_aware
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+email_outbox = EmailOutbox(
+    db,
+    SMTPPool(EMAIL_SMTP_POOL_SIZE, SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS, SMTP_TIMEOUT_SECONDS)
+    if SMTP_HOST else None,
+    EMAIL_WORKERS,
+    EMAIL_BATCH_SIZE,
+    SENDER_EMAIL,
+)
+
+async def enqueue_emails(messages: List[dict]) -> int:
+    return await email_outbox.enqueue(messages)
+
+async def enqueue_email(to: str, subject: str, body: str, tenant_id: Optional[str] = None) -> int:
+    return await enqueue_emails([{"to": to, "subject": subject, "body": body, "tenant_id": tenant_id}])
@@ -0,0 +1,135 @@
+from config.settings import EXPORT_GZIP_LEVEL
+from typing import AsyncIterator, List, Optional
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import zlib
+
+# Report formats: name -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+_ACCEPT_FORMATS = {
+    "text/csv": "csv",
+    "application/gzip": "csv.gz",
+    "application/x-gzip": "csv.gz",
+    EXPORT_FORMATS["xlsx"][0]: "xlsx",
+}
+
+# Bytes of CSV buffered before a chunk is handed to the response
+CSV_CHUNK_BYTES = 64 * 1024
+# Rows handed to openpyxl per worker-thread call
+XLSX_BATCH_ROWS = 1000
+# Excel's row limit per sheet, header included; longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1_048_576
+XLSX_READ_BYTES = 256 * 1024
+
+def negotiate_format(format: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """Export format from the `format` query parameter, else the first known type in Accept, else CSV.
+
+    Returns None for an unknown `format` value.
+    """
+    if format:
+        format = format.lower()
+        return format if format in EXPORT_FORMATS else None
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in _ACCEPT_FORMATS:
+            return _ACCEPT_FORMATS[media_type]
+    return "csv"
+
+async def csv_chunks(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode rows as UTF-8 CSV in chunks of about CSV_CHUNK_BYTES, taking the header from the first row"""
+    buffer = io.StringIO()
+    writer = None
+    async for row in rows:
+        if writer is None:
+            # Keys missing from the first row are dropped rather than failing halfway through the download
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _cell(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def _append_rows(workbook, state: dict, rows: List[dict]):
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    for row in rows:
+        if state["fieldnames"] is None:
+            state["fieldnames"] = list(row.keys())
+        if state["sheet"] is None or state["rows"] >= XLSX_MAX_ROWS:
+            sheets = len(workbook.worksheets)
+            state["sheet"] = workbook.create_sheet(f"Report {sheets + 1}" if sheets else "Report")
+            state["sheet"].append(state["fieldnames"])
+            state["rows"] = 1
+        values = [_cell(row.get(field)) for field in state["fieldnames"]]
+        state["sheet"].append([ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v for v in values])
+        state["rows"] += 1
+
+def _save(workbook, state: dict, path: str):
+    if state["sheet"] is None:
+        workbook.create_sheet("Report")
+    workbook.save(path)
+
+async def xlsx_chunks(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Write rows to an XLSX workbook in openpyxl write-only mode, then stream the file.
+
+    Write-only worksheets spool rows to a temporary file as they are appended,
+    so memory stays flat regardless of row count. A zip file cannot be sent
+    before it is complete, so the first byte goes out once every row is written.
+    openpyxl work runs in a worker thread, a batch of rows at a time.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    state = {"fieldnames": None, "sheet": None, "rows": 0}
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        batch = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= XLSX_BATCH_ROWS:
+                await asyncio.to_thread(_append_rows, workbook, state, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(_append_rows, workbook, state, batch)
+        await asyncio.to_thread(_save, workbook, state, path)
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, XLSX_READ_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+def export_chunks(rows: AsyncIterator[dict], format: str) -> AsyncIterator[bytes]:
+    """Encode rows in one of EXPORT_FORMATS as a stream of byte chunks"""
+    if format == "xlsx":
+        return xlsx_chunks(rows)
+    if format == "csv.gz":
+        return gzip_chunks(csv_chunks(rows))
+    return csv_chunks(rows)
@@ -0,0 +1,256 @@
+from pymongo import monitoring
+from typing import Dict, Tuple
+from utils.request_context import get_request_context
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+DB_OPERATION_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+QUEUE_LAG_BUCKETS = (1, 5, 15, 30, 45, 60, 120, 300, 900, 3600)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def totals(self, labels: Tuple[str, ...] = ()) -> Tuple[int, float]:
+        """(observation count, sum of observed values) for one label set"""
+        with self._lock:
+            series = self._values.get(labels)
+            return (sum(series[:-1]), series[-1]) if series is not None else (0, 0)
+
+    def _samples(self):
+        for labels, series in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",))
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status", ("method", "route", "status"))
+http_request_db_operations = Histogram(
+    "http_request_db_operations", "Mongo commands issued per HTTP request", ("method", "route"), DB_OPERATION_BUCKETS)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in Mongo commands per HTTP request", ("method", "route"))
+mongo_commands_total = Counter(
+    "mongo_commands_total", "Mongo commands by name and outcome", ("command", "outcome"))
+mongo_command_duration_seconds = Histogram(
+    "mongo_command_duration_seconds", "Mongo command latency by name", ("command",))
+write_behind_batch_documents = Histogram(
+    "write_behind_batch_documents", "Documents per write-behind insert_many", ("collection",), BATCH_SIZE_BUCKETS)
+write_behind_flush_seconds = Histogram(
+    "write_behind_flush_seconds", "Write-behind insert_many latency", ("collection",))
+write_behind_failed_documents_total = Counter(
+    "write_behind_failed_documents_total", "Buffered documents whose insert failed", ("collection",))
+report_artifact_requests_total = Counter(
+    "report_artifact_requests_total", "Report job submissions by artifact cache result", ("report", "result"))
+report_job_seconds = Histogram(
+    "report_job_seconds", "Time to build a report artifact", ("report",))
+email_messages_total = Counter(
+    "email_messages_total", "Outbox messages by outcome of a send attempt", ("result",))
+email_send_seconds = Histogram(
+    "email_send_seconds", "SMTP send latency per grouped email")
+email_queue_lag_seconds = Histogram(
+    "email_queue_lag_seconds", "Time from enqueue to delivery, grouping window included", buckets=QUEUE_LAG_BUCKETS)
+fees_marked_overdue_total = Counter(
+    "fees_marked_overdue_total", "Pending fees moved to overdue by the scheduler")
+overdue_fee_run_seconds = Histogram(
+    "overdue_fee_run_seconds", "Duration of one overdue-fee pass over all tenant databases")
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts Mongo commands globally and against the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        command = (event.command_name,)
+        mongo_commands_total.inc(command + (outcome,))
+        mongo_command_duration_seconds.observe(seconds, command)
+        context = get_request_context()
+        if context is not None:
+            context.db_operations += 1
+            context.db_seconds += seconds
+
+mongo_command_listener = MongoCommandMetrics()
+
+mongo_pool_connections = Gauge(
+    "mongo_pool_connections", "Open connections in the Mongo pool", ("address",))
+mongo_pool_checked_out = Gauge(
+    "mongo_pool_checked_out", "Mongo connections currently checked out", ("address",))
+mongo_pool_utilization = Gauge(
+    "mongo_pool_utilization", "Checked-out connections as a fraction of maxPoolSize", ("address",))
+mongo_pool_checkout_wait_seconds = Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool", ("address",),
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+mongo_pool_checkout_failures_total = Counter(
+    "mongo_pool_checkout_failures_total", "Failed pool checkouts by reason", ("address", "reason"))
+mongo_pool_cleared_total = Counter(
+    "mongo_pool_cleared_total", "Times the Mongo pool was cleared", ("address",))
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Exports pool size, checkout wait time and utilisation.
+
+    A checkout's started and finished events fire on the same thread, so the
+    start time is kept in a thread-local.
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._checkout_started = threading.local()
+        self._checked_out: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _address(event) -> Tuple[str]:
+        host, port = event.address
+        return (f"{host}:{port}",)
+
+    def _adjust_checked_out(self, address: Tuple[str], delta: int):
+        with self._lock:
+            in_use = self._checked_out.get(address[0], 0) + delta
+            self._checked_out[address[0]] = in_use
+        mongo_pool_checked_out.set(in_use, address)
+        if self.max_pool_size:
+            mongo_pool_utilization.set(in_use / self.max_pool_size, address)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        mongo_pool_cleared_total.inc(self._address(event))
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc(self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(self._address(event))
+
+    def connection_check_out_started(self, event):
+        self._checkout_started.value = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        self._observe_wait(address)
+        mongo_pool_checkout_failures_total.inc(address + (str(event.reason),))
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        self._observe_wait(address)
+        self._adjust_checked_out(address, 1)
+
+    def connection_checked_in(self, event):
+        self._adjust_checked_out(self._address(event), -1)
+
+    def _observe_wait(self, address: Tuple[str]):
+        started = getattr(self._checkout_started, "value", None)
+        if started is not None:
+            mongo_pool_checkout_wait_seconds.observe(time.perf_counter() - started, address)
+            self._checkout_started.value = None
@@ -0,0 +1,102 @@
+from config.settings import NOTIFICATION_ARCHIVE_DIR
+from utils.notifications import adjust_unread_counts, announcement_audience, unread_increment
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import gzip
+import json
+import os
+
+# One gzip NDJSON file per user and month of created_at:
+#   <NOTIFICATION_ARCHIVE_DIR>/<tenant_id>/<user_id>/<YYYY-MM>.ndjson.gz
+# Tenant announcements go to <tenant_id>/_announcements/ instead.
+# Each archive run appends a new gzip member, which gzip readers treat as one stream.
+
+ANNOUNCEMENTS_DIR = "_announcements"
+
+def _user_dir(tenant_id: str, user_id: str) -> Path:
+    if user_id == announcement_audience(tenant_id):
+        user_id = ANNOUNCEMENTS_DIR
+    return Path(NOTIFICATION_ARCHIVE_DIR) / tenant_id / user_id
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _append(groups: Dict[Tuple[str, str, str], List[dict]]):
+    for (tenant_id, user_id, month), documents in groups.items():
+        directory = _user_dir(tenant_id, user_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(doc, default=_json_default) + "\n" for doc in documents)
+        with open(directory / f"{month}.ndjson.gz", "ab") as f:
+            f.write(gzip.compress(lines.encode()))
+            f.flush()
+            # The documents are deleted from Mongo next, so the file must be on disk first
+            os.fsync(f.fileno())
+
+async def archive_notifications(database, cutoff: str, batch_size: int) -> dict:
+    """Move notifications created before `cutoff` (ISO timestamp) from `database` to archive files.
+
+    Works oldest first in batches of `batch_size`: a batch is written and
+    fsynced before it is deleted, so an interrupted run can only leave
+    duplicates in the archive (read_archive drops them), never lose data.
+    Unread counters are adjusted for archived unread notifications.
+    Run one archiver at a time per database.
+    """
+    archived = 0
+    batches = 0
+    while True:
+        batch = await database.notifications.find({"created_at": {"$lt": cutoff}}).sort("created_at", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        groups = {}
+        unread = {}
+        announcements = []
+        for doc in batch:
+            groups.setdefault((doc["tenant_id"], doc["user_id"], doc["created_at"][:7]), []).append(
+                {key: value for key, value in doc.items() if key != "_id"})
+            if doc["user_id"] == announcement_audience(doc["tenant_id"]):
+                announcements.append(doc)
+            elif not doc.get("read"):
+                unread[doc["user_id"]] = unread.get(doc["user_id"], 0) - 1
+        await asyncio.to_thread(_append, groups)
+        await database.notifications.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        await adjust_unread_counts(database, unread)
+        for announcement in announcements:
+            await _retire_announcement(database, announcement)
+        archived += len(batch)
+        batches += 1
+    return {"archived": archived, "batches": batches}
+
+async def _retire_announcement(database, announcement: dict):
+    """Drop an archived announcement from the unread counters of users who never read it"""
+    readers = await database.announcement_reads.distinct("user_id", {"announcement_id": announcement["id"]})
+    skip = readers + announcement.get("exclude_user_ids", [])
+    await database.notification_counters.update_many(
+        {"tenant_id": announcement["tenant_id"], "user_id": {"$nin": skip}}, unread_increment(-1)
+    )
+    await database.announcement_reads.delete_many({"announcement_id": announcement["id"]})
+
+def read_archive(tenant_id: str, user_id: str, before: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """A user's archived notifications and tenant announcements, newest first, created before `before` when given"""
+    paths = {}
+    for directory in (_user_dir(tenant_id, user_id), _user_dir(tenant_id, announcement_audience(tenant_id))):
+        if directory.is_dir():
+            for path in directory.glob("*.ndjson.gz"):
+                paths.setdefault(path.name[:7], []).append(path)
+    found = {}
+    # Months are visited newest first; once a month fills the page, older months cannot contribute
+    for month in sorted(paths, reverse=True):
+        if before and month > before[:7]:
+            continue
+        for path in paths[month]:
+            with gzip.open(path, "rt") as f:
+                for line in f:
+                    doc = json.loads(line)
+                    if (before is None or doc["created_at"] < before) and user_id not in doc.get("exclude_user_ids", ()):
+                        found[doc["id"]] = doc
+        if len(found) >= limit:
+            break
+    return sorted(found.values(), key=lambda doc: doc["created_at"], reverse=True)[:limit]
@@ -1,12 +1,23 @@
 from config.database import db
+from config.settings import TENANT_ADMIN_CACHE_SECONDS, NOTIFICATION_DIGEST_WINDOW_MS, NOTIFICATION_DIGEST_STORE
+from config.tenants import tenant_router
+from utils.digest import NotificationCoalescer
 from utils.websocket import manager
+from utils.write_behind import insert_document
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from pymongo import ReturnDocument, UpdateOne
+from typing import Dict, List, Optional
 
-async def create_notification(title: str, message: str, notification_type: str, user_id: str, tenant_id: str):
-    """Create a notification and broadcast it via WebSocket"""
-    notification = {
+ADMIN_ROLES = ["school_admin", "super_admin"]
+UNREAD_REBUILD_ATTEMPTS = 3
+
+# tenant_id -> (expires_at, [admin user ids])
+_tenant_admins = {}
+
+def _notification_doc(title: str, message: str, notification_type: str, user_id: str, tenant_id: str) -> dict:
+    return {
         "id": str(uuid.uuid4()),
         "title": title,
         "message": message,
@@ -16,19 +27,249 @@ async def create_notification(title: str, message: str, notification_type: str,
         "read": False,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    
-    await db.notifications.insert_one(notification)
+
+async def _store_notification(notification: dict):
+    tenant_db = await tenant_router.get_database(notification["tenant_id"])
+    await insert_document(tenant_db.notifications, notification)
+    await adjust_unread_counts(tenant_db, {notification["user_id"]: 1})
     notification.pop("_id")
+
+# With NOTIFICATION_DIGEST_STORE the coalescer stores what it delivers (digests
+# included); otherwise notifications are stored one by one before delivery.
+notification_coalescer = NotificationCoalescer(
+    manager, NOTIFICATION_DIGEST_WINDOW_MS, _store_notification if NOTIFICATION_DIGEST_STORE else None
+)
+
+async def create_notification(title: str, message: str, notification_type: str, user_id: str, tenant_id: str):
+    """Create a notification and broadcast it via WebSocket"""
+    notification = _notification_doc(title, message, notification_type, user_id, tenant_id)
     
-    await manager.send_personal_notification(notification, user_id, tenant_id)
+    if notification_coalescer.persist is None:
+        await _store_notification(notification)
+    
+    await notification_coalescer.send(notification)
     
     return notification
 
+async def notify_users(title: str, message: str, notification_type: str, user_ids: List[str], tenant_id: str):
+    """Create the same notification for several users with a single insert_many.
+
+    With NOTIFICATION_DIGEST_STORE each user's copy is stored by the coalescer instead.
+    """
+    if not user_ids:
+        return []
+    notifications = [_notification_doc(title, message, notification_type, user_id, tenant_id) for user_id in user_ids]
+
+    if notification_coalescer.persist is None:
+        tenant_db = await tenant_router.get_database(tenant_id)
+        await tenant_db.notifications.insert_many(notifications)
+        await adjust_unread_counts(tenant_db, {user_id: 1 for user_id in user_ids})
+        for notification in notifications:
+            notification.pop("_id")
+    for notification in notifications:
+        await notification_coalescer.send(notification)
+
+    return notifications
+
+def unread_increment(delta: int) -> dict:
+    """Update for an unread counter; every change bumps its version so a rebuild can tell it raced one"""
+    return {"$inc": {"unread": delta, "version": 1}}
+
+async def adjust_unread_counts(tenant_db, deltas: Dict[str, int]):
+    """Apply per-user changes to the unread counters in one round trip.
+
+    Only existing counters are touched: a user without one gets it from a
+    full count the first time get_unread_count() is called, so notifications
+    written before the counter existed are not missed.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    if len(deltas) == 1:
+        user_id, delta = next(iter(deltas.items()))
+        await tenant_db.notification_counters.update_one({"user_id": user_id}, unread_increment(delta))
+    else:
+        await tenant_db.notification_counters.bulk_write(
+            [UpdateOne({"user_id": user_id}, unread_increment(delta)) for user_id, delta in deltas.items()],
+            ordered=False
+        )
+
+async def get_unread_count(tenant_db, user_id: str, tenant_id: str) -> int:
+    counter = await tenant_db.notification_counters.find_one({"user_id": user_id}, {"_id": 0, "unread": 1, "stale": 1})
+    if counter is not None and counter["unread"] >= 0 and not counter.get("stale"):
+        return counter["unread"]
+    # Missing (first use), drifted below zero or left stale: rebuild from the notifications
+    # themselves. The counter exists before the recount, so changes made meanwhile land on
+    # it and bump its version instead of being lost; the recount is stored only if none did.
+    for _ in range(UNREAD_REBUILD_ATTEMPTS):
+        counter = await tenant_db.notification_counters.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {"unread": 0, "version": 0, "stale": True, "tenant_id": tenant_id}},
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        unread = await _count_unread(tenant_db, user_id, tenant_id)
+        stored = await tenant_db.notification_counters.update_one(
+            {"user_id": user_id, "version": counter.get("version")},
+            {"$set": {"unread": unread, "tenant_id": tenant_id}, "$unset": {"stale": ""}}
+        )
+        if stored.matched_count:
+            return unread
+    # Still racing writes: leave the counter to be rebuilt on the next read
+    await tenant_db.notification_counters.update_one({"user_id": user_id}, {"$set": {"stale": True}})
+    return unread
+
+async def _count_unread(tenant_db, user_id: str, tenant_id: str) -> int:
+    unread = await tenant_db.notifications.count_documents({"user_id": user_id, "read": False})
+    announcement_ids = await tenant_db.notifications.distinct("id", _announcements_query(user_id, tenant_id))
+    if announcement_ids:
+        read = await tenant_db.announcement_reads.count_documents({"user_id": user_id, "announcement_id": {"$in": announcement_ids}})
+        unread += len(announcement_ids) - read
+    return unread
+
+async def get_tenant_admin_ids(tenant_id: str) -> List[str]:
+    """Ids of the tenant's admins, cached per worker for TENANT_ADMIN_CACHE_SECONDS"""
+    cached = _tenant_admins.get(tenant_id)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    admins = await db.users.find({"tenant_id": tenant_id, "role": {"$in": ADMIN_ROLES}}, {"_id": 0, "id": 1}).to_list(100)
+    admin_ids = [admin["id"] for admin in admins]
+    _tenant_admins[tenant_id] = (now + TENANT_ADMIN_CACHE_SECONDS, admin_ids)
+    return admin_ids
+
+def invalidate_tenant_admins(tenant_id: Optional[str] = None):
+    if tenant_id is None:
+        _tenant_admins.clear()
+    else:
+        _tenant_admins.pop(tenant_id, None)
+
+def announcement_audience(tenant_id: str) -> str:
+    """user_id under which a tenant-wide announcement is stored"""
+    return f"tenant:{tenant_id}"
+
+def _announcements_query(user_id: str, tenant_id: str) -> dict:
+    return {"user_id": announcement_audience(tenant_id), "exclude_user_ids": {"$ne": user_id}}
+
+def visible_notifications_query(user_id: str, tenant_id: str) -> dict:
+    """A user's personal notifications plus the tenant announcements addressed to them.
+
+    Announcements are stored once with the tenant audience as user_id, so a
+    single $in over the (user_id, created_at) index returns both, already
+    merged in created_at order.
+    """
+    return {
+        "user_id": {"$in": [user_id, announcement_audience(tenant_id)]},
+        "tenant_id": tenant_id,
+        "exclude_user_ids": {"$ne": user_id},
+    }
+
+async def apply_read_receipts(tenant_db, user_id: str, notifications: List[dict]) -> List[dict]:
+    """Set `read` on announcements the user has read and drop the ones they deleted"""
+    announcement_ids = [n["id"] for n in notifications if n["user_id"] != user_id]
+    if not announcement_ids:
+        return notifications
+    receipts = await tenant_db.announcement_reads.find(
+        {"user_id": user_id, "announcement_id": {"$in": announcement_ids}}, {"_id": 0, "announcement_id": 1, "hidden": 1}
+    ).to_list(len(announcement_ids))
+    receipts = {receipt["announcement_id"]: receipt for receipt in receipts}
+    visible = []
+    for notification in notifications:
+        receipt = receipts.get(notification["id"])
+        if receipt is not None:
+            if receipt.get("hidden"):
+                continue
+            notification["read"] = True
+        visible.append(notification)
+    return visible
+
+async def find_visible_notifications(tenant_db, user_id: str, query: dict, projection: dict, direction: int,
+                                     limit: int, unread_only: bool = False) -> List[dict]:
+    """Up to `limit` notifications matching `query` in created_at order, read receipts applied.
+
+    Deleted announcements (and, with unread_only, read ones) only drop out once
+    their receipts are applied, so further pages are fetched until `limit`
+    notifications survive or the query runs out.
+    """
+    visible, seen, fetched = [], set(), 0
+    while len(visible) < limit:
+        page = await tenant_db.notifications.find(query, projection).sort("created_at", direction).skip(fetched).limit(limit).to_list(limit)
+        fetched += len(page)
+        for notification in await apply_read_receipts(tenant_db, user_id, page):
+            # A notification inserted meanwhile shifts the pages; skip what was already taken
+            if notification["id"] not in seen and not (unread_only and notification["read"]):
+                seen.add(notification["id"])
+                visible.append(notification)
+        if len(page) < limit:
+            break
+    return visible[:limit]
+
+async def find_announcement(tenant_db, announcement_id: str, user_id: str, tenant_id: str) -> Optional[dict]:
+    return await tenant_db.notifications.find_one(
+        {"id": announcement_id, **_announcements_query(user_id, tenant_id)}, {"_id": 0, "id": 1}
+    )
+
+async def write_read_receipt(tenant_db, announcement_id: str, user_id: str, tenant_id: str, hidden: bool = False) -> Optional[dict]:
+    """Record that the user read (or deleted) an announcement.
+
+    Returns the previous receipt, or None when the announcement was unread until now.
+    """
+    update = {"$setOnInsert": {"tenant_id": tenant_id, "read_at": datetime.now(timezone.utc)}}
+    if hidden:
+        update["$set"] = {"hidden": True}
+    previous = await tenant_db.announcement_reads.find_one_and_update(
+        {"announcement_id": announcement_id, "user_id": user_id},
+        update,
+        projection={"_id": 0, "hidden": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        await adjust_unread_counts(tenant_db, {user_id: -1})
+    return previous
+
+async def mark_announcements_read(tenant_db, user_id: str, tenant_id: str) -> int:
+    """Write receipts for every unread announcement; returns how many were unread.
+
+    Receipts are upserts, so a concurrent read-all or write_read_receipt()
+    for the same announcement is not an error and is counted only once.
+    """
+    announcement_ids = await tenant_db.notifications.distinct("id", _announcements_query(user_id, tenant_id))
+    if not announcement_ids:
+        return 0
+    already_read = set(await tenant_db.announcement_reads.distinct(
+        "announcement_id", {"user_id": user_id, "announcement_id": {"$in": announcement_ids}}
+    ))
+    unread = [announcement_id for announcement_id in announcement_ids if announcement_id not in already_read]
+    if not unread:
+        return 0
+    receipt = {"$setOnInsert": {"tenant_id": tenant_id, "read_at": datetime.now(timezone.utc)}}
+    result = await tenant_db.announcement_reads.bulk_write(
+        [UpdateOne({"announcement_id": announcement_id, "user_id": user_id}, receipt, upsert=True) for announcement_id in unread],
+        ordered=False
+    )
+    return result.upserted_count
+
 async def broadcast_notification(title: str, message: str, notification_type: str, tenant_id: str, exclude_user_id: Optional[str] = None):
-    """Broadcast notification to all users in a tenant"""
-    users = await db.users.find({"tenant_id": tenant_id}, {"_id": 0}).to_list(1000)
+    """Announce to all users in a tenant: one stored document and one WebSocket broadcast.
+
+    Read state is kept per user in announcement_reads, written only when a
+    user reads or deletes the announcement.
+    """
+    announcement = _notification_doc(title, message, notification_type, announcement_audience(tenant_id), tenant_id)
+    counters = {"tenant_id": tenant_id}
+    if exclude_user_id:
+        announcement["exclude_user_ids"] = [exclude_user_id]
+        counters["user_id"] = {"$ne": exclude_user_id}
+    
+    tenant_db = await tenant_router.get_database(tenant_id)
+    await tenant_db.notifications.insert_one(announcement)
+    # Users without a counter yet pick the announcement up when it is rebuilt
+    await tenant_db.notification_counters.update_many(counters, unread_increment(1))
+    announcement.pop("_id")
+    
+    await manager.broadcast_to_tenant(announcement, tenant_id, exclude_user_id)
     
-    for user in users:
-        if exclude_user_id and user["id"] == exclude_user_id:
-            continue
-        await create_notification(title, message, notification_type, user["id"], tenant_id)
+    return announcement
@@ -0,0 +1,129 @@
+from config.settings import FEE_OVERDUE_INTERVAL_SECONDS, FEE_OVERDUE_BATCH_SIZE
+from config.tenants import tenant_router
+from utils.notifications import get_tenant_admin_ids, notify_users
+from utils.metrics import fees_marked_overdue_total, overdue_fee_run_seconds
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import logging
+import random
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# A run that stamped fees but never notified is assumed dead after this long
+STALE_RUN_SECONDS = 3600
+
+async def mark_overdue_fees(database, today: str, batch_size: int, run_id: Optional[str] = None) -> dict:
+    """Move pending fees due before `today` (YYYY-MM-DD) to overdue and notify each tenant's admins once.
+
+    Candidates come from the (status, due_date) index in batches of
+    `batch_size`. Each batch is flipped with one update_many that repeats the
+    status filter, so a fee is flipped by exactly one run even with several
+    workers racing, and rerunning is a no-op. Flipped fees carry the run id
+    until their tenant's admins are notified, so each run reports exactly the
+    fees it flipped; fees left stamped by a run that died are adopted by the
+    next one after STALE_RUN_SECONDS, each by exactly one run.
+    """
+    run_id = run_id or str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    due = {"status": "pending", "due_date": {"$lt": today}}
+
+    # Adopting restamps the time too, so a run's fees look stale to no one else while it works on them
+    adopted = await database.fees.update_many(
+        {"overdue_run": {"$exists": True}, "overdue_run_at": {"$lt": (now - timedelta(seconds=STALE_RUN_SECONDS)).isoformat()}},
+        {"$set": {"overdue_run": run_id, "overdue_run_at": now.isoformat()}},
+    )
+    flipped = 0
+    batches = 0
+    while True:
+        candidates = await database.fees.find(due, {"_id": 0, "id": 1}).limit(batch_size).to_list(batch_size)
+        if not candidates:
+            break
+        result = await database.fees.update_many(
+            {**due, "id": {"$in": [c["id"] for c in candidates]}},
+            {"$set": {"status": "overdue", "overdue_at": now.isoformat(), "overdue_run": run_id, "overdue_run_at": now.isoformat()}},
+        )
+        flipped += result.modified_count
+        batches += 1
+        if len(candidates) < batch_size:
+            break
+
+    if not flipped and not adopted.modified_count:
+        return {"flipped": 0, "batches": batches, "tenants_notified": 0}
+
+    per_tenant = await database.fees.aggregate([
+        {"$match": {"overdue_run": run_id}},
+        {"$group": {"_id": "$tenant_id", "count": {"$sum": 1}, "amount": {"$sum": "$amount"}}},
+    ]).to_list(None)
+    for tenant in per_tenant:
+        count = tenant["count"]
+        await notify_users(
+            title="Fees Overdue",
+            message=f"{count} fee{'s' if count != 1 else ''} totalling ${tenant['amount']:,.2f} became overdue",
+            notification_type="fee",
+            user_ids=await get_tenant_admin_ids(tenant["_id"]),
+            tenant_id=tenant["_id"]
+        )
+        # Released per tenant, so if a later tenant's notification fails only its fees are adopted again
+        await database.fees.update_many({"overdue_run": run_id, "tenant_id": tenant["_id"]}, {"$unset": {"overdue_run": "", "overdue_run_at": ""}})
+
+    fees_marked_overdue_total.inc((), flipped)
+    return {"flipped": flipped, "batches": batches, "tenants_notified": len(per_tenant)}
+
+class OverdueFeeScheduler:
+    """Runs mark_overdue_fees over every tenant database every `interval` seconds.
+
+    Each worker process runs its own scheduler; the runs need no lock
+    because mark_overdue_fees is safe to run concurrently.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        self._stopping = None
+
+    def start(self):
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def run_once(self) -> dict:
+        today = datetime.now(timezone.utc).date().isoformat()
+        start = time.perf_counter()
+        results = {}
+        for database in await tenant_router.databases():
+            results[database.name] = await mark_overdue_fees(database, today, self.batch_size)
+        overdue_fee_run_seconds.observe(time.perf_counter() - start)
+        return results
+
+    async def _loop(self):
+        # Spread workers that started together
+        delay = random.uniform(0, min(self.interval, 60))
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                results = await self.run_once()
+                flipped = sum(result["flipped"] for result in results.values())
+                if flipped:
+                    logger.info(f"Marked {flipped} fees overdue")
+            except Exception as e:
+                logger.error(f"Overdue fee run failed: {e!r}")
+            delay = self.interval
+
+    async def close(self):
+        if self._task is not None:
+            self._stopping.set()
+            # An interrupted run leaves its fees stamped; the next run adopts them
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+overdue_fee_scheduler = OverdueFeeScheduler(FEE_OVERDUE_INTERVAL_SECONDS, FEE_OVERDUE_BATCH_SIZE)
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+import asyncio
+import os
+import re
+import sys
+import threading
+
+BACKEND_DIR = str(Path(__file__).parent.parent)
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    else:
+        filename = "/".join(Path(filename).parts[-2:])
+    # ';' separates frames in the folded format
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+def _awaited_stack(coro) -> list:
+    """Frames of a suspended task, outermost first, following the cr_await chain"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            labels.append(f"[await {type(coro).__name__}]")
+            break
+        labels.append(_frame_label(frame))
+        next_coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        if next_coro is None:
+            labels.append("[await]")
+        coro = next_coro
+    return labels
+
+class RequestProfiler:
+    """Statistical profiler for a single request task.
+
+    A background thread samples the event loop thread every `interval`
+    seconds. While the task is on the CPU the sample is the thread's real
+    call stack; while it is suspended the sample is the chain of awaiting
+    coroutines, ending in an [await ...] frame. Samples are aggregated in
+    the folded format understood by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._task = asyncio.current_task()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        root = self._task.get_coro()
+        while not self._stopped.wait(self.interval):
+            stack = self._sample(root)
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    def _sample(self, root) -> list:
+        root_frame = getattr(root, "cr_frame", None)
+        frame = sys._current_frames().get(self._thread_id)
+        on_cpu = []
+        while frame is not None:
+            on_cpu.append(frame)
+            if frame is root_frame:
+                on_cpu.reverse()
+                return [_frame_label(f) for f in on_cpu]
+            frame = frame.f_back
+        return _awaited_stack(root)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def profile_filename(method: str, route: Optional[str]) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route or "unmatched").strip("_")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{timestamp}-{method.lower()}-{slug}.folded"
@@ -0,0 +1,186 @@
+from config.settings import REPORT_ARTIFACT_DIR, REPORT_ARTIFACT_MAX_MB, REPORT_JOB_QUEUE_SIZE, REPORT_JOB_WORKERS
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Optional
+from utils.exports import EXPORT_FORMATS, export_chunks
+from utils.metrics import report_artifact_requests_total, report_job_seconds
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+def artifact_key(tenant_id: str, report: str, params: dict, export_format: str, versions: Dict[str, int]) -> str:
+    """Identity of a report file: the same key means the same bytes"""
+    identity = {"tenant_id": tenant_id, "report": report, "params": params, "format": export_format, "versions": versions}
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+class ArtifactStore:
+    """Finished report files on local disk, evicted least recently used first above `max_bytes`.
+
+    A file's mtime is its last use: it is set when the file is written and
+    refreshed on every cache hit and download.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, export_format: str) -> Path:
+        return self.directory / f"{key}.{EXPORT_FORMATS[export_format][1]}"
+
+    def get(self, key: str, export_format: str) -> Optional[Path]:
+        path = self.path(key, export_format)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    async def write(self, key: str, export_format: str, chunks: AsyncIterator[bytes]) -> int:
+        """Write a file from `chunks`; it only becomes visible under its key once complete"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key, export_format)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.partial")
+        size = 0
+        try:
+            with open(partial, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(self.evict, path)
+        return size
+
+    def evict(self, keep: Optional[Path] = None):
+        files = []
+        total = 0
+        for path in self.directory.iterdir():
+            if path.name.endswith(".partial"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted report artifact {path.name}")
+
+class QueueFull(Exception):
+    pass
+
+class ReportJobRunner:
+    """Runs report exports outside the request in a bounded pool of `workers` tasks.
+
+    Jobs are recorded in the tenant's `report_jobs` collection so any worker
+    process can report their status, but each job runs in the process that
+    accepted it. A job whose artifact is already on disk completes at once, and
+    a job identical to one still queued or running in this process is answered
+    with that job instead of a new one. At most `queue_size` jobs wait.
+    """
+
+    def __init__(self, artifacts: ArtifactStore, workers: int, queue_size: int):
+        self.artifacts = artifacts
+        self.workers = workers
+        self._queue = asyncio.Queue(queue_size)
+        self._tasks = []
+        self._in_flight: Dict[str, tuple] = {}
+
+    async def submit(self, tenant_db, job: dict, rows: Callable[[], AsyncIterator[dict]]) -> dict:
+        """Record and queue `job` (report, format, key, tenant_id, ...); `rows` produces its rows when it runs"""
+        key = job["key"]
+        now = datetime.now(timezone.utc).isoformat()
+        job.update({"id": str(uuid.uuid4()), "status": "queued", "created_at": now})
+        if self.artifacts.get(key, job["format"]) is not None:
+            report_artifact_requests_total.inc((job["report"], "hit"))
+            job.update({"status": "done", "cached": True, "finished_at": now})
+            await tenant_db.report_jobs.insert_one(dict(job))
+            return job
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            report_artifact_requests_total.inc((job["report"], "joined"))
+            tenant_db, joined = in_flight
+            # Until the joined job is recorded, its submitted state is still current
+            return await tenant_db.report_jobs.find_one({"id": joined["id"]}, {"_id": 0}) or dict(joined)
+        if self._queue.full():
+            report_artifact_requests_total.inc((job["report"], "rejected"))
+            raise QueueFull()
+
+        self._in_flight[key] = (tenant_db, job)
+        await tenant_db.report_jobs.insert_one(dict(job))
+        try:
+            # Another submission may have taken the last slot while the job was being recorded
+            self._queue.put_nowait((tenant_db, job, rows))
+        except asyncio.QueueFull:
+            self._in_flight.pop(key, None)
+            await tenant_db.report_jobs.delete_one({"id": job["id"]})
+            report_artifact_requests_total.inc((job["report"], "rejected"))
+            raise QueueFull()
+        report_artifact_requests_total.inc((job["report"], "miss"))
+        self._start_workers()
+        return job
+
+    def _start_workers(self):
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def _work(self):
+        while True:
+            tenant_db, job, rows = await self._queue.get()
+            try:
+                await self._run(tenant_db, job, rows)
+            finally:
+                self._in_flight.pop(job["key"], None)
+                self._queue.task_done()
+
+    async def _run(self, tenant_db, job: dict, rows):
+        start = time.perf_counter()
+        await tenant_db.report_jobs.update_one(
+            {"id": job["id"]}, {"$set": {"status": "running", "started_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        try:
+            size = await self.artifacts.write(job["key"], job["format"], export_chunks(rows(), job["format"]))
+        except Exception as e:
+            logger.error(f"Report job {job['id']} ({job['report']}) failed: {e!r}")
+            update = {"status": "failed", "error": str(e)}
+        else:
+            update = {"status": "done", "size": size}
+        report_job_seconds.observe(time.perf_counter() - start, (job["report"],))
+        update["finished_at"] = datetime.now(timezone.utc).isoformat()
+        await tenant_db.report_jobs.update_one({"id": job["id"]}, {"$set": update})
+
+    async def close(self):
+        """Stop the workers; jobs still queued or running are marked failed"""
+        # Taken before cancelling: a cancelled worker drops its running job from _in_flight
+        unfinished = list(self._in_flight.values())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        finished_at = datetime.now(timezone.utc).isoformat()
+        for tenant_db, job in unfinished:
+            await tenant_db.report_jobs.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": "failed", "error": "Server shut down before the report finished", "finished_at": finished_at}}
+            )
+        self._in_flight.clear()
+        self._queue = asyncio.Queue(self._queue.maxsize)
+
+report_jobs = ReportJobRunner(
+    ArtifactStore(REPORT_ARTIFACT_DIR, REPORT_ARTIFACT_MAX_MB * 1024 * 1024), REPORT_JOB_WORKERS, REPORT_JOB_QUEUE_SIZE
+)
@@ -0,0 +1,33 @@
+from contextvars import ContextVar
+from typing import Optional
+
+class RequestContext:
+    """Per-request state shared between middleware, dependencies and Mongo listeners.
+
+    Motor runs pymongo calls in executor threads with a copy of the caller's
+    context, so listeners see the same object and mutate it in place.
+    """
+    __slots__ = ("scope", "tenant_id", "db_operations", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.tenant_id = None
+        self.db_operations = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the shared scope once routing is done
+        route = self.scope.get("route")
+        return route.path if route is not None else "<unmatched>"
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+def get_request_context() -> Optional[RequestContext]:
+    return _current.get()
+
+def set_request_context(context: Optional[RequestContext]):
+    return _current.set(context)
+
+def reset_request_context(token):
+    _current.reset(token)
@@ -0,0 +1,24 @@
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import Dict, List, Type
+from config.settings import FAST_RESPONSES
+
+_projections: Dict[Type[BaseModel], dict] = {}
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Mongo projection that returns only the fields declared on a response model"""
+    projection = _projections.get(model)
+    if projection is None:
+        projection = {"_id": 0, **{field: 1 for field in model.model_fields}}
+        _projections[model] = projection
+    return projection
+
+def list_response(documents: List[dict]):
+    """Return stored documents, bypassing response_model validation when FAST_RESPONSES is on.
+
+    Documents are validated on write, so the fast path trusts the stored shape and
+    hands the raw dicts straight to orjson. Otherwise FastAPI validates as usual.
+    """
+    if FAST_RESPONSES:
+        return ORJSONResponse(documents)
+    return documents
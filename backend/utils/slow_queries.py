@@ -0,0 +1,172 @@
+from pymongo import monitoring
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+from config.settings import (
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_BUFFER_SIZE,
+    SLOW_QUERY_LOG_FILE, SLOW_QUERY_LOG_MAX_BYTES, SLOW_QUERY_LOG_BACKUPS,
+)
+from utils.request_context import get_request_context
+import asyncio
+import json
+import logging
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Commands worth timing, mapped to the field holding their filter
+WATCHED_COMMANDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "aggregate": "pipeline",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+# Session and cluster metadata that must not be sent back inside an explain
+_COMMAND_METADATA = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+MAX_CONCURRENT_EXPLAINS = 2
+
+def query_shape(value):
+    """Replace literal values with '?' so filters can be logged without tenant data"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(item) for item in value]
+    return "?"
+
+def plan_stages(explain_output) -> list:
+    """Collect the stage names of the winning plan(s) in an explain document"""
+    stages = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            for key, child in node.items():
+                if key != "rejectedPlans":
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    walk(explain_output)
+    return stages
+
+def _build_log_handler() -> Optional[logging.Handler]:
+    if not SLOW_QUERY_LOG_FILE:
+        return None
+    try:
+        Path(SLOW_QUERY_LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+        return RotatingFileHandler(
+            SLOW_QUERY_LOG_FILE, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS
+        )
+    except OSError as e:
+        logger.warning(f"Slow query log file disabled: {e}")
+        return None
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """Captures Mongo commands slower than SLOW_QUERY_THRESHOLD_MS.
+
+    Each capture records the route and tenant of the request that issued it.
+    A sample of captures is explained on the event loop so that collection
+    scans can be flagged without blocking the request that triggered them.
+    """
+
+    def __init__(self):
+        self.threshold_micros = SLOW_QUERY_THRESHOLD_MS * 1000
+        self.entries = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+        self._pending = {}
+        self._client = None
+        self._loop = None
+        # Taken in the monitoring callback (any thread), released on the loop
+        self._explain_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXPLAINS)
+        self._file_logger = logging.getLogger("slow_queries")
+        self._file_logger.propagate = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_micros > 0
+
+    def start(self, client):
+        """Enable explains; must be called from the running event loop"""
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        if self.enabled and not self._file_logger.handlers:
+            handler = _build_log_handler()
+            if handler is not None:
+                self._file_logger.addHandler(handler)
+                self._file_logger.setLevel(logging.INFO)
+
+    def started(self, event):
+        if self.enabled and event.command_name in WATCHED_COMMANDS:
+            self._pending[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None and event.duration_micros >= self.threshold_micros:
+            self._capture(event, *pending)
+
+    def failed(self, event):
+        self._pending.pop((event.connection_id, event.request_id), None)
+
+    def latest(self, limit: int = 50, tenant_id: Optional[str] = None, collscan_only: bool = False) -> list:
+        entries = list(self.entries)
+        entries.reverse()
+        if tenant_id is not None:
+            entries = [e for e in entries if e["tenant_id"] == tenant_id]
+        if collscan_only:
+            entries = [e for e in entries if e["collscan"]]
+        return entries[:limit]
+
+    def _capture(self, event, database_name: str, command: dict):
+        context = get_request_context()
+        command_name = event.command_name
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "command": command_name,
+            "database": database_name,
+            "collection": command.get(command_name),
+            "filter": query_shape(command.get(WATCHED_COMMANDS[command_name])),
+            "duration_ms": round(event.duration_micros / 1000, 2),
+            "route": context.route if context is not None else None,
+            "tenant_id": context.tenant_id if context is not None else None,
+            "plan": None,
+            "collscan": None,
+        }
+        self.entries.append(entry)
+        self._file_logger.info(json.dumps(entry, default=str))
+
+        if (
+            self._loop is not None
+            and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+            and self._explain_slots.acquire(blocking=False)
+        ):
+            explained = {k: v for k, v in command.items() if not k.startswith("$") and k not in _COMMAND_METADATA}
+            try:
+                asyncio.run_coroutine_threadsafe(self._explain(entry, database_name, explained), self._loop)
+            except RuntimeError:
+                self._explain_slots.release()
+
+    async def _explain(self, entry: dict, database_name: str, command: dict):
+        try:
+            result = await self._client[database_name].command({"explain": command, "verbosity": "queryPlanner"})
+            stages = plan_stages(result)
+            entry["plan"] = stages
+            entry["collscan"] = "COLLSCAN" in stages
+            self._file_logger.info(json.dumps({"explain": entry}, default=str))
+            if entry["collscan"]:
+                logger.warning(
+                    f"COLLSCAN on {entry['collection']} ({entry['duration_ms']}ms) from {entry['route']}: {entry['filter']}"
+                )
+        except Exception as e:
+            logger.debug(f"Explain failed for slow {entry['command']}: {e}")
+        finally:
+            self._explain_slots.release()
+
+slow_query_monitor = SlowQueryMonitor()
@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional, Tuple
+
+# A (day, period) slot holds at most one lesson per teacher and one per grade.
+# The timetable's unique indexes enforce the same two rules in Mongo.
+SLOT_KINDS = ("teacher", "grade")
+
+def slot_keys(entry: dict) -> Dict[str, Tuple[str, int, str]]:
+    return {
+        "teacher": (entry["day"], entry["period"], entry["teacher_id"]),
+        "grade": (entry["day"], entry["period"], entry["grade"]),
+    }
+
+class SlotOccupancy:
+    """In-memory map of which lesson holds each teacher and grade slot of a tenant's week.
+
+    Holders are {"id": ...} for stored entries and {"index": ...} for entries
+    of an upload being validated, so a conflict can point at either.
+    """
+
+    def __init__(self):
+        self._holders: Dict[str, Dict[Tuple[str, int, str], dict]] = {kind: {} for kind in SLOT_KINDS}
+
+    @classmethod
+    async def load(cls, tenant_db, tenant_id: str) -> "SlotOccupancy":
+        """One query for the tenant's whole timetable, slot fields only"""
+        occupancy = cls()
+        async for entry in tenant_db.timetable.find(
+            {"tenant_id": tenant_id}, {"_id": 0, "id": 1, "day": 1, "period": 1, "teacher_id": 1, "grade": 1}
+        ):
+            occupancy.add(entry, {"id": entry["id"]})
+        return occupancy
+
+    def conflicts(self, entry: dict) -> List[Tuple[str, dict]]:
+        """(kind, holder) for every slot of `entry` that is already taken"""
+        keys = slot_keys(entry)
+        return [(kind, self._holders[kind][keys[kind]]) for kind in SLOT_KINDS if keys[kind] in self._holders[kind]]
+
+    def add(self, entry: dict, holder: dict):
+        """Take the entry's free slots; a slot that is already taken keeps its first holder"""
+        for kind, key in slot_keys(entry).items():
+            self._holders[kind].setdefault(key, holder)
+
+def describe_conflict(entry: dict, kind: str, holder: dict, index: Optional[int] = None) -> dict:
+    conflict = {"kind": kind, "day": entry["day"], "period": entry["period"]}
+    if index is not None:
+        conflict["index"] = index
+    conflict["teacher_id" if kind == "teacher" else "grade"] = entry["teacher_id" if kind == "teacher" else "grade"]
+    if "index" in holder:
+        conflict["conflicting_index"] = holder["index"]
+    else:
+        conflict["conflicting_id"] = holder["id"]
+    return conflict
+
+def find_conflicts(occupancy: SlotOccupancy, entries: List[dict]) -> List[dict]:
+    """Every clash of `entries` with the stored timetable and with each other, in one pass.
+
+    Each entry then takes its free slots in `occupancy`.
+    """
+    conflicts = []
+    for index, entry in enumerate(entries):
+        for kind, holder in occupancy.conflicts(entry):
+            conflicts.append(describe_conflict(entry, kind, holder, index))
+        occupancy.add(entry, {"index": index})
+    return conflicts
@@ -0,0 +1,237 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import random
+import time
+
+# Slots are numbered day * periods_per_day + period_index and a set of slots
+# is a Python int used as a bitset, so "free for this grade and this teacher"
+# is one AND of two ints and counting options is int.bit_count().
+
+TABU_TENURE = 10
+
+class TimetableInfeasible(Exception):
+    """The input cannot produce a timetable, whatever the search does"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _normalize(subject: str) -> str:
+    return subject.strip().lower()
+
+def assign_teachers(curriculum: Dict[str, Dict[str, int]], teacher_subjects: Dict[str, List[str]],
+                    capacity: Dict[str, int]) -> Dict[Tuple[str, str], str]:
+    """Pick one teacher per (grade, subject), balancing load against each teacher's free slots.
+
+    Subjects under the most pressure (weekly periods needed per period of
+    qualified teacher capacity) are staffed first, larger weekly counts
+    before smaller ones. Each goes to the qualified teacher who teaches the
+    fewest subjects, so versatile teachers stay free for whatever is left,
+    then to the one with the most capacity left.
+    """
+    qualified: Dict[str, List[str]] = {}
+    for teacher_id, subjects in teacher_subjects.items():
+        for subject in {_normalize(subject) for subject in subjects}:
+            qualified.setdefault(subject, []).append(teacher_id)
+    demands = [(grade, subject, count) for grade, subjects in curriculum.items() for subject, count in subjects.items() if count > 0]
+    needed: Dict[str, int] = {}
+    for _, subject, count in demands:
+        needed[_normalize(subject)] = needed.get(_normalize(subject), 0) + count
+    pressure = {subject: total / max(1, sum(capacity[t] for t in qualified.get(subject, []))) for subject, total in needed.items()}
+    demands.sort(key=lambda d: (-pressure[_normalize(d[1])], -d[2], d[0]))
+    versatility = {teacher_id: len({_normalize(subject) for subject in subjects}) for teacher_id, subjects in teacher_subjects.items()}
+
+    load = {teacher_id: 0 for teacher_id in teacher_subjects}
+    assignments, problems = {}, []
+    for grade, subject, count in demands:
+        candidates = [t for t in qualified.get(_normalize(subject), []) if capacity[t] - load[t] >= count]
+        if not candidates:
+            reason = "no teacher teaches it" if _normalize(subject) not in qualified else f"no qualified teacher has {count} free periods left"
+            problems.append(f"Grade {grade} {subject}: {reason}")
+            continue
+        teacher_id = min(candidates, key=lambda t: (versatility[t], load[t] - capacity[t], t))
+        load[teacher_id] += count
+        assignments[(grade, subject)] = teacher_id
+    if problems:
+        raise TimetableInfeasible(problems)
+    return assignments
+
+def solve_timetable(curriculum: Dict[str, Dict[str, int]], teacher_subjects: Dict[str, List[str]],
+                    days: int, periods_per_day: int,
+                    teacher_blocked: Optional[Dict[str, int]] = None, grade_blocked: Optional[Dict[str, int]] = None,
+                    max_teacher_periods_per_day: Optional[int] = None, budget_seconds: float = 10,
+                    repair: bool = True, seed: int = 0) -> dict:
+    """Place every weekly lesson of `curriculum` ({grade: {subject: periods per week}}) in a slot.
+
+    Hard constraints: a grade and a teacher hold at most one lesson per slot,
+    teachers only teach their subjects and never in their blocked slots
+    (unavailability or lessons they already have), and optionally at most
+    `max_teacher_periods_per_day` lessons a day. Soft: a grade's lessons of
+    one subject are spread over the week, and a teacher's over their days.
+
+    Lessons are placed most-constrained first (fewest free slots left for
+    their grade and teacher, relative to lessons still to place). When a
+    lesson has no free slot, it takes the slot that displaces the fewest
+    placed lessons, which go back in the queue; recently displaced lessons
+    are kept out of their old slot for a few steps (tabu) so the search does
+    not cycle. Stops after `budget_seconds`; the result then lists what is
+    still unplaced.
+
+    Returns {"lessons": [(grade, subject, teacher_id, slot)], "unplaced": [...],
+    "assignments": {(grade, subject): teacher_id}, "iterations", "ejections", "seconds"}.
+    """
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    slots = days * periods_per_day
+    full = (1 << slots) - 1
+    day_masks = [((1 << periods_per_day) - 1) << (day * periods_per_day) for day in range(days)]
+    teacher_blocked = {t: teacher_blocked.get(t, 0) if teacher_blocked else 0 for t in teacher_subjects}
+    grade_blocked = {g: (grade_blocked or {}).get(g, 0) for g in curriculum}
+
+    problems = []
+    for grade, subjects in curriculum.items():
+        free = slots - grade_blocked[grade].bit_count()
+        if sum(subjects.values()) > free:
+            problems.append(f"Grade {grade} needs {sum(subjects.values())} periods but has {free} free slots")
+    capacity = {}
+    for teacher_id, blocked in teacher_blocked.items():
+        capacity[teacher_id] = sum(
+            min((day_mask & ~blocked).bit_count(), max_teacher_periods_per_day or periods_per_day) for day_mask in day_masks)
+    if problems:
+        raise TimetableInfeasible(problems)
+    assignments = assign_teachers(curriculum, teacher_subjects, capacity)
+
+    # One group per (grade, subject): its lessons are interchangeable
+    groups = [{"grade": grade, "subject": subject, "teacher": teacher_id, "remaining": curriculum[grade][subject], "per_day": [0] * days}
+              for (grade, subject), teacher_id in assignments.items()]
+    by_grade: Dict[str, List[int]] = {}
+    by_teacher: Dict[str, List[int]] = {}
+    for index, group in enumerate(groups):
+        by_grade.setdefault(group["grade"], []).append(index)
+        by_teacher.setdefault(group["teacher"], []).append(index)
+
+    grade_taken = {grade: 0 for grade in curriculum}
+    teacher_taken = {teacher_id: 0 for teacher_id in teacher_subjects}
+    grade_at: Dict[str, Dict[int, int]] = {grade: {} for grade in curriculum}
+    teacher_at: Dict[str, Dict[int, int]] = {teacher_id: {} for teacher_id in teacher_subjects}
+    teacher_per_day = {teacher_id: [0] * days for teacher_id in teacher_subjects}
+
+    def full_days(teacher_id: str) -> int:
+        if max_teacher_periods_per_day is None:
+            return 0
+        mask = 0
+        for day, count in enumerate(teacher_per_day[teacher_id]):
+            if count >= max_teacher_periods_per_day:
+                mask |= day_masks[day]
+        return mask
+
+    def free_slots(index: int) -> int:
+        group = groups[index]
+        teacher_id = group["teacher"]
+        taken = grade_taken[group["grade"]] | grade_blocked[group["grade"]] | teacher_taken[teacher_id] | teacher_blocked[teacher_id]
+        return full & ~(taken | full_days(teacher_id))
+
+    def place(index: int, slot: int):
+        group = groups[index]
+        bit = 1 << slot
+        grade_taken[group["grade"]] |= bit
+        teacher_taken[group["teacher"]] |= bit
+        grade_at[group["grade"]][slot] = index
+        teacher_at[group["teacher"]][slot] = index
+        group["remaining"] -= 1
+        group["per_day"][slot // periods_per_day] += 1
+        teacher_per_day[group["teacher"]][slot // periods_per_day] += 1
+
+    def unplace(index: int, slot: int):
+        group = groups[index]
+        bit = 1 << slot
+        grade_taken[group["grade"]] &= ~bit
+        teacher_taken[group["teacher"]] &= ~bit
+        del grade_at[group["grade"]][slot]
+        del teacher_at[group["teacher"]][slot]
+        group["remaining"] += 1
+        group["per_day"][slot // periods_per_day] -= 1
+        teacher_per_day[group["teacher"]][slot // periods_per_day] -= 1
+
+    def preference(index: int, slot: int) -> float:
+        group = groups[index]
+        day = slot // periods_per_day
+        return group["per_day"][day] * 10 + teacher_per_day[group["teacher"]][day] + rng.random()
+
+    open_groups = {index for index, group in enumerate(groups) if group["remaining"]}
+    slack = {index: free_slots(index).bit_count() - groups[index]["remaining"] for index in open_groups}
+    tabu: Dict[Tuple[int, int], int] = {}
+    # Without repair, groups that hit a dead end are left unplaced
+    stuck = set()
+    iterations = ejections = 0
+    timed_out = False
+
+    def refresh(indexes):
+        for index in indexes:
+            if groups[index]["remaining"] and index not in stuck:
+                open_groups.add(index)
+                slack[index] = free_slots(index).bit_count() - groups[index]["remaining"]
+            else:
+                open_groups.discard(index)
+                slack.pop(index, None)
+
+    while open_groups:
+        iterations += 1
+        if iterations % 64 == 0 and time.perf_counter() - start > budget_seconds:
+            timed_out = True
+            break
+        index = min(open_groups, key=slack.__getitem__)
+        group = groups[index]
+        candidates = free_slots(index)
+        touched = set(by_grade[group["grade"]]) | set(by_teacher[group["teacher"]])
+        if candidates:
+            slot = min(_bits(candidates), key=lambda s: preference(index, s))
+        elif not repair:
+            stuck.add(index)
+            refresh([index])
+            continue
+        else:
+            # Displace the fewest placed lessons; never the fixed ones
+            teacher_id = group["teacher"]
+            allowed = full & ~(grade_blocked[group["grade"]] | teacher_blocked[teacher_id])
+            best, best_score, best_victims = None, None, None
+            day_full = full_days(teacher_id)
+            for slot in _bits(allowed):
+                victims = {grade_at[group["grade"]].get(slot), teacher_at[teacher_id].get(slot)} - {None}
+                if index in victims:
+                    continue
+                if day_full >> slot & 1 and slot not in teacher_at[teacher_id]:
+                    # The teacher's day is full; only swapping out their own lesson keeps it within the limit
+                    continue
+                score = len(victims) * 10 + (1000 if tabu.get((index, slot), 0) > iterations else 0) + preference(index, slot)
+                if best_score is None or score < best_score:
+                    best, best_score, best_victims = slot, score, victims
+            if best is None:
+                break
+            slot = best
+            for victim in best_victims:
+                unplace(victim, slot)
+                tabu[(victim, slot)] = iterations + TABU_TENURE + rng.randrange(TABU_TENURE)
+                touched |= set(by_grade[groups[victim]["grade"]]) | set(by_teacher[groups[victim]["teacher"]])
+                ejections += 1
+        place(index, slot)
+        refresh(touched)
+
+    lessons = [(groups[index]["grade"], groups[index]["subject"], groups[index]["teacher"], slot)
+               for grade in curriculum for slot, index in sorted(grade_at[grade].items())]
+    unplaced = [{"grade": group["grade"], "subject": group["subject"], "teacher_id": group["teacher"], "lessons": group["remaining"]}
+                for group in groups if group["remaining"]]
+    return {
+        "lessons": lessons,
+        "unplaced": unplaced,
+        "assignments": assignments,
+        "iterations": iterations,
+        "ejections": ejections,
+        "timed_out": timed_out,
+        "seconds": time.perf_counter() - start,
+    }
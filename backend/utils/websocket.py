@@ -1,5 +1,5 @@
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,9 +33,11 @@ class ConnectionManager:
                 except:
                     pass
     
-    async def broadcast_to_tenant(self, message: dict, tenant_id: str):
+    async def broadcast_to_tenant(self, message: dict, tenant_id: str, exclude_user_id: Optional[str] = None):
+        prefix = f"{tenant_id}:"
+        excluded = f"{prefix}{exclude_user_id}" if exclude_user_id else None
         for key, connections in self.active_connections.items():
-            if key.startswith(f"{tenant_id}:"):
+            if key.startswith(prefix) and key != excluded:
                 for connection in connections:
                     try:
                         await connection.send_json(message)
@@ -0,0 +1,109 @@
+from config.settings import WRITE_BEHIND_ENABLED, WRITE_BEHIND_MAX_DELAY_MS, WRITE_BEHIND_MAX_BATCH
+from pymongo.errors import BulkWriteError, WriteError
+from utils.metrics import write_behind_batch_documents, write_behind_flush_seconds, write_behind_failed_documents_total
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Buffer:
+    __slots__ = ("collection", "documents", "futures", "timer")
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.documents = []
+        self.futures = []
+        self.timer = None
+
+class WriteBehindWriter:
+    """Group-commit writer that turns concurrent insert_one calls into one insert_many.
+
+    Documents are buffered per collection and flushed when the oldest one has
+    waited `max_delay_ms` or the buffer holds `max_batch` documents. Each caller
+    gets a future that resolves once Mongo acknowledged its document (or fails
+    with that document's WriteError), so awaiting it gives the same durability
+    as insert_one with the client's write concern.
+    """
+
+    def __init__(self, max_delay_ms: float, max_batch: int):
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch = max_batch
+        self._buffers = {}
+        self._flushes = set()
+
+    async def insert(self, collection, document: dict, wait: bool = True):
+        """Buffer `document` for `collection`; with wait=True return once it is stored"""
+        loop = asyncio.get_running_loop()
+        key = (id(collection.database.client), collection.full_name)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _Buffer(collection)
+            buffer.timer = loop.call_later(self.max_delay, self._flush_buffer, key)
+        future = loop.create_future()
+        buffer.documents.append(document)
+        buffer.futures.append(future)
+        if len(buffer.documents) >= self.max_batch:
+            self._flush_buffer(key)
+        if wait:
+            await future
+        else:
+            future.add_done_callback(self._log_failure)
+
+    def _flush_buffer(self, key):
+        buffer = self._buffers.pop(key, None)
+        if buffer is None:
+            return
+        buffer.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._write(buffer))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, buffer: _Buffer):
+        name = buffer.collection.name
+        write_behind_batch_documents.observe(len(buffer.documents), (name,))
+        failed = {}
+        start = time.perf_counter()
+        try:
+            # Unordered, so one duplicate key does not hold back the rest of the batch
+            await buffer.collection.insert_many(buffer.documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = WriteError(error.get("errmsg"), error.get("code"), error)
+        except Exception as e:
+            failed = {index: e for index in range(len(buffer.documents))}
+        write_behind_flush_seconds.observe(time.perf_counter() - start, (name,))
+        if failed:
+            write_behind_failed_documents_total.inc((name,), len(failed))
+        for index, future in enumerate(buffer.futures):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(None)
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Write-behind insert failed: {future.exception()}")
+
+    async def flush(self):
+        """Write every buffered document now and wait for all in-flight batches"""
+        for key in list(self._buffers):
+            self._flush_buffer(key)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+write_behind = WriteBehindWriter(WRITE_BEHIND_MAX_DELAY_MS, WRITE_BEHIND_MAX_BATCH)
+
+async def insert_document(collection, document: dict):
+    """insert_one, or a group-committed insert when WRITE_BEHIND_ENABLED is set.
+
+    Either way the call returns once the document is acknowledged, and
+    `document` gains its `_id` just as with insert_one.
+    """
+    if WRITE_BEHIND_ENABLED:
+        await write_behind.insert(collection, document)
+    else:
+        await collection.insert_one(document)
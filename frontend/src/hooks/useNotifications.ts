@@ -19,12 +19,29 @@ export const useNotifications = (user: User | null): UseNotificationsReturn => {
   const [unreadCount, setUnreadCount] = useState<number>(0);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+  // created_at of the newest notification received; sent on reconnect so the
+  // server replays only what was missed
+  const lastSeenRef = useRef<string | null>(null);
+  const seenIdsRef = useRef<Set<string>>(new Set());
+
+  const markSeen = (createdAt: string): void => {
+    if (!lastSeenRef.current || createdAt > lastSeenRef.current) {
+      lastSeenRef.current = createdAt;
+    }
+  };
 
   const fetchNotifications = async (): Promise<void> => {
     try {
-      const response = await axios.get<NotificationData[]>(`${BACKEND_URL}/api/notifications`);
+      const [response, unread] = await Promise.all([
+        axios.get<NotificationData[]>(`${BACKEND_URL}/api/notifications`),
+        axios.get<{ unread: number }>(`${BACKEND_URL}/api/notifications/unread-count`)
+      ]);
       setNotifications(response.data);
-      setUnreadCount(response.data.filter(n => !n.read).length);
+      setUnreadCount(unread.data.unread);
+      response.data.forEach(n => {
+        seenIdsRef.current.add(n.id);
+        markSeen(n.created_at);
+      });
     } catch (error) {
       console.error('Failed to fetch notifications:', error);
     }
@@ -37,7 +54,8 @@ export const useNotifications = (user: User | null): UseNotificationsReturn => {
     if (!token) return;
 
     try {
-      const ws = new WebSocket(`${WS_URL}/api/notifications/ws?token=${token}`);
+      const since = lastSeenRef.current ? `&since=${encodeURIComponent(lastSeenRef.current)}` : '';
+      const ws = new WebSocket(`${WS_URL}/api/notifications/ws?token=${token}${since}`);
       
       ws.onopen = () => {
         console.log('WebSocket connected');
@@ -55,8 +73,20 @@ export const useNotifications = (user: User | null): UseNotificationsReturn => {
       ws.onmessage = (event: MessageEvent) => {
         try {
           const notification: NotificationData = JSON.parse(event.data);
-          setNotifications(prev => [notification, ...prev]);
-          setUnreadCount(prev => prev + 1);
+          // A replayed notification can also arrive live; keep the first copy
+          if (seenIdsRef.current.has(notification.id)) return;
+          seenIdsRef.current.add(notification.id);
+          if (notification.notification_ids) {
+            // Digest of notifications stored individually: reload them instead of
+            // showing a summary entry that cannot be marked read
+            fetchNotifications();
+          } else {
+            markSeen(notification.created_at);
+            setNotifications(prev => [notification, ...prev]);
+            if (!notification.read) {
+              setUnreadCount(prev => prev + 1);
+            }
+          }
           
           if (window.Notification.permission === 'granted') {
             new window.Notification(notification.title, {
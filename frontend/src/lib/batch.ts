@@ -0,0 +1,24 @@
+import axios from 'axios';
+
+export interface BatchResponse<T = unknown> {
+  path: string;
+  status: number;
+  body: T;
+}
+
+/**
+ * GET several API paths with one request to POST /api/batch, which
+ * authenticates once and runs them concurrently on the server.
+ * `api` is the API base URL (ending in /api) and `paths` are relative to it.
+ * Resolves to the response bodies in order; rejects if any of them failed.
+ */
+export async function batchGet<T extends unknown[]>(api: string, paths: string[]): Promise<T> {
+  const response = await axios.post<{ responses: BatchResponse[] }>(`${api}/batch`, {
+    requests: paths.map((path) => ({ path: `/api${path}` })),
+  });
+  const failed = response.data.responses.find((r) => r.status >= 400);
+  if (failed) {
+    throw new Error(`GET ${failed.path} failed with status ${failed.status}`);
+  }
+  return response.data.responses.map((r) => r.body) as T;
+}
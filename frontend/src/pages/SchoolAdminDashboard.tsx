@@ -5,6 +5,7 @@ import { Users, BookOpen, Calendar, DollarSign, LogOut, TrendingUp, UserPlus, Up
 import AIChat from '../components/AIChat';
 import NotificationBell from '../components/NotificationBell';
 import { DashboardStats, Student, Teacher } from '@/types';
+import { batchGet } from '@/lib/batch';
 
 interface StatCardProps {
   icon: React.ReactNode;
@@ -42,14 +43,12 @@ const SchoolAdminDashboard: React.FC = () => {
 
   const fetchDashboardData = async (): Promise<void> => {
     try {
-      const [statsRes, studentsRes, teachersRes] = await Promise.all([
-        axios.get<DashboardStats>(`${API}/dashboard/stats`),
-        axios.get<Student[]>(`${API}/students`),
-        axios.get<Teacher[]>(`${API}/teachers`)
-      ]);
-      setStats(statsRes.data);
-      setStudents(studentsRes.data);
-      setTeachers(teachersRes.data);
+      const [statsData, studentsData, teachersData] = await batchGet<[DashboardStats, Student[], Teacher[]]>(
+        API, ['/dashboard/stats', '/students', '/teachers']
+      );
+      setStats(statsData);
+      setStudents(studentsData);
+      setTeachers(teachersData);
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error);
     }
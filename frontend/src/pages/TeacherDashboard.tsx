@@ -1,10 +1,10 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../App';
-import axios from 'axios';
 import { BookOpen, Users, ClipboardCheck, LogOut, Calendar } from 'lucide-react';
 import AIChat from '../components/AIChat';
 import NotificationBell from '../components/NotificationBell';
 import { Student, Assignment } from '@/types';
+import { batchGet } from '@/lib/batch';
 
 const TeacherDashboard: React.FC = () => {
   const { user, logout, API } = useAuth();
@@ -17,12 +17,9 @@ const TeacherDashboard: React.FC = () => {
 
   const fetchTeacherData = async (): Promise<void> => {
     try {
-      const [studentsRes, assignmentsRes] = await Promise.all([
-        axios.get<Student[]>(`${API}/students`),
-        axios.get<Assignment[]>(`${API}/assignments`)
-      ]);
-      setStudents(studentsRes.data);
-      setAssignments(assignmentsRes.data);
+      const [studentsData, assignmentsData] = await batchGet<[Student[], Assignment[]]>(API, ['/students', '/assignments']);
+      setStudents(studentsData);
+      setAssignments(assignmentsData);
     } catch (error) {
       console.error('Failed to fetch teacher data:', error);
     }
@@ -7,6 +7,10 @@ export interface NotificationData {
   user_id: string;
   read: boolean;
   created_at: string;
+  // Digests: how many notifications the entry stands for
+  count?: number;
+  items?: { title: string; message: string; created_at: string }[];
+  notification_ids?: string[];
 }
 
 export interface ChatMessage {
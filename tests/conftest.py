@@ -0,0 +1,29 @@
+"""Shared setup: run the backend against the in-memory Motor stand-in.
+
+The store is configured before anything imports server or the routers,
+since they bind config.database.db at import time. Tests use fresh
+tenants (or clear the global collections they touch) instead of a fresh
+store.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Importing benchmarks also sets the MONGO_URL/DB_NAME defaults config.database reads
+from benchmarks.loadtest import configure_store  # noqa: E402
+
+database = configure_store(None, 0)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def store():
+    """The config.database module, with db pointing at the in-memory store"""
+    return database
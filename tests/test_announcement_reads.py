@@ -0,0 +1,72 @@
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from config.indexes import ensure_indexes
+from utils.notifications import announcement_audience, mark_announcements_read, write_read_receipt
+from utils.security import create_access_token
+
+
+@pytest.mark.anyio
+async def test_read_all_tolerates_a_receipt_written_concurrently(store, monkeypatch):
+    tenant_db, tenant_id, user_id = store.db, str(uuid.uuid4()), str(uuid.uuid4())
+    await ensure_indexes(tenant_db)
+    announcement_ids = [str(uuid.uuid4()) for _ in range(2)]
+    await tenant_db.notifications.insert_many([{
+        "id": announcement_id, "title": "t", "message": "m", "type": "announcement",
+        "user_id": announcement_audience(tenant_id), "tenant_id": tenant_id, "read": False,
+        "created_at": "2026-01-01T00:00:00+00:00",
+    } for announcement_id in announcement_ids])
+
+    receipts = tenant_db.announcement_reads
+    distinct = receipts.distinct
+
+    async def read_in_another_tab(*args, **kwargs):
+        already_read = await distinct(*args, **kwargs)
+        # The other tab reads the first announcement after this read-all looked
+        assert await write_read_receipt(tenant_db, announcement_ids[0], user_id, tenant_id) is None
+        return already_read
+
+    monkeypatch.setattr(receipts, "distinct", read_in_another_tab)
+    assert await mark_announcements_read(tenant_db, user_id, tenant_id) == 1
+    monkeypatch.undo()
+
+    assert await receipts.count_documents({"user_id": user_id}) == 2
+    assert await mark_announcements_read(tenant_db, user_id, tenant_id) == 0
+
+
+@pytest.mark.anyio
+async def test_notification_page_looks_past_read_and_deleted_announcements(store):
+    import server
+
+    tenant_db, tenant_id, user_id = store.db, str(uuid.uuid4()), str(uuid.uuid4())
+    await ensure_indexes(tenant_db)
+    await tenant_db.users.insert_one({
+        "id": user_id, "email": f"{user_id}@example.com", "full_name": "Parent", "role": "parent",
+        "tenant_id": tenant_id, "hashed_password": "", "created_at": "2026-01-01T00:00:00+00:00", "is_active": True,
+    })
+    await tenant_db.notifications.insert_one({
+        "id": str(uuid.uuid4()), "title": "Fee due", "message": "m", "type": "fee", "user_id": user_id,
+        "tenant_id": tenant_id, "read": False, "created_at": "2026-01-01T00:00:00+00:00",
+    })
+    # 150 newer announcements, all read and the newest 120 deleted
+    announcement_ids = [str(uuid.uuid4()) for _ in range(150)]
+    await tenant_db.notifications.insert_many([{
+        "id": announcement_id, "title": "t", "message": "m", "type": "announcement",
+        "user_id": announcement_audience(tenant_id), "tenant_id": tenant_id, "read": False,
+        "created_at": f"2026-02-01T00:00:{index // 60:02d}.{index % 60:06d}+00:00",
+    } for index, announcement_id in enumerate(announcement_ids)])
+    assert await mark_announcements_read(tenant_db, user_id, tenant_id) == 150
+    for announcement_id in announcement_ids[30:]:
+        await write_read_receipt(tenant_db, announcement_id, user_id, tenant_id, hidden=True)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id}, timedelta(hours=1))}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://notifications", headers=headers) as http:
+        unread = (await http.get("/api/notifications", params={"unread_only": True})).json()
+        everything = (await http.get("/api/notifications")).json()
+
+    assert [n["title"] for n in unread] == ["Fee due"]
+    assert [n["id"] for n in everything[:-1]] == announcement_ids[29::-1]
+    assert everything[-1]["title"] == "Fee due" and all(n["read"] for n in everything[:-1])
@@ -0,0 +1,111 @@
+import asyncio
+import email
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.smtp_sink import SMTPSink
+from config.settings import EMAIL_RETRY_BASE_SECONDS
+from utils import email_outbox as outbox_module
+from utils.email_outbox import EmailOutbox, SMTPPool
+
+
+@pytest.fixture
+async def sink():
+    sink = await SMTPSink().start()
+    yield sink
+    await sink.close()
+
+
+@pytest.fixture
+async def outbox(store, sink):
+    await store.db.email_outbox.delete_many({})
+    outbox = EmailOutbox(store.db, SMTPPool(1, "127.0.0.1", sink.port), workers=1, batch_size=10, sender="school@example.com")
+    yield outbox
+    await outbox.close()
+
+
+def _message(to, subject="Fee receipt"):
+    return {"to": to, "subject": subject, "body": f"{subject} body", "tenant_id": "tenant"}
+
+
+async def _stored(store, to):
+    return await store.db.email_outbox.find({"to": to}, {"_id": 0}).to_list(None)
+
+
+@pytest.mark.anyio
+async def test_messages_inside_the_group_window_go_out_as_one_email(store, sink, outbox, monkeypatch):
+    monkeypatch.setattr(outbox_module, "EMAIL_GROUP_WINDOW_SECONDS", 0.2)
+    to = f"{uuid.uuid4().hex}@example.com"
+    await outbox.enqueue([_message(to, "Assignment due"), _message(to, "Fee receipt")])
+    await outbox.enqueue([_message(to, "Grade posted")])
+
+    # Still inside the window: nothing is due
+    assert await outbox.process_batch() == 0
+    await asyncio.sleep(0.25)
+    assert await outbox.process_batch() == 3
+
+    assert sink.accepted == 1 and sink.recipients == [to]
+    sent = email.message_from_bytes(sink.messages[0])
+    assert sent["Subject"] == "3 new notifications from EduPro"
+    assert {m["status"] for m in await _stored(store, to)} == {"sent"}
+
+
+@pytest.mark.anyio
+async def test_temporary_failure_is_retried_with_backoff(store, sink, outbox, monkeypatch):
+    monkeypatch.setattr(outbox_module, "EMAIL_GROUP_WINDOW_SECONDS", 0)
+    to = f"{uuid.uuid4().hex}@example.com"
+    await outbox.enqueue([_message(to)])
+    sink.replies.append("451 Mailbox busy, try again later")
+
+    before = datetime.now(timezone.utc)
+    assert await outbox.process_batch() == 1
+    [message] = await _stored(store, to)
+    assert message["status"] == "pending"
+    assert message["attempts"] == 1
+    assert "451" in message["last_error"]
+    delay = (message["next_attempt_at"] - before).total_seconds()
+    assert 0.8 * EMAIL_RETRY_BASE_SECONDS - 1 <= delay <= 1.2 * EMAIL_RETRY_BASE_SECONDS + 1
+    # Not due again before the backoff has passed
+    assert await outbox.process_batch() == 0
+
+    await store.db.email_outbox.update_many({"to": to}, {"$set": {"next_attempt_at": before}})
+    assert await outbox.process_batch() == 1
+    [message] = await _stored(store, to)
+    assert message["status"] == "sent" and message["attempts"] == 1
+    assert sink.rejected == 1 and sink.accepted == 1
+
+
+@pytest.mark.anyio
+async def test_permanent_failure_fails_at_once(store, sink, outbox, monkeypatch):
+    monkeypatch.setattr(outbox_module, "EMAIL_GROUP_WINDOW_SECONDS", 0)
+    to = f"{uuid.uuid4().hex}@example.com"
+    await outbox.enqueue([_message(to)])
+    sink.replies.append("550 No such user here")
+
+    assert await outbox.process_batch() == 1
+    [message] = await _stored(store, to)
+    assert message["status"] == "failed"
+    assert message["attempts"] == 1
+    assert "550" in message["last_error"] and "No such user" in message["last_error"]
+    assert "claim" not in message and "locked_until" not in message
+    assert await outbox.process_batch() == 0
+
+
+@pytest.mark.anyio
+async def test_expired_lease_is_reclaimed(store, sink, outbox):
+    now = datetime.now(timezone.utc)
+    abandoned, leased = f"{uuid.uuid4().hex}@example.com", f"{uuid.uuid4().hex}@example.com"
+    await store.db.email_outbox.insert_many([{
+        "id": str(uuid.uuid4()), "tenant_id": "tenant", "to": to, "subject": "Fee receipt", "body": "body",
+        "status": "sending", "attempts": 0, "claim": "worker-that-died", "locked_until": locked_until,
+        "created_at": now - timedelta(minutes=10), "next_attempt_at": now - timedelta(minutes=10),
+    } for to, locked_until in ((abandoned, now - timedelta(seconds=1)), (leased, now + timedelta(minutes=5)))])
+
+    assert await outbox.process_batch() == 1
+    assert sink.recipients == [abandoned]
+    [reclaimed] = await _stored(store, abandoned)
+    assert reclaimed["status"] == "sent" and "claim" not in reclaimed
+    [still_leased] = await _stored(store, leased)
+    assert still_leased["status"] == "sending" and still_leased["claim"] == "worker-that-died"
@@ -0,0 +1,85 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from utils import overdue_fees
+from utils.overdue_fees import STALE_RUN_SECONDS, mark_overdue_fees
+
+
+@pytest.mark.anyio
+async def test_tenant_notified_before_a_failure_is_not_notified_again(store, monkeypatch):
+    database = store.client[f"overdue_{uuid.uuid4().hex}"]
+    tenants = [str(uuid.uuid4()) for _ in range(2)]
+    today = date.today()
+    await database.fees.insert_many([{
+        "id": str(uuid.uuid4()), "tenant_id": tenant_id, "student_id": str(uuid.uuid4()), "amount": 100.0,
+        "due_date": (today - timedelta(days=3)).isoformat(), "description": "Tuition", "status": "pending",
+        "created_at": "2026-01-01T00:00:00+00:00", "paid_date": None,
+    } for tenant_id in tenants for _ in range(2)])
+
+    calls, notified = [], []
+
+    async def notify_users(title, message, notification_type, user_ids, tenant_id):
+        calls.append(tenant_id)
+        # The first run's second tenant cannot be notified
+        if len(calls) == 2:
+            raise RuntimeError("notification store unavailable")
+        notified.append(tenant_id)
+
+    async def get_tenant_admin_ids(tenant_id):
+        return [f"admin-{tenant_id}"]
+
+    monkeypatch.setattr(overdue_fees, "notify_users", notify_users)
+    monkeypatch.setattr(overdue_fees, "get_tenant_admin_ids", get_tenant_admin_ids)
+
+    with pytest.raises(RuntimeError):
+        await mark_overdue_fees(database, today.isoformat(), 100)
+    [first] = notified
+    failed = next(tenant_id for tenant_id in tenants if tenant_id != first)
+    assert await database.fees.count_documents({"tenant_id": first, "overdue_run": {"$exists": True}}) == 0
+    assert await database.fees.count_documents({"tenant_id": failed, "overdue_run": {"$exists": True}}) == 2
+
+    # Once the failed run is stale, the next run adopts what it left and notifies only that tenant
+    stale = (datetime.now(timezone.utc) - timedelta(seconds=STALE_RUN_SECONDS + 60)).isoformat()
+    await database.fees.update_many({}, {"$set": {"overdue_run_at": stale}})
+    result = await mark_overdue_fees(database, today.isoformat(), 100)
+    assert notified == [first, failed]
+    assert result["tenants_notified"] == 1
+    assert await database.fees.count_documents({"overdue_run": {"$exists": True}}) == 0
+    assert await database.fees.count_documents({"status": "overdue"}) == 4
+
+
+@pytest.mark.anyio
+async def test_stale_fees_are_adopted_by_one_of_two_concurrent_runs(store, monkeypatch):
+    database = store.client[f"overdue_{uuid.uuid4().hex}"]
+    tenant_id, today = str(uuid.uuid4()), date.today()
+    stale = (datetime.now(timezone.utc) - timedelta(seconds=STALE_RUN_SECONDS + 60)).isoformat()
+    # Flipped by a run that died before notifying
+    await database.fees.insert_many([{
+        "id": str(uuid.uuid4()), "tenant_id": tenant_id, "student_id": str(uuid.uuid4()), "amount": 100.0,
+        "due_date": (today - timedelta(days=3)).isoformat(), "description": "Tuition", "status": "overdue",
+        "created_at": "2026-01-01T00:00:00+00:00", "paid_date": None,
+        "overdue_at": stale, "overdue_run": "dead-run", "overdue_run_at": stale,
+    } for _ in range(2)])
+
+    notified, second_run = [], {}
+
+    async def notify_users(title, message, notification_type, user_ids, tenant_id):
+        notified.append((tenant_id, message))
+        # Another worker's run starts after this one adopted the fees but before it released them
+        if "result" not in second_run:
+            second_run["result"] = None
+            second_run["result"] = await mark_overdue_fees(database, today.isoformat(), 100)
+
+    async def get_tenant_admin_ids(tenant_id):
+        return [f"admin-{tenant_id}"]
+
+    monkeypatch.setattr(overdue_fees, "notify_users", notify_users)
+    monkeypatch.setattr(overdue_fees, "get_tenant_admin_ids", get_tenant_admin_ids)
+
+    result = await mark_overdue_fees(database, today.isoformat(), 100)
+    assert result["tenants_notified"] == 1 and second_run["result"] == {"flipped": 0, "batches": 0, "tenants_notified": 0}
+    assert notified == [(tenant_id, "2 fees totalling $200.00 became overdue")]
+    assert await database.fees.count_documents({"overdue_run": {"$exists": True}}) == 0
+    assert await database.fees.count_documents({"overdue_at": stale}) == 2
@@ -0,0 +1,35 @@
+import asyncio
+import uuid
+
+import pytest
+
+from utils.report_jobs import ArtifactStore, ReportJobRunner
+
+
+def _job(tenant_id):
+    return {"key": uuid.uuid4().hex, "report": "attendance", "format": "csv", "tenant_id": tenant_id, "params": {}}
+
+
+@pytest.mark.anyio
+async def test_close_marks_running_and_queued_jobs_failed(store, tmp_path):
+    tenant_db, tenant_id = store.db, str(uuid.uuid4())
+    runner = ReportJobRunner(ArtifactStore(str(tmp_path), 1024 * 1024), workers=1, queue_size=5)
+    started = asyncio.Event()
+
+    async def never_finishes():
+        started.set()
+        await asyncio.Event().wait()
+        yield {}
+
+    running = await runner.submit(tenant_db, _job(tenant_id), never_finishes)
+    queued = await runner.submit(tenant_db, _job(tenant_id), never_finishes)
+    await asyncio.wait_for(started.wait(), 5)
+    assert (await tenant_db.report_jobs.find_one({"id": running["id"]}))["status"] == "running"
+
+    await runner.close()
+
+    for job in (running, queued):
+        stored = await tenant_db.report_jobs.find_one({"id": job["id"]}, {"_id": 0})
+        assert stored["status"] == "failed"
+        assert stored["finished_at"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,12 @@
+import json
+
+import pytest
+
+from benchmarks.round_trips import measure_round_trips
+
+
+@pytest.mark.anyio
+async def test_endpoints_stay_within_round_trip_budget(store):
+    report, over_budget = await measure_round_trips(students=20)
+    assert over_budget == [], json.dumps({endpoint: report[endpoint] for endpoint in over_budget}, indent=2)
+    assert all(entry["round_trips"] > 0 for entry in report.values())
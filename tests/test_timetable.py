@@ -0,0 +1,168 @@
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from config.indexes import ensure_indexes
+from utils.security import create_access_token
+
+
+@pytest.fixture
+async def school(store):
+    """A fresh tenant with an admin and two teachers"""
+    await ensure_indexes(store.db)
+    tenant_id, admin_id = str(uuid.uuid4()), str(uuid.uuid4())
+    await store.db.users.insert_one({
+        "id": admin_id, "email": f"{admin_id}@example.com", "full_name": "Admin", "role": "school_admin",
+        "tenant_id": tenant_id, "hashed_password": "", "created_at": "2026-01-01T00:00:00+00:00", "is_active": True,
+    })
+    teachers = [str(uuid.uuid4()) for _ in range(2)]
+    await store.db.teachers.insert_many([{
+        "id": teacher_id, "tenant_id": tenant_id, "first_name": "Teacher", "last_name": str(index),
+        "email": f"{teacher_id}@example.com", "subjects": ["Math", "Science"], "qualification": "BEd",
+        "created_at": "2026-01-01T00:00:00+00:00", "is_active": True,
+    } for index, teacher_id in enumerate(teachers)])
+    token = create_access_token({"sub": admin_id}, timedelta(hours=1))
+    return {"tenant_id": tenant_id, "teachers": teachers, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+@pytest.fixture
+async def http(school):
+    import server
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://timetable",
+                                 headers=school["headers"]) as client:
+        yield client
+
+
+def _entry(grade, teacher_id, period, day="Monday", subject="Math"):
+    return {"grade": grade, "day": day, "period": period, "subject": subject, "teacher_id": teacher_id,
+            "start_time": "08:00", "end_time": "08:45"}
+
+
+async def _stored(store, school):
+    return await store.db.timetable.count_documents({"tenant_id": school["tenant_id"]})
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("kind", ["teacher", "grade"])
+async def test_single_create_reports_the_clashing_lesson(store, school, http, kind):
+    first, second = school["teachers"]
+    held = (await http.post("/api/timetable", json=_entry("1A", first, 1))).json()
+
+    clash = _entry("1B", first, 1) if kind == "teacher" else _entry("1A", second, 1)
+    response = await http.post("/api/timetable", json=clash)
+    assert response.status_code == 409
+    [conflict] = response.json()["detail"]["conflicts"]
+    assert conflict["kind"] == kind and conflict["conflicting_id"] == held["id"]
+    assert (conflict.get("teacher_id"), conflict.get("grade")) == ((first, None) if kind == "teacher" else (None, "1A"))
+    assert await _stored(store, school) == 1
+
+
+@pytest.mark.anyio
+async def test_single_create_retries_when_the_clashing_lesson_is_gone(store, school, http, monkeypatch):
+    timetable = store.db.timetable
+    insert_one, rejected = timetable.insert_one, []
+
+    async def rejected_once(document):
+        # The lesson holding the slot is deleted before the holder lookup
+        if not rejected:
+            rejected.append(document["id"])
+            raise DuplicateKeyError("E11000 duplicate key error collection: timetable")
+        return await insert_one(document)
+
+    monkeypatch.setattr(timetable, "insert_one", rejected_once)
+    response = await http.post("/api/timetable", json=_entry("1A", school["teachers"][0], 1))
+    assert response.status_code == 200 and rejected == [response.json()["id"]]
+    assert await _stored(store, school) == 1
+
+
+@pytest.mark.anyio
+async def test_single_create_fails_when_no_lesson_holds_the_rejected_slot(store, school, http, monkeypatch):
+    async def always_rejected(document):
+        raise DuplicateKeyError("E11000 duplicate key error collection: timetable")
+
+    monkeypatch.setattr(store.db.timetable, "insert_one", always_rejected)
+    response = await http.post("/api/timetable", json=_entry("1A", school["teachers"][0], 1))
+    assert response.status_code == 500
+    assert await _stored(store, school) == 0
+
+
+@pytest.mark.anyio
+async def test_bulk_upload_reports_every_conflict_and_stores_nothing(store, school, http):
+    first, second = school["teachers"]
+    held = (await http.post("/api/timetable", json=_entry("1A", first, 1))).json()
+
+    response = await http.post("/api/timetable/bulk", json={"entries": [
+        _entry("1B", first, 1),   # the stored lesson's teacher
+        _entry("1C", second, 2),
+        _entry("1C", second, 2),  # the previous entry's teacher and grade
+    ]})
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert detail["message"] == "3 timetable conflicts"
+    assert [(c["index"], c["kind"], c.get("conflicting_id"), c.get("conflicting_index")) for c in detail["conflicts"]] == [
+        (0, "teacher", held["id"], None), (2, "teacher", None, 1), (2, "grade", None, 1)]
+    assert await _stored(store, school) == 1
+
+
+@pytest.mark.anyio
+async def test_bulk_dry_run_checks_without_storing(store, school, http):
+    first, second = school["teachers"]
+    week = [_entry("1A", first, period) for period in (1, 2)] + [_entry("1B", second, 1)]
+
+    response = await http.post("/api/timetable/bulk", json={"entries": week, "dry_run": True})
+    assert response.status_code == 200 and response.json() == {"created": 0, "conflicts": []}
+    assert await _stored(store, school) == 0
+
+    clashing = await http.post("/api/timetable/bulk", json={"entries": week + [_entry("1C", first, 2)], "dry_run": True})
+    assert clashing.status_code == 409 and len(clashing.json()["detail"]["conflicts"]) == 1
+
+    response = await http.post("/api/timetable/bulk", json={"entries": week})
+    assert response.json()["created"] == 3 and await _stored(store, school) == 3
+
+
+@pytest.mark.anyio
+async def test_bulk_write_error_other_than_a_duplicate_is_raised(store, school, http, monkeypatch):
+    async def invalid(documents, ordered=True):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "Document failed validation"}], "nInserted": 0})
+
+    monkeypatch.setattr(store.db.timetable, "insert_many", invalid)
+    with pytest.raises(BulkWriteError):
+        await http.post("/api/timetable/bulk", json={"entries": [_entry("1A", school["teachers"][0], 1)]})
+
+
+@pytest.mark.anyio
+async def test_generate_counts_kept_lessons_against_the_curriculum(store, school, http):
+    first, _ = school["teachers"]
+    for period in (1, 2):
+        assert (await http.post("/api/timetable", json=_entry("1A", first, period, subject="math "))).status_code == 200
+
+    response = await http.post("/api/timetable/generate", json={"grades": [{"grade": "1A", "subjects": {"Math": 3, "Science": 1}}]})
+    assert response.status_code == 200
+    assert sorted(entry["subject"] for entry in response.json()["entries"]) == ["Math", "Science"]
+    assert await _stored(store, school) == 4
+
+
+@pytest.mark.anyio
+async def test_generate_returns_replaced_lessons_it_could_not_restore(store, school, http, monkeypatch):
+    first, second = school["teachers"]
+    kept = [(await http.post("/api/timetable", json=_entry("1A", first, period))).json() for period in (1, 2)]
+
+    timetable = store.db.timetable
+    insert_many, insert_one = timetable.insert_many, timetable.insert_one
+
+    async def taken_while_solving(documents, ordered=True):
+        monkeypatch.setattr(timetable, "insert_many", insert_many)
+        # Another admin books 1A's first period after the old week was deleted
+        await insert_one({**_entry("1A", second, 1, subject="Science"), "id": str(uuid.uuid4()), "tenant_id": school["tenant_id"]})
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"}], "nInserted": 0})
+
+    monkeypatch.setattr(timetable, "insert_many", taken_while_solving)
+    response = await http.post("/api/timetable/generate", json={"grades": [{"grade": "1A", "subjects": {"Math": 2}}], "replace": True})
+    assert response.status_code == 409
+    assert response.json()["detail"]["lost_entries"] == [kept[0]]
+    stored = await timetable.find({"tenant_id": school["tenant_id"]}, {"_id": 0}).to_list(None)
+    assert sorted((entry["period"], entry["subject"]) for entry in stored) == [(1, "Science"), (2, "Math")]
@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+
+from utils import notifications
+from config.tenants import TENANT_COLLECTIONS
+from utils.notifications import adjust_unread_counts, get_unread_count
+
+
+def _notification(user_id, tenant_id):
+    return {"id": str(uuid.uuid4()), "title": "t", "message": "m", "type": "info", "user_id": user_id,
+            "tenant_id": tenant_id, "read": False, "created_at": "2026-01-01T00:00:00+00:00"}
+
+
+@pytest.mark.anyio
+async def test_rebuild_keeps_a_change_that_lands_after_the_recount(store, monkeypatch):
+    tenant_db, tenant_id, user_id = store.db, str(uuid.uuid4()), str(uuid.uuid4())
+    await tenant_db.notifications.insert_many([_notification(user_id, tenant_id) for _ in range(2)])
+    recount = notifications._count_unread
+    raced = []
+
+    async def racing_recount(database, user, tenant):
+        unread = await recount(database, user, tenant)
+        if not raced:
+            # Another request stores a notification between the recount and its write-back
+            raced.append(True)
+            await tenant_db.notifications.insert_one(_notification(user_id, tenant_id))
+            await adjust_unread_counts(tenant_db, {user_id: 1})
+        return unread
+
+    monkeypatch.setattr(notifications, "_count_unread", racing_recount)
+    assert await get_unread_count(tenant_db, user_id, tenant_id) == 3
+    monkeypatch.undo()
+
+    counter = await tenant_db.notification_counters.find_one({"user_id": user_id}, {"_id": 0})
+    assert counter["unread"] == 3 and "stale" not in counter
+    await adjust_unread_counts(tenant_db, {user_id: 1})
+    assert await get_unread_count(tenant_db, user_id, tenant_id) == 4
+
+
+@pytest.mark.anyio
+async def test_counter_left_stale_when_every_rebuild_races(store, monkeypatch):
+    tenant_db, tenant_id, user_id = store.db, str(uuid.uuid4()), str(uuid.uuid4())
+    await tenant_db.notifications.insert_one(_notification(user_id, tenant_id))
+    recount = notifications._count_unread
+
+    async def always_racing(database, user, tenant):
+        unread = await recount(database, user, tenant)
+        await adjust_unread_counts(tenant_db, {user_id: 1})
+        await tenant_db.notifications.insert_one(_notification(user_id, tenant_id))
+        return unread
+
+    monkeypatch.setattr(notifications, "_count_unread", always_racing)
+    await get_unread_count(tenant_db, user_id, tenant_id)
+    monkeypatch.undo()
+
+    counter = await tenant_db.notification_counters.find_one({"user_id": user_id}, {"_id": 0})
+    assert counter["stale"] is True
+    total = await tenant_db.notifications.count_documents({"user_id": user_id, "read": False})
+    assert await get_unread_count(tenant_db, user_id, tenant_id) == total
+
+
+@pytest.mark.anyio
+async def test_counters_leave_with_a_moved_tenant(store):
+    from scripts.move_tenant import TenantMove
+
+    source = store.client[f"move_{uuid.uuid4().hex}"]
+    tenant_id, user_id = str(uuid.uuid4()), str(uuid.uuid4())
+    await source.notifications.insert_one(_notification(user_id, tenant_id))
+    assert await get_unread_count(source, user_id, tenant_id) == 1
+
+    # Copied and deleted like every other tenant collection, selected by tenant_id
+    assert "notification_counters" in TENANT_COLLECTIONS
+    await TenantMove(tenant_id, source, store.client[f"move_{uuid.uuid4().hex}"], 100).delete_source()
+    assert await source.notification_counters.count_documents({}) == 0